@@ -0,0 +1,52 @@
+import argparse
+import statistics
+import subprocess
+import sys
+
+_timer_code = """
+import time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+
+def measure_import_time(statement="import minervapy", repeat=10):
+    # each measure runs in a fresh interpreter, as imports are cached
+    times = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-c", _timer_code.format(statement=statement)],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        times.append(float(completed.stdout) * 1000)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="measure the time taken to import minervapy"
+    )
+    parser.add_argument("--statement", default="import minervapy")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        default=None,
+        help="fail if the median import time exceeds this many milliseconds",
+    )
+    args = parser.parse_args()
+    times = measure_import_time(args.statement, args.repeat)
+    median = statistics.median(times)
+    print(
+        f"{args.statement}: median {median:.2f} ms, "
+        f"min {min(times):.2f} ms, max {max(times):.2f} ms"
+    )
+    if args.max_ms is not None and median > args.max_ms:
+        sys.exit(f"median import time exceeds {args.max_ms} ms")
+
+
+if __name__ == "__main__":
+    main()
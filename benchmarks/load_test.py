@@ -0,0 +1,150 @@
+import argparse
+import concurrent.futures
+import statistics
+import time
+
+import minervapy.session
+import minervapy.configuration
+import minervapy.project
+import minervapy.map
+
+import benchmarks.stub_server
+
+
+def _get_configuration():
+    minervapy.configuration.get_configuration()
+
+
+def _get_projects():
+    minervapy.project.get_projects()
+
+
+def _get_maps():
+    minervapy.map.get_maps("project_0")
+
+
+def _download_map():
+    minervapy.map.download_map(1000, "project_0")
+
+
+def _download_image():
+    minervapy.map.download_map(1000, "project_0", format_="png")
+
+
+_scenarios = {
+    "get_configuration": _get_configuration,
+    "get_projects": _get_projects,
+    "get_maps": _get_maps,
+    "download_map": _download_map,
+    "download_image": _download_image,
+}
+
+
+def _percentile(sorted_values, fraction):
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def run_load(operation, concurrency, requests_count):
+    latencies = []
+    errors = 0
+
+    def timed():
+        start = time.perf_counter()
+        operation()
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(timed) for _ in range(requests_count)]
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    report = {
+        "concurrency": concurrency,
+        "requests": requests_count,
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+    }
+    if latencies:
+        report |= {
+            "mean": statistics.mean(latencies),
+            "p50": _percentile(latencies, 0.50),
+            "p95": _percentile(latencies, 0.95),
+            "p99": _percentile(latencies, 0.99),
+            "max": latencies[-1],
+        }
+    return report
+
+
+def print_report(scenario, report):
+    line = (
+        f"{scenario:<20}{report['concurrency']:>6}{report['throughput']:>12.1f}"
+        f"{report['errors']:>8}"
+    )
+    for key in ["p50", "p95", "p99", "max"]:
+        if key in report:
+            line = f"{line}{report[key] * 1000:>10.1f}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="load test minervapy against a local MINERVA stub server"
+    )
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(_scenarios),
+        help="operations to load test (default: all)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 4, 16, 64]
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--maps", type=int, default=5)
+    parser.add_argument("--species", type=int, default=200)
+    parser.add_argument(
+        "--base-url",
+        default=None,
+        help="load test this server instead of starting a stub server",
+    )
+    args = parser.parse_args()
+    server = None
+    if args.base_url is None:
+        server = benchmarks.stub_server.StubServer(
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            projects=args.projects,
+            maps=args.maps,
+            species=args.species,
+        ).start()
+        base_url = server.base_url
+    else:
+        base_url = args.base_url
+    minervapy.session.set_base_url(base_url)
+    print(
+        f"{'scenario':<20}{'conc.':>6}{'req/s':>12}{'errors':>8}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    )
+    try:
+        for scenario in args.scenario or list(_scenarios):
+            for concurrency in args.concurrency:
+                report = run_load(_scenarios[scenario], concurrency, args.requests)
+                print_report(scenario, report)
+    finally:
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+import argparse
+import concurrent.futures
+import functools
+import json
+import multiprocessing
+import os.path
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+
+import requests
+
+import minervapy.utils
+import minervapy.configuration
+import minervapy.project
+import minervapy.map
+import minervapy.snapshot
+
+import benchmarks.payloads
+
+_results_dir = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _response(payload, content_type="application/json"):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers["Content-Type"] = content_type
+    response._content = payload
+    response.encoding = "utf-8"
+    return response
+
+
+def _decode(payload, schema_cls, many=False, additional_data=None):
+    content = benchmarks.payloads.to_json_bytes(payload)
+
+    def run():
+        minervapy.utils.response_to_objects(
+            _response(content),
+            schema_cls,
+            many=many,
+            additional_data=additional_data,
+        )
+
+    return run
+
+
+@functools.cache
+def _get_process_pool(max_workers):
+    # kept until exit, as a pool collected without being shut down breaks
+    # the exit handler of concurrent.futures
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _parallel_decode(payload, schema_cls, many=False, threads=4, offload=False):
+    # threads decoding large responses at the same time, inline or in
+    # worker processes
+    content = benchmarks.payloads.to_json_bytes(payload)
+    thread_pool = concurrent.futures.ThreadPoolExecutor(max_workers=threads)
+    process_pool = _get_process_pool(threads) if offload else None
+
+    def decode(_):
+        minervapy.utils.response_to_objects(_response(content), schema_cls, many=many)
+
+    def run():
+        process_pool_, threshold = (
+            minervapy.utils._process_pool,
+            minervapy.utils._offload_threshold,
+        )
+        minervapy.utils._process_pool = process_pool
+        minervapy.utils._offload_threshold = 0
+        try:
+            for _ in thread_pool.map(decode, range(threads)):
+                pass
+        finally:
+            minervapy.utils._process_pool = process_pool_
+            minervapy.utils._offload_threshold = threshold
+
+    return run
+
+
+def _iter_decode(payload, schema_cls, chunk_size=65536):
+    content = benchmarks.payloads.to_json_bytes(payload)
+    chunks = [content[i : i + chunk_size] for i in range(0, len(content), chunk_size)]
+    schema = minervapy.utils.get_schema(schema_cls)
+
+    def run():
+        for json_object in minervapy.utils.iter_json_array(chunks):
+            schema.load(json_object, partial=True)
+
+    return run
+
+
+def _load(payload, schema_cls, many=False):
+    schema = minervapy.utils.get_schema(schema_cls, many=many)
+
+    def run():
+        schema.load(payload, partial=True)
+
+    return run
+
+
+def _construct_maps():
+    maps = benchmarks.payloads.maps(count=500, references=0)
+    for map_ in maps:
+        del map_["authors"], map_["references"]
+
+    def run():
+        for kwargs in maps:
+            minervapy.map.Map(**kwargs)
+
+    return run
+
+
+def _join_urls():
+    urls = [
+        "https://minerva-dev.lcsb.uni.lu/minerva/api/",
+        "projects/",
+        "project_0",
+        "models/",
+        "1000:downloadModel",
+    ]
+
+    def run():
+        minervapy.utils.join_urls(urls)
+
+    return run
+
+
+def _unzip_data():
+    data = benchmarks.payloads.zipped(benchmarks.payloads.celldesigner_map())
+
+    def run():
+        minervapy.utils.unzip_data(data)
+
+    return run
+
+
+def _request_to_data_unzip():
+    data = benchmarks.payloads.zipped(benchmarks.payloads.celldesigner_map())
+    response = _response(data, content_type="application/zip")
+    request_to_response = minervapy.utils.request_to_response
+
+    def run():
+        minervapy.utils.request_to_response = lambda *args, **kwargs: response
+        try:
+            minervapy.utils.request_to_data("http://localhost/")
+        finally:
+            minervapy.utils.request_to_response = request_to_response
+
+    return run
+
+
+def _load_snapshot(payload, schema_cls, many=False):
+    objects = minervapy.utils.get_schema(schema_cls, many=many).load(
+        payload, partial=True
+    )
+    snapshot = minervapy.snapshot.objects_to_snapshot(objects)
+
+    def run():
+        minervapy.snapshot.snapshot_to_objects(snapshot)
+
+    return run
+
+
+def _dump_snapshot(payload, schema_cls, many=False):
+    objects = minervapy.utils.get_schema(schema_cls, many=many).load(
+        payload, partial=True
+    )
+
+    def run():
+        minervapy.snapshot.objects_to_snapshot(objects)
+
+    return run
+
+
+def get_benchmarks():
+    configuration = benchmarks.payloads.configuration(size=3)
+    projects = benchmarks.payloads.projects(count=100, images=2, links=10)
+    maps = benchmarks.payloads.maps()
+    return {
+        "decode_configuration": lambda: _decode(
+            configuration, minervapy.configuration._ConfigurationSchema
+        ),
+        "decode_projects": lambda: _decode(
+            projects, minervapy.project._ProjectSchema, many=True
+        ),
+        "parallel_decode_projects": lambda: _parallel_decode(
+            projects, minervapy.project._ProjectSchema, many=True
+        ),
+        "parallel_decode_projects_offloaded": lambda: _parallel_decode(
+            projects, minervapy.project._ProjectSchema, many=True, offload=True
+        ),
+        "iter_decode_projects": lambda: _iter_decode(
+            projects, minervapy.project._ProjectSchema
+        ),
+        "decode_maps": lambda: _decode(
+            maps,
+            minervapy.map._MapSchema,
+            many=True,
+            additional_data={"projectId": "project_0"},
+        ),
+        "decode_statistics": lambda: _decode(
+            benchmarks.payloads.statistics(), minervapy.project._StatisticsSchema
+        ),
+        "load_projects": lambda: _load(
+            projects, minervapy.project._ProjectSchema, many=True
+        ),
+        "load_snapshot_configuration": lambda: _load_snapshot(
+            configuration, minervapy.configuration._ConfigurationSchema
+        ),
+        "load_snapshot_projects": lambda: _load_snapshot(
+            projects, minervapy.project._ProjectSchema, many=True
+        ),
+        "dump_snapshot_projects": lambda: _dump_snapshot(
+            projects, minervapy.project._ProjectSchema, many=True
+        ),
+        "construct_maps": _construct_maps,
+        "join_urls": _join_urls,
+        "unzip_data": _unzip_data,
+        "request_to_data_unzip": _request_to_data_unzip,
+    }
+
+
+def run_benchmark(function, repeat=5, min_time=0.2):
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    number = max(number, int(number * min_time / 0.2))
+    times = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "median": statistics.median(times),
+        "min": min(times),
+        "max": max(times),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def get_label():
+    try:
+        label = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    if dirty:
+        label = f"{label}-dirty"
+    return label
+
+
+def save_results(results, label, results_dir=_results_dir):
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{label}.json")
+    with open(path, "w") as output_file:
+        json.dump(
+            {
+                "label": label,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "results": results,
+            },
+            output_file,
+            indent=2,
+        )
+    return path
+
+
+def load_results(label_or_path, results_dir=_results_dir):
+    if os.path.exists(label_or_path):
+        path = label_or_path
+    else:
+        path = os.path.join(results_dir, f"{label_or_path}.json")
+    with open(path) as input_file:
+        return json.load(input_file)["results"]
+
+
+def _format_time(seconds):
+    for unit, factor in [("s", 1), ("ms", 1e-3), ("us", 1e-6)]:
+        if seconds >= factor:
+            return f"{seconds / factor:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def print_results(results, baseline=None):
+    for name, result in results.items():
+        line = f"{name:<28}{_format_time(result['median']):>12}"
+        if baseline is not None and name in baseline:
+            ratio = result["median"] / baseline[name]["median"]
+            line = f"{line}{ratio:>10.2f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="run the offline micro-benchmarks of minervapy"
+    )
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--label", default=None, help="default: current commit")
+    parser.add_argument("--compare", default=None, help="label or path of a baseline")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+    benchmarks_ = get_benchmarks()
+    names = args.names or list(benchmarks_)
+    unknown = [name for name in names if name not in benchmarks_]
+    if unknown:
+        sys.exit(f"unknown benchmarks: {', '.join(unknown)}")
+    results = {}
+    for name in names:
+        results[name] = run_benchmark(
+            benchmarks_[name](), repeat=args.repeat, min_time=args.min_time
+        )
+    baseline = load_results(args.compare) if args.compare is not None else None
+    print_results(results, baseline)
+    if not args.no_save:
+        path = save_results(results, args.label or get_label())
+        print(f"results saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
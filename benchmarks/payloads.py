@@ -0,0 +1,352 @@
+import io
+import json
+import random
+import zipfile
+
+# payloads shaped like the responses of a MINERVA instance, generated
+# deterministically so that results are comparable across commits
+
+_annotator_class_names = [
+    "lcsb.mapviewer.annotation.services.annotators.BrendaAnnotator",
+    "lcsb.mapviewer.annotation.services.annotators.ChebiAnnotator",
+    "lcsb.mapviewer.annotation.services.annotators.EnsemblAnnotator",
+    "lcsb.mapviewer.annotation.services.annotators.EntrezAnnotator",
+    "lcsb.mapviewer.annotation.services.annotators.GoAnnotator",
+    "lcsb.mapviewer.annotation.services.annotators.HgncAnnotator",
+    "lcsb.mapviewer.annotation.services.annotators.UniprotAnnotator",
+]
+
+_element_class_names = [
+    "lcsb.mapviewer.model.map.species.Protein",
+    "lcsb.mapviewer.model.map.species.GenericProtein",
+    "lcsb.mapviewer.model.map.species.Gene",
+    "lcsb.mapviewer.model.map.species.Rna",
+    "lcsb.mapviewer.model.map.species.SimpleMolecule",
+    "lcsb.mapviewer.model.map.species.Complex",
+    "lcsb.mapviewer.model.map.species.Phenotype",
+]
+
+_reaction_class_names = [
+    "lcsb.mapviewer.model.map.reaction.type.StateTransitionReaction",
+    "lcsb.mapviewer.model.map.reaction.type.TransportReaction",
+    "lcsb.mapviewer.model.map.reaction.type.HeterodimerAssociationReaction",
+    "lcsb.mapviewer.model.map.reaction.type.DissociationReaction",
+]
+
+_miriam_types = [
+    "CHEBI",
+    "ENSEMBL",
+    "ENTREZ",
+    "GO",
+    "HGNC",
+    "HGNC_SYMBOL",
+    "KEGG_COMPOUND",
+    "PUBMED",
+    "REACTOME",
+    "UNIPROT",
+]
+
+_owners = ["admin", "curator", "anonymous", "lcsb"]
+
+_organisms = ["9606", "10090", "10116", "7955"]
+
+
+def configuration(size=1, seed=0):
+    rng = random.Random(seed)
+    annotators = []
+    for i in range(40 * size):
+        class_name = _annotator_class_names[i % len(_annotator_class_names)]
+        annotators.append(
+            {
+                "name": f"Annotator {i}",
+                "url": f"https://annotator{i}.example.org/",
+                "className": class_name,
+                "elementClassNames": rng.sample(_element_class_names, 3),
+                "description": f"Annotates elements using source {i}",
+                "parameters": [
+                    {
+                        "type": "CONFIG",
+                        "field": None,
+                        "commonName": f"Parameter {j}",
+                        "description": "",
+                        "inputType": "java.lang.String",
+                        "name": f"parameter_{j}",
+                        "value": "true",
+                        "order": j,
+                        "annotation_type": _miriam_types[j % len(_miriam_types)],
+                    }
+                    for j in range(5)
+                ],
+            }
+        )
+    return {
+        "annotators": annotators,
+        "bioEntityFields": [
+            {"commonName": f"Field {i}", "name": f"FIELD_{i}"}
+            for i in range(20)
+        ],
+        "buildDate": "10/04/2024 13:52",
+        "gitHash": "4f3d2e8c2c1bbd3a3f07a2c1a2b9b7c5e3f1d0a9",
+        "version": "17.1.0",
+        "imageFormats": [
+            {
+                "extension": extension,
+                "name": extension.upper(),
+                "handler": f"lcsb.mapviewer.converter.graphics.{extension.capitalize()}ImageGenerator",
+            }
+            for extension in ["png", "pdf", "svg"]
+        ],
+        "mapCanvasTypes": [
+            {"id": "OPEN_LAYERS", "name": "OpenLayers"},
+            {"id": "GOOGLE_MAPS_API", "name": "Google Maps API"},
+        ],
+        "mapTypes": [
+            {"id": "UNKNOWN", "name": "Unknown"},
+            {"id": "DOWNSTREAM_TARGETS", "name": "Downstream targets"},
+            {"id": "PATHWAY", "name": "Pathway"},
+        ],
+        "miriamTypes": {
+            f"{_miriam_types[i % len(_miriam_types)]}_{i}": {
+                "commonName": f"Miriam type {i}",
+                "homepage": f"https://identifiers.org/type{i}",
+                "registryIdentifier": f"MIR:{i:08d}",
+                "uris": [f"urn:miriam:type{i}", f"https://identifiers.org/type{i}/"],
+            }
+            for i in range(300 * size)
+        },
+        "modelFormats": [
+            {
+                "extension": "xml",
+                "extensions": ["xml"],
+                "name": "CellDesigner SBML",
+                "handler": "lcsb.mapviewer.converter.model.celldesigner.CellDesignerXmlParser",
+            },
+            {
+                "extension": "gpml",
+                "extensions": ["gpml"],
+                "name": "GPML",
+                "handler": "lcsb.mapviewer.wikipathway.GpmlParser",
+            },
+        ],
+        "modificationStateTypes": {
+            f"STATE_{i}": {"commonName": f"state {i}", "abbreviation": f"s{i}"}
+            for i in range(12)
+        },
+        "options": [
+            {
+                "idObject": i,
+                "commonName": f"Option {i}",
+                "group": f"Group {i % 8}",
+                "isServerSide": bool(i % 2),
+                "type": f"OPTION_{i}",
+                "value": str(rng.randint(0, 1000)),
+                "valueType": ["STRING", "INTEGER", "BOOLEAN", "COLOR"][i % 4],
+            }
+            for i in range(120 * size)
+        ],
+        "overlayTypes": [{"name": "GENERIC"}, {"name": "GENETIC_VARIANT"}],
+        "privilegeTypes": {
+            f"PRIVILEGE_{i}": {
+                "commonName": f"Privilege {i}",
+                "objectType": "Project" if i % 2 else None,
+                "valueType": "boolean",
+            }
+            for i in range(15)
+        },
+        "reactionTypes": [
+            {
+                "className": class_name,
+                "name": class_name.rsplit(".", 1)[1],
+                "parentClass": "lcsb.mapviewer.model.map.reaction.Reaction",
+            }
+            for class_name in _reaction_class_names * 10 * size
+        ],
+        "unitTypes": [{"name": f"unit {i}", "id": f"UNIT_{i}"} for i in range(30)],
+        "elementTypes": [
+            {
+                "className": class_name,
+                "name": class_name.rsplit(".", 1)[1],
+                "parentClass": "lcsb.mapviewer.model.map.species.Species",
+            }
+            for class_name in _element_class_names * 10 * size
+        ],
+    }
+
+
+def _polygon(rng, width, height):
+    x = rng.uniform(0, width - 100)
+    y = rng.uniform(0, height - 100)
+    w = rng.uniform(20, 100)
+    h = rng.uniform(20, 100)
+    return [
+        {"x": x, "y": y},
+        {"x": x + w, "y": y},
+        {"x": x + w, "y": y + h},
+        {"x": x, "y": y + h},
+    ]
+
+
+def _overview_image(rng, id_object, links):
+    return {
+        "idObject": id_object,
+        "filename": f"overview_{id_object}.png",
+        "width": 1600,
+        "height": 1200,
+        "links": [
+            {
+                "idObject": id_object * 1000 + i,
+                "polygon": _polygon(rng, 1600, 1200),
+                "zoomLevel": rng.randint(3, 7),
+                "modelPoint": {
+                    "x": rng.uniform(0, 10000),
+                    "y": rng.uniform(0, 10000),
+                },
+                "modelLinkId": rng.randint(1, 50),
+                "type": "OverviewModelLink",
+            }
+            for i in range(links)
+        ],
+    }
+
+
+def projects(count=200, images=3, links=20, seed=0):
+    rng = random.Random(seed)
+    projects = []
+    for i in range(count):
+        overview_images = [
+            _overview_image(rng, i * images + j, links) for j in range(images)
+        ]
+        projects.append(
+            {
+                "projectId": f"project_{i}",
+                "name": f"Project {i}",
+                "sharedInMinervaNet": bool(i % 3),
+                "version": f"{i % 5}.0",
+                "owner": _owners[i % len(_owners)],
+                "creationDate": f"20{10 + i % 14:02d}-0{1 + i % 9}-1{i % 10} 10:00:00",
+                "disease": {
+                    "link": "http://id.nlm.nih.gov/mesh/D010300",
+                    "type": "MESH_2012",
+                    "resource": "D010300",
+                    "id": 100 + i,
+                    "annotatorClassName": "",
+                },
+                "organism": {
+                    "link": "https://www.ncbi.nlm.nih.gov/Taxonomy/Browser/wwwtax.cgi?mode=Info&id=9606",
+                    "type": "TAXONOMY",
+                    "resource": _organisms[i % len(_organisms)],
+                    "id": 200 + i,
+                    "annotatorClassName": "",
+                },
+                "directory": f"{i:032x}",
+                "status": "Ok",
+                "progress": 100.0,
+                "notifyEmail": f"owner{i}@example.org",
+                "mapCanvasType": "OPEN_LAYERS",
+                "logEntries": bool(i % 2),
+                "overviewImageViews": overview_images,
+                "topOverviewImage": overview_images[0] if overview_images else None,
+            }
+        )
+    return projects
+
+
+def maps(count=500, references=10, project_id="project_0", seed=0):
+    rng = random.Random(seed)
+    maps = []
+    for i in range(count):
+        maps.append(
+            {
+                "name": f"Map {i}",
+                "description": f"Submap {i} of {project_id}",
+                "idObject": 1000 + i,
+                "width": rng.uniform(1000, 20000),
+                "height": rng.uniform(1000, 20000),
+                "tileSize": 256,
+                "defaultCenterX": None,
+                "defaultCenterY": None,
+                "defaultZoomLevel": None,
+                "minZoom": 2,
+                "maxZoom": 9,
+                "authors": [
+                    {
+                        "firstName": f"First{j}",
+                        "lastName": f"Last{j}",
+                        "email": f"author{j}@example.org",
+                        "organisation": "LCSB",
+                    }
+                    for j in range(rng.randint(0, 3))
+                ],
+                "references": [
+                    {
+                        "link": f"https://pubmed.ncbi.nlm.nih.gov/{30000000 + i * references + j}",
+                        "article": {
+                            "title": f"Article {j} about map {i}",
+                            "authors": [f"Author {k}" for k in range(4)],
+                            "journal": "Nature",
+                            "year": 2000 + j % 24,
+                            "link": f"https://pubmed.ncbi.nlm.nih.gov/{30000000 + i * references + j}",
+                            "pubmedId": str(30000000 + i * references + j),
+                            "citationCount": rng.randint(0, 500),
+                        },
+                        "type": "PUBMED",
+                        "resource": str(30000000 + i * references + j),
+                        "id": i * references + j,
+                        "annotatorClassName": "",
+                    }
+                    for j in range(references)
+                ],
+                "creationDate": "2024-01-01 10:00:00",
+                "modificationDates": ["2024-02-01 10:00:00"],
+            }
+        )
+    return maps
+
+
+def statistics(annotation_types=10, seed=0):
+    rng = random.Random(seed)
+    return {
+        "publications": rng.randint(0, 1000),
+        "reactionAnnotations": {
+            _miriam_types[i % len(_miriam_types)]: rng.randint(0, 5000)
+            for i in range(annotation_types)
+        },
+        "elementAnnotations": {
+            _miriam_types[i % len(_miriam_types)]: rng.randint(0, 5000)
+            for i in range(annotation_types)
+        },
+    }
+
+
+def celldesigner_map(species=2000, seed=0):
+    rng = random.Random(seed)
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<sbml xmlns="http://www.sbml.org/sbml/level2/version4" '
+        'xmlns:celldesigner="http://www.sbml.org/2001/ns/celldesigner" '
+        'level="2" version="4">',
+        '<model metaid="untitled" id="untitled">',
+        "<listOfSpecies>",
+    ]
+    for i in range(species):
+        lines.append(
+            f'<species metaid="s{i}" id="s{i}" name="species {i}" '
+            f'compartment="default" initialAmount="{rng.randint(0, 10)}">'
+            "<annotation><celldesigner:extension>"
+            "<celldesigner:speciesIdentity><celldesigner:class>PROTEIN"
+            "</celldesigner:class></celldesigner:speciesIdentity>"
+            "</celldesigner:extension></annotation></species>"
+        )
+    lines += ["</listOfSpecies>", "</model>", "</sbml>"]
+    return "\n".join(lines).encode("utf-8")
+
+
+def zipped(data, name="model.xml"):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr(name, data)
+    return buffer.getvalue()
+
+
+def to_json_bytes(payload):
+    return json.dumps(payload).encode("utf-8")
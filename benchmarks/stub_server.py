@@ -0,0 +1,513 @@
+import argparse
+import collections
+import hashlib
+import http.cookies
+import http.server
+import json
+import random
+import re
+import secrets
+import threading
+import time
+import urllib.parse
+import zlib
+
+import benchmarks.payloads
+
+# a local stand-in for the endpoints of the MINERVA API used by minervapy,
+# with configurable latency, payload size and error injection
+
+_cookie_name = "MINERVA_AUTH_TOKEN"
+
+_model_formats = [
+    "lcsb.mapviewer.converter.model.sbgnml.SbgnmlXmlConverter",
+    "lcsb.mapviewer.converter.model.celldesigner.CellDesignerXmlParser",
+    "lcsb.mapviewer.converter.model.sbml.SbmlParser",
+    "lcsb.mapviewer.wikipathway.GpmlParser",
+]
+
+_image_formats = [
+    "lcsb.mapviewer.converter.graphics.PngImageGenerator",
+    "lcsb.mapviewer.converter.graphics.PdfImageGenerator",
+    "lcsb.mapviewer.converter.graphics.SvgImageGenerator",
+]
+
+_range_pattern = re.compile(r"bytes=(\d+)-(\d*)")
+
+_png_header = b"\x89PNG\r\n\x1a\n"
+
+
+class StubServer:
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        projects=10,
+        maps=5,
+        species=200,
+        image_size=64 * 1024,
+        users=None,
+        require_login=False,
+        session_lifetime=None,
+        accept_compressed=True,
+        decode_compressed=True,
+        accept_ranges=True,
+        send_validators=True,
+        seed=0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.species = species
+        self.image_size = image_size
+        self.users = users if users is not None else {"admin": "admin"}
+        self.require_login = require_login
+        self.session_lifetime = session_lifetime
+        self.accept_compressed = accept_compressed
+        # when False, compressed bodies are accepted but kept as they are,
+        # like servers that ignore Content-Encoding
+        self.decode_compressed = decode_compressed
+        self.accept_ranges = accept_ranges
+        self.send_validators = send_validators
+        self.received_bytes = 0
+        self.sent_bytes = 0
+        self.request_counts = collections.Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sessions = {}
+        self._files = {}
+        self._forced_errors = collections.deque()
+        self._configuration = benchmarks.payloads.configuration(seed=seed)
+        self._projects = benchmarks.payloads.projects(
+            count=projects, images=2, links=10, seed=seed
+        )
+        self._maps = {
+            project["projectId"]: benchmarks.payloads.maps(
+                count=maps, references=3, project_id=project["projectId"], seed=seed
+            )
+            for project in self._projects
+        }
+        self._httpd = http.server.ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/minerva/api/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def fail_next(self, count=1, status=500, error="Injected error."):
+        with self._lock:
+            self._forced_errors.extend([(status, error)] * count)
+
+    def expire_sessions(self):
+        with self._lock:
+            self._sessions.clear()
+
+    def reset_counts(self):
+        with self._lock:
+            self.request_counts.clear()
+            self.received_bytes = 0
+            self.sent_bytes = 0
+
+    def _delay(self):
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _injected_error(self):
+        with self._lock:
+            if self._forced_errors:
+                return self._forced_errors.popleft()
+            if self.error_rate > 0 and self._random.random() < self.error_rate:
+                return (500, "Injected error.")
+        return None
+
+    def _is_logged_in(self, token):
+        with self._lock:
+            created = self._sessions.get(token)
+        if created is None:
+            return False
+        if self.session_lifetime is not None:
+            return time.monotonic() - created < self.session_lifetime
+        return True
+
+
+def _make_handler(server):
+    routes = [
+        ("POST", r"doLogin", _do_login),
+        ("GET", r"doLogout", _do_logout),
+        ("GET", r"users/isSessionValid", _is_session_valid),
+        ("GET", r"configuration/?", _configuration),
+        ("GET", r"configuration/options/?", _options),
+        ("GET", r"projects/?", _projects),
+        ("GET", r"projects/(?P<project_id>[^/:]+):downloadSource", _download_source),
+        ("GET", r"projects/(?P<project_id>[^/:]+)/?", _project),
+        ("GET", r"projects/(?P<project_id>[^/:]+)/statistics/?", _statistics),
+        ("GET", r"projects/(?P<project_id>[^/:]+)/models/?", _maps),
+        ("GET", r"projects/(?P<project_id>[^/:]+)/models/(?P<map_id>\d+)/?", _map),
+        (
+            "GET|POST",
+            r"projects/(?P<project_id>[^/:]+)/models/(?P<map_id>\d+):downloadModel",
+            _download_model,
+        ),
+        (
+            "GET|POST",
+            r"projects/(?P<project_id>[^/:]+)/models/(?P<map_id>\d+):downloadImage",
+            _download_image,
+        ),
+        ("GET", r"convert/?", _convert_formats),
+        ("GET", r"convert/image/?", _convert_image_formats),
+        (
+            "POST",
+            r"convert/(?P<input_format>[^:/]+):(?P<output_format>[^:/]+)",
+            _convert,
+        ),
+        (
+            "POST",
+            r"convert/image/(?P<input_format>[^:/]+):(?P<output_format>[^:/]+)",
+            _convert_image,
+        ),
+        ("POST", r"files/?", _create_file),
+        ("POST", r"files/(?P<file_id>\d+):uploadContent", _upload_content),
+        ("GET", r"files/(?P<file_id>\d+)", _get_file),
+    ]
+    routes = [
+        (methods.split("|"), re.compile(f"/minerva/api/{pattern}"), function)
+        for methods, pattern, function in routes
+    ]
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            self._dispatch("GET")
+
+        def do_POST(self):
+            self._dispatch("POST")
+
+        def _dispatch(self, method):
+            parsed_url = urllib.parse.urlsplit(self.path)
+            query = dict(urllib.parse.parse_qsl(parsed_url.query))
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            with server._lock:
+                server.received_bytes += len(body)
+            content_encoding = self.headers.get("Content-Encoding")
+            if content_encoding is not None:
+                if not server.accept_compressed or content_encoding not in [
+                    "gzip",
+                    "deflate",
+                ]:
+                    return self.send_json(
+                        {"error": "Unsupported content encoding."}, 415
+                    )
+                if server.decode_compressed:
+                    body = zlib.decompress(
+                        body, 31 if content_encoding == "gzip" else 15
+                    )
+            if (
+                self.headers.get("Content-Type", "").startswith(
+                    "application/x-www-form-urlencoded"
+                )
+                and body
+            ):
+                query.update(urllib.parse.parse_qsl(body.decode("utf-8")))
+            with server._lock:
+                server.request_counts[parsed_url.path] += 1
+            server._delay()
+            injected_error = server._injected_error()
+            if injected_error is not None:
+                status, error = injected_error
+                return self.send_json({"error": error}, status)
+            for methods, pattern, function in routes:
+                match = pattern.fullmatch(parsed_url.path)
+                if match is not None and method in methods:
+                    if function is not _do_login and not self._check_access():
+                        return self.send_json(
+                            {"error": "Access denied.", "reason": "Session expired"},
+                            403,
+                        )
+                    return function(server, self, query, body, **match.groupdict())
+            self.send_json({"error": "Object not found."}, 404)
+
+        def _check_access(self):
+            token = self.get_token()
+            if token is not None:
+                return server._is_logged_in(token)
+            return not server.require_login
+
+        def get_token(self):
+            cookies = http.cookies.SimpleCookie(self.headers.get("Cookie", ""))
+            morsel = cookies.get(_cookie_name)
+            return morsel.value if morsel is not None else None
+
+        def send_data(self, data, content_type, status=200, headers=None):
+            if (
+                server.accept_ranges
+                and self.command == "GET"
+                and status == 200
+                and content_type != "application/json"
+            ):
+                headers = dict(headers or {})
+                headers["Accept-Ranges"] = "bytes"
+                if server.send_validators:
+                    headers["ETag"] = f'"{hashlib.sha1(data).hexdigest()}"'
+                match = _range_pattern.fullmatch(self.headers.get("Range", ""))
+                if match is not None and int(match.group(1)) < len(data):
+                    start = int(match.group(1))
+                    end = min(int(match.group(2) or len(data) - 1), len(data) - 1)
+                    headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+                    data = data[start : end + 1]
+                    status = 206
+            with server._lock:
+                server.sent_bytes += len(data)
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def send_json(self, payload, status=200, headers=None):
+            self.send_data(
+                json.dumps(payload).encode("utf-8"),
+                "application/json",
+                status=status,
+                headers=headers,
+            )
+
+    return Handler
+
+
+def _find_project(server, project_id):
+    for project in server._projects:
+        if project["projectId"] == project_id:
+            return project
+    return None
+
+
+def _find_map(server, project_id, map_id):
+    for map_ in server._maps.get(project_id, []):
+        if map_["idObject"] == int(map_id):
+            return map_
+    return None
+
+
+def _not_found(handler):
+    handler.send_json({"error": "Object not found."}, 404)
+
+
+def _do_login(server, handler, query, body):
+    login = query.get("login")
+    if login is None or server.users.get(login) != query.get("password"):
+        return handler.send_json({"error": "Invalid credentials"}, 403)
+    token = secrets.token_hex(16)
+    with server._lock:
+        server._sessions[token] = time.monotonic()
+    handler.send_json(
+        {"info": "Login successful.", "login": login, "token": token},
+        headers={"Set-Cookie": f"{_cookie_name}={token}; Path=/"},
+    )
+
+
+def _do_logout(server, handler, query, body):
+    token = handler.get_token()
+    with server._lock:
+        server._sessions.pop(token, None)
+    handler.send_json({"status": "OK"})
+
+
+def _is_session_valid(server, handler, query, body):
+    token = handler.get_token()
+    if token is None or not server._is_logged_in(token):
+        return handler.send_json({"error": "Access denied."}, 403)
+    handler.send_json({"login": "admin"})
+
+
+def _configuration(server, handler, query, body):
+    handler.send_json(server._configuration)
+
+
+def _options(server, handler, query, body):
+    handler.send_json(server._configuration["options"])
+
+
+def _projects(server, handler, query, body):
+    handler.send_json(server._projects)
+
+
+def _project(server, handler, query, body, project_id):
+    project = _find_project(server, project_id)
+    if project is None:
+        return _not_found(handler)
+    handler.send_json(project)
+
+
+def _statistics(server, handler, query, body, project_id):
+    if _find_project(server, project_id) is None:
+        return _not_found(handler)
+    handler.send_json(benchmarks.payloads.statistics(seed=sum(map(ord, project_id))))
+
+
+def _download_source(server, handler, query, body, project_id):
+    if _find_project(server, project_id) is None:
+        return _not_found(handler)
+    data = benchmarks.payloads.celldesigner_map(species=server.species)
+    handler.send_data(benchmarks.payloads.zipped(data), "application/zip")
+
+
+def _maps(server, handler, query, body, project_id):
+    if _find_project(server, project_id) is None:
+        return _not_found(handler)
+    handler.send_json(server._maps[project_id])
+
+
+def _map(server, handler, query, body, project_id, map_id):
+    map_ = _find_map(server, project_id, map_id)
+    if map_ is None:
+        return _not_found(handler)
+    handler.send_json(map_)
+
+
+def _download_model(server, handler, query, body, project_id, map_id):
+    if _find_map(server, project_id, map_id) is None:
+        return _not_found(handler)
+    data = benchmarks.payloads.celldesigner_map(species=server.species)
+    handler.send_data(benchmarks.payloads.zipped(data), "application/zip")
+
+
+def _download_image(server, handler, query, body, project_id, map_id):
+    if _find_map(server, project_id, map_id) is None:
+        return _not_found(handler)
+    data = _png_header + bytes(max(server.image_size - len(_png_header), 0))
+    handler.send_data(data, "image/png")
+
+
+def _formats(input_formats, output_formats):
+    return {
+        "inputs": [{"available_names": [name]} for name in input_formats],
+        "outputs": [{"available_names": [name]} for name in output_formats],
+    }
+
+
+def _convert_formats(server, handler, query, body):
+    handler.send_json(_formats(_model_formats, _model_formats))
+
+
+def _convert_image_formats(server, handler, query, body):
+    handler.send_json(_formats(_model_formats, _image_formats))
+
+
+def _convert(server, handler, query, body, input_format, output_format):
+    if input_format not in _model_formats or output_format not in _model_formats:
+        return handler.send_json({"error": "Unknown format."}, 400)
+    handler.send_data(body, "application/xml")
+
+
+def _convert_image(server, handler, query, body, input_format, output_format):
+    if input_format not in _model_formats or output_format not in _image_formats:
+        return handler.send_json({"error": "Unknown format."}, 400)
+    data = _png_header + bytes(max(server.image_size - len(_png_header), 0))
+    handler.send_data(data, "image/png")
+
+
+def _file_to_json(file):
+    return {
+        "id": file["id"],
+        "filename": file["filename"],
+        "length": file["length"],
+        "owner": "admin",
+        "uploadedDataLength": len(file["content"]),
+    }
+
+
+def _create_file(server, handler, query, body):
+    with server._lock:
+        file_id = len(server._files) + 1
+        file = {
+            "id": file_id,
+            "filename": query.get("filename"),
+            "length": int(query.get("length", 0)),
+            "content": b"",
+        }
+        server._files[file_id] = file
+    handler.send_json(_file_to_json(file))
+
+
+def _upload_content(server, handler, query, body, file_id):
+    with server._lock:
+        file = server._files.get(int(file_id))
+        if file is not None:
+            file["content"] += body
+    if file is None:
+        return _not_found(handler)
+    handler.send_json(_file_to_json(file))
+
+
+def _get_file(server, handler, query, body, file_id):
+    with server._lock:
+        file = server._files.get(int(file_id))
+    if file is None:
+        return _not_found(handler)
+    handler.send_json(_file_to_json(file))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run a local MINERVA stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--maps", type=int, default=5)
+    parser.add_argument("--species", type=int, default=200)
+    parser.add_argument("--image-size", type=int, default=64 * 1024)
+    args = parser.parse_args()
+    server = StubServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        projects=args.projects,
+        maps=args.maps,
+        species=args.species,
+        image_size=args.image_size,
+    )
+    print(f"serving on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,165 @@
-from .configuration import *
-from .conversion import *
-from .files import *
-from .map import *
-from .project import *
-from .session import *
+import importlib
+
+# submodules and their public attributes are imported on first access, so
+# that importing minervapy does not pay for requests, marshmallow and the
+# schemas of every submodule
+
+_submodules = [
+    "catalog",
+    "configuration",
+    "conversion",
+    "deadline",
+    "files",
+    "geometry",
+    "map",
+    "profiling",
+    "progress",
+    "project",
+    "render",
+    "session",
+    "snapshot",
+    "store",
+    "transfer",
+    "utils",
+    "warmup",
+]
+
+_attribute_to_submodule = {
+    "Catalog": "catalog",
+    "RefreshResult": "catalog",
+    "Annotator": "configuration",
+    "BioEntityField": "configuration",
+    "Configuration": "configuration",
+    "ElementType": "configuration",
+    "ImageFormat": "configuration",
+    "MapCanvasType": "configuration",
+    "MapType": "configuration",
+    "MiriamType": "configuration",
+    "ModelFormat": "configuration",
+    "MofidicationStateType": "configuration",
+    "Option": "configuration",
+    "OverlayType": "configuration",
+    "Parameter": "configuration",
+    "PrivilegeType": "configuration",
+    "ReactionType": "configuration",
+    "UnitType": "configuration",
+    "get_configuration": "configuration",
+    "get_options": "configuration",
+    "clear_formats_cache": "conversion",
+    "convert": "conversion",
+    "convert_files": "conversion",
+    "get_conversion_graph": "conversion",
+    "get_formats": "conversion",
+    "plan_conversion": "conversion",
+    "sniff_format": "conversion",
+    "DeadlineExceeded": "deadline",
+    "check_deadline": "deadline",
+    "get_default_timeout": "deadline",
+    "get_remaining_time": "deadline",
+    "set_default_timeout": "deadline",
+    "timeout": "deadline",
+    "File": "files",
+    "FileStatusTable": "files",
+    "create_new_file": "files",
+    "files_to_status_table": "files",
+    "get_file": "files",
+    "get_file_status_table": "files",
+    "get_files": "files",
+    "upload_content_to_file": "files",
+    "upload_file": "files",
+    "upload_files": "files",
+    "LinkIndex": "geometry",
+    "bounding_box": "geometry",
+    "point_in_polygon": "geometry",
+    "point_to_tuple": "geometry",
+    "points_in_polygon": "geometry",
+    "polygon_area": "geometry",
+    "polygon_to_rectangle": "geometry",
+    "round_polygon": "geometry",
+    "simplify_polygon": "geometry",
+    "Article": "map",
+    "Author": "map",
+    "Map": "map",
+    "Reference": "map",
+    "SelectionChunk": "map",
+    "SelectionExport": "map",
+    "chunk_selection": "map",
+    "download_selection": "map",
+    "download_map": "map",
+    "get_map": "map",
+    "get_maps": "map",
+    "iter_maps": "map",
+    "Call": "profiling",
+    "Phase": "profiling",
+    "Profiler": "profiling",
+    "is_profiling": "profiling",
+    "profile": "profiling",
+    "Progress": "progress",
+    "to_progress": "progress",
+    "Disease": "project",
+    "Link": "project",
+    "Organism": "project",
+    "OverviewImage": "project",
+    "Point": "project",
+    "Project": "project",
+    "Statistics": "project",
+    "StatisticsTable": "project",
+    "download_source": "project",
+    "get_project": "project",
+    "get_projects": "project",
+    "get_statistics": "project",
+    "get_statistics_table": "project",
+    "iter_projects": "project",
+    "statistics_to_table": "project",
+    "RenderScheduler": "render",
+    "RenderStatistics": "render",
+    "get_auth_cookies": "session",
+    "get_base_url": "session",
+    "get_renewal_interval": "session",
+    "is_session_valid": "session",
+    "log_in": "session",
+    "log_out": "session",
+    "add_session_listener": "session",
+    "remove_session_listener": "session",
+    "renew_session": "session",
+    "set_auth_cookies": "session",
+    "set_base_url": "session",
+    "set_renewal_interval": "session",
+    "load_snapshot": "snapshot",
+    "objects_to_snapshot": "snapshot",
+    "save_snapshot": "snapshot",
+    "snapshot_to_objects": "snapshot",
+    "Artifact": "store",
+    "ArtifactStore": "store",
+    "GarbageCollection": "store",
+    "get_artifact_store": "store",
+    "set_artifact_store": "store",
+    "DownloadState": "transfer",
+    "download_to_file": "transfer",
+    "download_to_path": "transfer",
+    "WarmUp": "warmup",
+    "disable_warm_up": "warmup",
+    "enable_warm_up": "warmup",
+    "get_warm_up": "warmup",
+    "is_ready": "warmup",
+    "start_warm_up": "warmup",
+    "wait_until_ready": "warmup",
+}
+
+__all__ = list(_attribute_to_submodule)
+
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module(f".{name}", __name__)
+    submodule_name = _attribute_to_submodule.get(name)
+    if submodule_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    submodule = importlib.import_module(f".{submodule_name}", __name__)
+    value = getattr(submodule, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_submodules) | set(__all__))
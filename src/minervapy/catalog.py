@@ -0,0 +1,391 @@
+import concurrent.futures
+import dataclasses
+import datetime
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+import minervapy.configuration
+import minervapy.map
+import minervapy.project
+import minervapy.utils
+import minervapy.deadline
+
+_schema = """
+CREATE TABLE IF NOT EXISTS projects (
+    project_id TEXT PRIMARY KEY,
+    name TEXT,
+    owner TEXT,
+    organism TEXT,
+    disease TEXT,
+    creation_date TEXT,
+    status TEXT,
+    fingerprint TEXT NOT NULL,
+    data TEXT NOT NULL,
+    maps_loaded INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS projects_owner ON projects (owner);
+CREATE INDEX IF NOT EXISTS projects_organism ON projects (organism);
+CREATE INDEX IF NOT EXISTS projects_disease ON projects (disease);
+CREATE INDEX IF NOT EXISTS projects_creation_date ON projects (creation_date);
+CREATE TABLE IF NOT EXISTS maps (
+    project_id TEXT NOT NULL,
+    map_id INTEGER NOT NULL,
+    name TEXT,
+    creation_date TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (project_id, map_id)
+);
+CREATE INDEX IF NOT EXISTS maps_name ON maps (name);
+CREATE TABLE IF NOT EXISTS map_authors (
+    project_id TEXT NOT NULL,
+    map_id INTEGER NOT NULL,
+    first_name TEXT,
+    last_name TEXT,
+    email TEXT,
+    organisation TEXT
+);
+CREATE INDEX IF NOT EXISTS map_authors_map ON map_authors (project_id, map_id);
+CREATE INDEX IF NOT EXISTS map_authors_last_name ON map_authors (last_name);
+CREATE TABLE IF NOT EXISTS map_references (
+    project_id TEXT NOT NULL,
+    map_id INTEGER NOT NULL,
+    type TEXT,
+    resource TEXT
+);
+CREATE INDEX IF NOT EXISTS map_references_map ON map_references (project_id, map_id);
+CREATE INDEX IF NOT EXISTS map_references_resource ON map_references (type, resource);
+CREATE TABLE IF NOT EXISTS options (
+    type TEXT PRIMARY KEY,
+    option_group TEXT,
+    value TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS options_group ON options (option_group);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+@dataclasses.dataclass
+class RefreshResult:
+    added: list[str] = dataclasses.field(default_factory=list)
+    updated: list[str] = dataclasses.field(default_factory=list)
+    removed: list[str] = dataclasses.field(default_factory=list)
+    unchanged: int = 0
+    options: int = 0
+
+
+class Catalog:
+    # local SQLite index of the projects, maps and options of the current
+    # MINERVA instance; queries return the same dataclasses as the API
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.executescript(_schema)
+            # catalogs created before maps_loaded existed refetch all maps
+            columns = [
+                row[1]
+                for row in self._connection.execute("PRAGMA table_info(projects)")
+            ]
+            if "maps_loaded" not in columns:
+                self._connection.execute(
+                    "ALTER TABLE projects ADD COLUMN maps_loaded "
+                    "INTEGER NOT NULL DEFAULT 0"
+                )
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def refresh(self, maps=True, options=True, max_workers=8):
+        # only projects that are new or whose description changed since the
+        # last refresh have their maps fetched again, along with unchanged
+        # projects whose maps were not fetched yet
+        projects = minervapy.project.get_projects()
+        with self._lock:
+            fingerprints = {
+                project_id: (fingerprint, maps_loaded)
+                for project_id, fingerprint, maps_loaded in self._connection.execute(
+                    "SELECT project_id, fingerprint, maps_loaded FROM projects"
+                )
+            }
+        result = RefreshResult()
+        changed_projects = []
+        map_project_ids = []
+        for project in projects:
+            fingerprint = _fingerprint(project)
+            old_fingerprint, maps_loaded = fingerprints.pop(
+                project.projectId, (None, False)
+            )
+            if old_fingerprint == fingerprint:
+                result.unchanged += 1
+                if maps and not maps_loaded:
+                    map_project_ids.append(project.projectId)
+                continue
+            if old_fingerprint is None:
+                result.added.append(project.projectId)
+            else:
+                result.updated.append(project.projectId)
+            changed_projects.append((project, fingerprint))
+            if maps:
+                map_project_ids.append(project.projectId)
+        result.removed = list(fingerprints)
+        project_maps = {}
+        if map_project_ids:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers
+            ) as executor:
+                for project_id, project_maps_list in zip(
+                    map_project_ids,
+                    executor.map(
+                        minervapy.deadline._bind(minervapy.map.get_maps),
+                        map_project_ids,
+                    ),
+                ):
+                    project_maps[project_id] = project_maps_list
+        options_list = minervapy.configuration.get_options() if options else None
+        with self._lock, self._connection:
+            for project_id in result.removed:
+                self._delete_project(project_id)
+            for project, fingerprint in changed_projects:
+                self._insert_project(project, fingerprint)
+            for project_id, project_maps_list in project_maps.items():
+                self._replace_maps(project_id, project_maps_list)
+            if options_list is not None:
+                self._replace_options(options_list)
+                result.options = len(options_list)
+            self._connection.execute(
+                "INSERT OR REPLACE INTO metadata VALUES ('refreshed_at', ?)",
+                (str(time.time()),),
+            )
+        return result
+
+    def _delete_project(self, project_id):
+        for table in ["projects", "maps", "map_authors", "map_references"]:
+            self._connection.execute(
+                f"DELETE FROM {table} WHERE project_id = ?", (project_id,)
+            )
+
+    def _insert_project(self, project, fingerprint):
+        organism = project.organism
+        if organism is not None and not isinstance(organism, str):
+            organism = organism.resource
+        disease = project.disease.resource if project.disease is not None else None
+        self._connection.execute(
+            "INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+            (
+                project.projectId,
+                project.name,
+                project.owner,
+                organism,
+                disease,
+                project.creationDate,
+                project.status,
+                fingerprint,
+                _to_json(project),
+            ),
+        )
+
+    def _replace_maps(self, project_id, maps):
+        for table in ["maps", "map_authors", "map_references"]:
+            self._connection.execute(
+                f"DELETE FROM {table} WHERE project_id = ?", (project_id,)
+            )
+        self._connection.executemany(
+            "INSERT INTO maps VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    project_id,
+                    map_.idObject,
+                    map_.name,
+                    map_.creationDate,
+                    _to_json(map_),
+                )
+                for map_ in maps
+            ],
+        )
+        self._connection.executemany(
+            "INSERT INTO map_authors VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    project_id,
+                    map_.idObject,
+                    author.firstName,
+                    author.lastName,
+                    author.email,
+                    author.organisation,
+                )
+                for map_ in maps
+                for author in map_.authors or []
+            ],
+        )
+        self._connection.executemany(
+            "INSERT INTO map_references VALUES (?, ?, ?, ?)",
+            [
+                (project_id, map_.idObject, reference.type, reference.resource)
+                for map_ in maps
+                for reference in map_.references or []
+            ],
+        )
+        self._connection.execute(
+            "UPDATE projects SET maps_loaded = 1 WHERE project_id = ?", (project_id,)
+        )
+
+    def _replace_options(self, options):
+        self._connection.execute("DELETE FROM options")
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO options VALUES (?, ?, ?, ?)",
+            [
+                (option.type, option.group, option.value, _to_json(option))
+                for option in options
+            ],
+        )
+
+    def _query(self, query, parameters):
+        with self._lock:
+            return self._connection.execute(query, parameters).fetchall()
+
+    def get_refresh_time(self):
+        rows = self._query("SELECT value FROM metadata WHERE key = 'refreshed_at'", ())
+        if not rows:
+            return None
+        return float(rows[0][0])
+
+    def get_projects(
+        self,
+        owner=None,
+        organism=None,
+        disease=None,
+        created_after=None,
+        created_before=None,
+        status=None,
+    ):
+        conditions, parameters = _conditions(
+            [
+                ("owner = ?", owner),
+                ("organism = ?", organism),
+                ("disease = ?", disease),
+                ("creation_date > ?", _date_to_str(created_after)),
+                ("creation_date < ?", _date_to_str(created_before)),
+                ("status = ?", status),
+            ]
+        )
+        rows = self._query(
+            f"SELECT data FROM projects{conditions} ORDER BY project_id", parameters
+        )
+        return _load_rows(rows, minervapy.project._ProjectSchema)
+
+    def get_project(self, project_id):
+        rows = self._query(
+            "SELECT data FROM projects WHERE project_id = ?", (project_id,)
+        )
+        projects = _load_rows(rows, minervapy.project._ProjectSchema)
+        return projects[0] if projects else None
+
+    def get_maps(
+        self,
+        project_or_project_id=None,
+        name=None,
+        owner=None,
+        organism=None,
+        disease=None,
+        author_last_name=None,
+        reference_type=None,
+        reference_resource=None,
+    ):
+        if isinstance(project_or_project_id, minervapy.project.Project):
+            project_id = project_or_project_id.projectId
+        else:
+            project_id = project_or_project_id
+        conditions, parameters = _conditions(
+            [
+                ("maps.project_id = ?", project_id),
+                ("maps.name = ?", name),
+                ("projects.owner = ?", owner),
+                ("projects.organism = ?", organism),
+                ("projects.disease = ?", disease),
+                (
+                    "EXISTS (SELECT 1 FROM map_authors WHERE "
+                    "map_authors.project_id = maps.project_id AND "
+                    "map_authors.map_id = maps.map_id AND last_name = ?)",
+                    author_last_name,
+                ),
+                (
+                    "EXISTS (SELECT 1 FROM map_references WHERE "
+                    "map_references.project_id = maps.project_id AND "
+                    "map_references.map_id = maps.map_id AND type = ?)",
+                    reference_type,
+                ),
+                (
+                    "EXISTS (SELECT 1 FROM map_references WHERE "
+                    "map_references.project_id = maps.project_id AND "
+                    "map_references.map_id = maps.map_id AND resource = ?)",
+                    reference_resource,
+                ),
+            ]
+        )
+        rows = self._query(
+            "SELECT maps.data FROM maps JOIN projects "
+            f"ON projects.project_id = maps.project_id{conditions} "
+            "ORDER BY maps.project_id, maps.map_id",
+            parameters,
+        )
+        return _load_rows(rows, minervapy.map._MapSchema)
+
+    def get_options(self, group=None):
+        conditions, parameters = _conditions([("option_group = ?", group)])
+        rows = self._query(
+            f"SELECT data FROM options{conditions} ORDER BY type", parameters
+        )
+        return _load_rows(rows, minervapy.configuration._OptionSchema)
+
+    def get_option(self, option_type):
+        rows = self._query("SELECT data FROM options WHERE type = ?", (option_type,))
+        options = _load_rows(rows, minervapy.configuration._OptionSchema)
+        return options[0] if options else None
+
+
+def _to_json(obj):
+    return json.dumps(dataclasses.asdict(obj), sort_keys=True)
+
+
+def _fingerprint(obj):
+    return hashlib.sha1(_to_json(obj).encode("utf-8")).hexdigest()
+
+
+def _load_rows(rows, schema_cls):
+    schema = minervapy.utils.get_schema(schema_cls, many=True)
+    return schema.load([json.loads(row[0]) for row in rows], partial=True)
+
+
+def _conditions(conditions):
+    clauses = []
+    parameters = []
+    for clause, value in conditions:
+        if value is not None:
+            clauses.append(clause)
+            parameters.append(value)
+    if not clauses:
+        return "", ()
+    return f" WHERE {' AND '.join(clauses)}", tuple(parameters)
+
+
+def _date_to_str(date):
+    if isinstance(date, datetime.datetime):
+        return date.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(date, datetime.date):
+        return date.strftime("%Y-%m-%d")
+    return date
@@ -181,7 +181,7 @@ class _ParameterSchema(marshmallow.Schema):
     name = marshmallow.fields.String(required=False, allow_none=True)
     value = marshmallow.fields.String(required=False, allow_none=True)
     order = marshmallow.fields.Float(required=False, allow_none=True)
-    type = marshmallow.fields.String(required=False, allow_none=True)
+    type = minervapy.utils.InternedString(required=False, allow_none=True)
 
     @marshmallow.post_load
     def make(self, data, **kwargs):
@@ -191,7 +191,7 @@ class _ParameterSchema(marshmallow.Schema):
 class _AnnotatorSchema(marshmallow.Schema):
     name = marshmallow.fields.String(required=False, allow_none=True)
     url = marshmallow.fields.String(required=False, allow_none=True)
-    className = marshmallow.fields.String(required=False, allow_none=True)
+    className = minervapy.utils.InternedString(required=False, allow_none=True)
     elementClassNames = marshmallow.fields.List(
         marshmallow.fields.String(), required=False, allow_none=True
     )
@@ -217,9 +217,9 @@ class _BioEntityFieldSchema(marshmallow.Schema):
 
 
 class _ElementTypeSchema(marshmallow.Schema):
-    className = marshmallow.fields.String(required=False, allow_none=True)
+    className = minervapy.utils.InternedString(required=False, allow_none=True)
     name = marshmallow.fields.String(required=False, allow_none=True)
-    parentClass = marshmallow.fields.String(required=False, allow_none=True)
+    parentClass = minervapy.utils.InternedString(required=False, allow_none=True)
 
     @marshmallow.post_load
     def make(self, data, **kwargs):
@@ -227,9 +227,9 @@ class _ElementTypeSchema(marshmallow.Schema):
 
 
 class _ImageFormatSchema(marshmallow.Schema):
-    extension = marshmallow.fields.String(required=False, allow_none=True)
+    extension = minervapy.utils.InternedString(required=False, allow_none=True)
     name = marshmallow.fields.String(required=False, allow_none=True)
-    handler = marshmallow.fields.String(required=False, allow_none=True)
+    handler = minervapy.utils.InternedString(required=False, allow_none=True)
 
     @marshmallow.post_load
     def make(self, data, **kwargs):
@@ -255,12 +255,12 @@ class _MapTypeSchema(marshmallow.Schema):
 
 
 class _ModelFormatSchema(marshmallow.Schema):
-    extension = marshmallow.fields.String(required=False, allow_none=True)
+    extension = minervapy.utils.InternedString(required=False, allow_none=True)
     extensions = marshmallow.fields.List(
         marshmallow.fields.String(), required=False, allow_none=True
     )  # not in the doc
     name = marshmallow.fields.String(required=False, allow_none=True)
-    handler = marshmallow.fields.String(required=False, allow_none=True)
+    handler = minervapy.utils.InternedString(required=False, allow_none=True)
 
     @marshmallow.post_load
     def make(self, data, **kwargs):
@@ -309,9 +309,9 @@ class _PrivilegeTypeSchema(marshmallow.Schema):
 
 
 class _ReactionTypeSchema(marshmallow.Schema):
-    className = marshmallow.fields.String(required=False, allow_none=True)
+    className = minervapy.utils.InternedString(required=False, allow_none=True)
     name = marshmallow.fields.String(required=False, allow_none=True)
-    parentClass = marshmallow.fields.String(required=False, allow_none=True)
+    parentClass = minervapy.utils.InternedString(required=False, allow_none=True)
 
     @marshmallow.post_load
     def make(self, data, **kwargs):
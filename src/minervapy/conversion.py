@@ -1,9 +1,14 @@
+import collections
+import concurrent.futures
 import dataclasses
-
-import requests
+import os.path
+import threading
+import xml.etree.ElementTree
 
 import minervapy.utils
 import minervapy.session
+import minervapy.progress
+import minervapy.deadline
 
 
 _conversion_url = "convert/"
@@ -38,49 +43,301 @@ _minerva_format_to_short_format = {
 
 _image_formats = set(["png", "pdf", "svg"])
 
+_formats_cache = {}
+_formats_lock = threading.Lock()
 
-def get_formats(format_to_image=True, format_to_format=True):
+_sniff_size = 8192
+_celldesigner_namespace = "http://www.sbml.org/2001/ns/celldesigner"
+
+_short_format_to_extension = {
+    "sbgnml": "sbgn",
+    "celldesigner": "xml",
+    "sbml": "xml",
+    "gpml": "gpml",
+    "png": "png",
+    "pdf": "pdf",
+    "svg": "svg",
+}
 
-    def _get_formats_from_url(url):
-        inputs = set([])
-        outputs = set([])
-        response = requests.get(url)
-        minervapy.utils.check_response(response)
-        json = response.json()
-        for input_formats in json["inputs"]:
-            for input_format in input_formats["available_names"]:
-                inputs.add(_minerva_format_to_short_format[input_format])
-        for output_formats in json["outputs"]:
-            for output_format in output_formats["available_names"]:
-                outputs.add(_minerva_format_to_short_format[output_format])
-        return inputs, outputs
 
+def get_formats(format_to_image=True, format_to_format=True):
     inputs = set([])
     outputs = set([])
     if format_to_format:
-        url = minervapy.utils.join_urls(
-            [minervapy.session.get_base_url(), _conversion_url]
-        )
-        format_inputs, format_outputs = _get_formats_from_url(url)
+        format_inputs, format_outputs = _get_formats_from_url(_conversion_url)
         inputs.update(format_inputs)
         outputs.update(format_outputs)
     if format_to_image:
-        url = minervapy.utils.join_urls(
-            [minervapy.session.get_base_url(), _conversion_image_url]
+        image_inputs, image_outputs = _get_formats_from_url(
+            _conversion_image_url
         )
-        image_inputs, image_outputs = _get_formats_from_url(url)
         inputs.update(image_inputs)
         outputs.update(image_outputs)
     return inputs, outputs
 
 
+def _get_formats_from_url(conversion_url):
+    json = _get_formats_json(conversion_url)
+    inputs = set([])
+    outputs = set([])
+    for input_formats in json["inputs"]:
+        for input_format in input_formats["available_names"]:
+            inputs.add(_minerva_format_to_short_format[input_format])
+    for output_formats in json["outputs"]:
+        for output_format in output_formats["available_names"]:
+            outputs.add(_minerva_format_to_short_format[output_format])
+    return inputs, outputs
+
+
+def _get_formats_json(conversion_url):
+    # the formats supported by a server do not change while it runs, so they
+    # are fetched once per server
+    url = minervapy.utils.join_urls(
+        [minervapy.session.get_base_url(), conversion_url]
+    )
+    with _formats_lock:
+        json = _formats_cache.get(url)
+    if json is None:
+        response = minervapy.utils.request_to_response(url)
+        minervapy.utils.check_response(response)
+        json = response.json()
+        with _formats_lock:
+            _formats_cache[url] = json
+    return json
+
+
+def clear_formats_cache():
+    with _formats_lock:
+        _formats_cache.clear()
+
+
+def get_conversion_graph():
+    # maps each input format to the output formats it can be directly
+    # converted to, and to the conversion URL to use for it
+    graph = {}
+    for conversion_url in [_conversion_url, _conversion_image_url]:
+        inputs, outputs = _get_formats_from_url(conversion_url)
+        for input_format in inputs:
+            for output_format in outputs:
+                if input_format == output_format:
+                    continue
+                graph.setdefault(input_format, {}).setdefault(
+                    output_format, conversion_url
+                )
+    return graph
+
+
+def plan_conversion(input_format, output_format, graph=None):
+    # returns the cheapest list of (input format, output format) steps
+    # converting input_format to output_format; every step costs one round
+    # trip, so the path with the fewest steps is chosen
+    if graph is None:
+        graph = get_conversion_graph()
+    if input_format == output_format:
+        return []
+    previous = {input_format: None}
+    queue = collections.deque([input_format])
+    while queue:
+        current_format = queue.popleft()
+        for next_format in sorted(graph.get(current_format, {})):
+            if next_format in previous:
+                continue
+            previous[next_format] = current_format
+            if next_format == output_format:
+                steps = []
+                while previous[next_format] is not None:
+                    steps.append((previous[next_format], next_format))
+                    next_format = previous[next_format]
+                return steps[::-1]
+            queue.append(next_format)
+    raise ValueError(
+        f"no conversion from {input_format} to {output_format} on this server"
+    )
+
+
+def sniff_format(input_file_path_or_input_data, size=_sniff_size):
+    # guesses the format of a map from its first bytes only; returns None if
+    # the format is not recognized
+    if isinstance(input_file_path_or_input_data, bytes):
+        head = input_file_path_or_input_data[:size]
+    else:
+        with open(input_file_path_or_input_data, "rb") as input_file:
+            head = input_file.read(size)
+    parser = xml.etree.ElementTree.XMLPullParser(events=["start-ns", "start"])
+    root_tag = None
+    # the CellDesigner namespace is usually declared on the root, but may
+    # only appear in the first annotations, so the events of the whole head
+    # are read for SBML
+    has_celldesigner_namespace = False
+    try:
+        parser.feed(head)
+        for event, value in parser.read_events():
+            if event == "start-ns":
+                if value[1] == _celldesigner_namespace:
+                    has_celldesigner_namespace = True
+                continue
+            if value.tag.startswith(f"{{{_celldesigner_namespace}}}"):
+                has_celldesigner_namespace = True
+            if root_tag is None:
+                root_tag = value.tag
+                if root_tag.rpartition("}")[2] != "sbml":
+                    break
+    except xml.etree.ElementTree.ParseError:
+        # the head usually ends in the middle of an element
+        if root_tag is None:
+            return None
+    if root_tag is None:
+        return None
+    if root_tag.startswith("{"):
+        namespace, local_name = root_tag[1:].split("}", 1)
+    else:
+        namespace, local_name = "", root_tag
+    if local_name == "sbgn":
+        return "sbgnml"
+    if local_name == "sbml":
+        if has_celldesigner_namespace:
+            return "celldesigner"
+        return "sbml"
+    if local_name == "Pathway" and (
+        "genmapp" in namespace.lower() or "gpml" in namespace.lower()
+    ):
+        return "gpml"
+    return None
+
+
+def _get_input_format(input_file_path_or_input_data, output_format=None):
+    input_format = sniff_format(input_file_path_or_input_data)
+    if input_format is None:
+        raise ValueError("could not recognize the format of the input")
+    if output_format is not None:
+        if output_format in _image_formats:
+            inputs, _ = _get_formats_from_url(_conversion_image_url)
+        else:
+            inputs, _ = _get_formats_from_url(_conversion_url)
+        if input_format not in inputs:
+            raise ValueError(f"{input_format} is not supported as input")
+    return input_format
+
+
 def convert(
     input_file_path_or_input_data,
     input_format,
     output_format,
     output_file_path=None,
     unzip=True,
+    multi_hop=False,
+    progress=None,
 ):
+    # input_format may be None, in which case it is sniffed from the input
+    # and checked against the formats supported by the server before the
+    # input is sent
+    progress = minervapy.progress.to_progress(progress)
+    if input_format is None:
+        input_format = _get_input_format(
+            input_file_path_or_input_data,
+            output_format if not multi_hop else None,
+        )
+    if isinstance(input_file_path_or_input_data, bytes):
+        input_data = input_file_path_or_input_data
+    else:
+        with open(input_file_path_or_input_data, "rb") as input_file:
+            input_data = input_file.read()
+    if multi_hop:
+        steps = plan_conversion(input_format, output_format)
+    else:
+        steps = [(input_format, output_format)]
+    data = input_data
+    for i, (step_input_format, step_output_format) in enumerate(steps):
+        # intermediate results stay in memory and are always unzipped, as
+        # they are the input of the next step
+        is_last_step = i == len(steps) - 1
+        data = _convert_data(
+            data,
+            step_input_format,
+            step_output_format,
+            unzip=unzip if is_last_step else True,
+            progress=progress,
+        )
+    if progress is not None:
+        progress.finish()
+    minervapy.utils.save_data(
+        data,
+        output_file_path,
+        metadata={
+            "function": "convert",
+            "inputFormat": input_format,
+            "outputFormat": output_format,
+        },
+    )
+    return data
+
+
+def convert_files(
+    input_file_paths,
+    output_format,
+    output_directory,
+    input_format=None,
+    unzip=True,
+    multi_hop=False,
+    max_workers=4,
+    progress=None,
+):
+    # progress, if given, aggregates the progress of all the conversions
+    # the formats of all inputs are determined and checked first, so that an
+    # unsupported input fails the batch before anything is uploaded
+    if input_format is None:
+        input_formats = [
+            _get_input_format(
+                input_file_path, output_format if not multi_hop else None
+            )
+            for input_file_path in input_file_paths
+        ]
+    else:
+        input_formats = [input_format] * len(input_file_paths)
+    if multi_hop:
+        for file_input_format in set(input_formats):
+            plan_conversion(file_input_format, output_format)
+    progress = minervapy.progress.to_progress(progress)
+    os.makedirs(output_directory, exist_ok=True)
+    extension = _short_format_to_extension[output_format]
+    output_file_paths = [
+        os.path.join(
+            output_directory,
+            f"{os.path.splitext(os.path.basename(input_file_path))[0]}.{extension}",
+        )
+        for input_file_path in input_file_paths
+    ]
+
+    def _convert_file(arguments):
+        input_file_path, file_input_format, output_file_path = arguments
+        convert(
+            input_file_path,
+            file_input_format,
+            output_format,
+            output_file_path=output_file_path,
+            unzip=unzip,
+            multi_hop=multi_hop,
+            progress=(
+                progress.create_child(name=input_file_path)
+                if progress is not None
+                else None
+            ),
+        )
+        return output_file_path
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        output_file_paths = list(
+            executor.map(
+                minervapy.deadline._bind(_convert_file),
+                zip(input_file_paths, input_formats, output_file_paths),
+            )
+        )
+    if progress is not None:
+        progress.finish()
+    return output_file_paths
+
+
+def _convert_data(input_data, input_format, output_format, unzip=True, progress=None):
     if output_format in _image_formats:
         conversion_url = _conversion_image_url
     else:
@@ -97,18 +354,13 @@ def convert(
             url_suffix,
         ]
     )
-    if isinstance(input_file_path_or_input_data, bytes):
-        input_data = input_file_path_or_input_data
-    else:
-        with open(input_file_path_or_input_data, "rb") as input_file:
-            input_data = input_file.read()
     data = minervapy.utils.request_to_data(
         url,
         method="POST",
         data=input_data,
         headers={"Content-Type": "application/octet-stream"},
         unzip=unzip,
+        compress=True,
+        progress=progress,
     )
-    if output_file_path is not None:
-        minervapy.utils.data_to_file(data, output_file_path)
     return data
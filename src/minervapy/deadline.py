@@ -0,0 +1,82 @@
+import contextlib
+import contextvars
+import time
+
+_default_timeout = None
+_expiry_margin = 0.05
+_deadline = contextvars.ContextVar("minervapy_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+@contextlib.contextmanager
+def timeout(seconds):
+    # all the requests made in the block, including those of composite
+    # operations and of their thread pools, share the budget of seconds;
+    # nested deadlines can only shorten the enclosing one
+    end_time = time.monotonic() + seconds
+    current_end_time = _deadline.get()
+    if current_end_time is not None:
+        end_time = min(end_time, current_end_time)
+    token = _deadline.set(end_time)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def get_remaining_time():
+    end_time = _deadline.get()
+    if end_time is None:
+        return None
+    return max(end_time - time.monotonic(), 0.0)
+
+
+def check_deadline():
+    remaining_time = get_remaining_time()
+    if remaining_time is not None and remaining_time <= 0:
+        raise DeadlineExceeded("deadline exceeded")
+
+
+def set_default_timeout(seconds):
+    # timeout of the requests made outside of a deadline; None waits forever
+    global _default_timeout
+    _default_timeout = seconds
+
+
+def get_default_timeout():
+    return _default_timeout
+
+
+def _get_timeout():
+    # the timeout of the next request, raising if the deadline has passed
+    remaining_time = get_remaining_time()
+    if remaining_time is None:
+        return _default_timeout
+    if remaining_time <= 0:
+        raise DeadlineExceeded("deadline exceeded")
+    if _default_timeout is not None:
+        return min(remaining_time, _default_timeout)
+    return remaining_time
+
+
+def _raise_if_expired(error):
+    # a request that timed out while the deadline was about to pass was cut
+    # by the deadline rather than by the default timeout
+    remaining_time = get_remaining_time()
+    if remaining_time is not None and remaining_time <= _expiry_margin:
+        raise DeadlineExceeded("deadline exceeded") from error
+
+
+def _bind(function):
+    # thread pools do not inherit context variables; the returned function
+    # runs function in a copy of the context of the caller, so that the
+    # deadline follows the work into the workers
+    context = contextvars.copy_context()
+
+    def _run(*args, **kwargs):
+        return context.copy().run(function, *args, **kwargs)
+
+    return _run
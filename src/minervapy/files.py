@@ -1,4 +1,7 @@
+import array
+import concurrent.futures
 import dataclasses
+import os
 import os.path
 
 import requests
@@ -6,6 +9,9 @@ import marshmallow
 
 import minervapy.utils
 import minervapy.session
+import minervapy.conversion
+import minervapy.progress
+import minervapy.deadline
 
 
 _files_url = "files/"
@@ -21,6 +27,58 @@ class File:
     uploadedDataLength: int | None = None
 
 
+@dataclasses.dataclass
+class FileStatusTable:
+    # upload status of several files, stored column by column; a missing
+    # length or uploaded data length is stored as 0
+    ids: array.array = dataclasses.field(
+        default_factory=lambda: array.array("q")
+    )
+    filenames: list[str | None] = dataclasses.field(default_factory=list)
+    lengths: array.array = dataclasses.field(
+        default_factory=lambda: array.array("q")
+    )
+    uploadedDataLengths: array.array = dataclasses.field(
+        default_factory=lambda: array.array("q")
+    )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get_row(self, file_id):
+        row = self.ids.index(file_id)
+        return {
+            "id": self.ids[row],
+            "filename": self.filenames[row],
+            "length": self.lengths[row],
+            "uploadedDataLength": self.uploadedDataLengths[row],
+        }
+
+    def get_complete_file_ids(self):
+        return [
+            file_id
+            for file_id, length, uploaded_data_length in zip(
+                self.ids, self.lengths, self.uploadedDataLengths
+            )
+            if uploaded_data_length >= length
+        ]
+
+    def get_incomplete_file_ids(self):
+        return [
+            file_id
+            for file_id, length, uploaded_data_length in zip(
+                self.ids, self.lengths, self.uploadedDataLengths
+            )
+            if uploaded_data_length < length
+        ]
+
+    def get_total_length(self):
+        return sum(self.lengths)
+
+    def get_total_uploaded_data_length(self):
+        return sum(self.uploadedDataLengths)
+
+
 class _FileSchema(marshmallow.Schema):
     id = marshmallow.fields.Integer(required=False, allow_none=True)
     filename = marshmallow.fields.String(required=False, allow_none=True)
@@ -48,7 +106,8 @@ def create_new_file(file_name, length):
     return new_file
 
 
-def upload_content_to_file(input_file_path, output_file_or_file_id):
+def upload_content_to_file(input_file_path, output_file_or_file_id, progress=None):
+    progress = minervapy.progress.to_progress(progress)
     if isinstance(output_file_or_file_id, File):
         output_file_id = output_file_or_file_id.id
     elif isinstance(output_file_or_file_id, int):
@@ -67,15 +126,31 @@ def upload_content_to_file(input_file_path, output_file_or_file_id):
         method="POST",
         data=input_data,
         headers={"Content-Type": "application/octet-stream"},
+        compress=True,
+        progress=progress,
     )
+    if progress is not None:
+        progress.finish()
     return output_file
 
 
-def upload_file(input_file_path, file_name, length=None):
+def upload_file(
+    input_file_path, file_name, length=None, allowed_formats=None, progress=None
+):
+    # allowed_formats, if given, restricts the uploads to maps whose sniffed
+    # format is one of them, checked before anything is sent
+    if allowed_formats is not None:
+        input_format = minervapy.conversion.sniff_format(input_file_path)
+        if input_format not in allowed_formats:
+            raise ValueError(
+                f"format of {input_file_path} ({input_format}) is not allowed"
+            )
     if length is None:
         length = os.path.getsize(input_file_path)
     output_file = create_new_file(file_name, length)
-    output_file = upload_content_to_file(input_file_path, output_file)
+    output_file = upload_content_to_file(
+        input_file_path, output_file, progress=progress
+    )
     return output_file
 
 
@@ -87,3 +162,88 @@ def get_file(file_id):
     )
     file = minervapy.utils.request_to_objects(url, _FileSchema)
     return file
+
+
+def upload_files(
+    input_file_paths_or_directory,
+    file_names=None,
+    allowed_formats=None,
+    max_workers=4,
+    progress=None,
+):
+    # uploads a list of files, or the files of a directory, concurrently;
+    # each file is read by the worker that uploads it, so that at most
+    # max_workers files are held in memory at a time
+    if isinstance(input_file_paths_or_directory, (str, os.PathLike)):
+        input_file_paths = sorted(
+            entry.path
+            for entry in os.scandir(input_file_paths_or_directory)
+            if entry.is_file()
+        )
+    else:
+        input_file_paths = list(input_file_paths_or_directory)
+    if file_names is None:
+        file_names = [
+            os.path.basename(input_file_path) for input_file_path in input_file_paths
+        ]
+    elif len(file_names) != len(input_file_paths):
+        raise ValueError("there must be as many file names as input files")
+    if allowed_formats is not None:
+        # formats are checked first, so that a file that is not allowed
+        # fails the batch before anything is uploaded
+        for input_file_path in input_file_paths:
+            input_format = minervapy.conversion.sniff_format(input_file_path)
+            if input_format not in allowed_formats:
+                raise ValueError(
+                    f"format of {input_file_path} ({input_format}) is not allowed"
+                )
+    progress = minervapy.progress.to_progress(progress)
+
+    def _upload_file(arguments):
+        input_file_path, file_name = arguments
+        return upload_file(
+            input_file_path,
+            file_name,
+            progress=(
+                progress.create_child(name=file_name) if progress is not None else None
+            ),
+        )
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        files = list(
+            executor.map(
+                minervapy.deadline._bind(_upload_file),
+                zip(input_file_paths, file_names),
+            )
+        )
+    if progress is not None:
+        progress.finish()
+    return files
+
+
+def get_files(files_or_file_ids, max_workers=8):
+    file_ids = [
+        (
+            file_or_file_id.id
+            if isinstance(file_or_file_id, File)
+            else file_or_file_id
+        )
+        for file_or_file_id in files_or_file_ids
+    ]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(minervapy.deadline._bind(get_file), file_ids))
+
+
+def get_file_status_table(files_or_file_ids, max_workers=8):
+    # polls the files in parallel and gathers how much of each was uploaded
+    return files_to_status_table(get_files(files_or_file_ids, max_workers))
+
+
+def files_to_status_table(files):
+    table = FileStatusTable()
+    for file in files:
+        table.ids.append(file.id)
+        table.filenames.append(file.filename)
+        table.lengths.append(file.length or 0)
+        table.uploadedDataLengths.append(file.uploadedDataLength or 0)
+    return table
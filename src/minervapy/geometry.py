@@ -0,0 +1,208 @@
+import math
+
+
+def point_to_tuple(point):
+    # points are objects with x and y, or any two-item sequence
+    if isinstance(point, tuple):
+        return point
+    if not hasattr(point, "x"):
+        return (point[0], point[1])
+    return (point.x, point.y)
+
+
+def bounding_box(polygon):
+    xs = []
+    ys = []
+    for point in polygon:
+        x, y = point_to_tuple(point)
+        xs.append(x)
+        ys.append(y)
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def point_in_polygon(x, y, polygon):
+    return points_in_polygon([(x, y)], polygon)[0]
+
+
+def points_in_polygon(points, polygon):
+    # even-odd rule, evaluated edge by edge for all points at once
+    vertices = [point_to_tuple(point) for point in polygon]
+    inside = [False] * len(points)
+    if len(vertices) < 3:
+        return inside
+    previous_x, previous_y = vertices[-1]
+    for vertex_x, vertex_y in vertices:
+        if vertex_y != previous_y:
+            slope = (previous_x - vertex_x) / (previous_y - vertex_y)
+            low_y, high_y = min(vertex_y, previous_y), max(vertex_y, previous_y)
+            for i, (x, y) in enumerate(points):
+                if low_y <= y < high_y and x < vertex_x + (y - vertex_y) * slope:
+                    inside[i] = not inside[i]
+        previous_x, previous_y = vertex_x, vertex_y
+    return inside
+
+
+class LinkIndex:
+    # uniform grid over the bounding boxes of the polygons of links, used to
+    # find the links whose polygon contains a point without testing them all
+
+    def __init__(self, links, cell_size=None):
+        self.links = [link for link in links if len(link.polygon) >= 3]
+        self._bounding_boxes = [bounding_box(link.polygon) for link in self.links]
+        if cell_size is None:
+            cell_size = self._default_cell_size()
+        self.cell_size = cell_size
+        self._cells = {}
+        for i, (min_x, min_y, max_x, max_y) in enumerate(self._bounding_boxes):
+            for cell_x in range(self._cell(min_x), self._cell(max_x) + 1):
+                for cell_y in range(self._cell(min_y), self._cell(max_y) + 1):
+                    self._cells.setdefault((cell_x, cell_y), []).append(i)
+
+    def _default_cell_size(self):
+        # about the size of the average bounding box, so that a cell holds a
+        # few candidates
+        if not self._bounding_boxes:
+            return 1.0
+        total = 0.0
+        for min_x, min_y, max_x, max_y in self._bounding_boxes:
+            total += max(max_x - min_x, max_y - min_y)
+        return max(total / len(self._bounding_boxes), 1.0)
+
+    def _cell(self, coordinate):
+        return math.floor(coordinate / self.cell_size)
+
+    def query(self, x, y):
+        return self.query_many([(x, y)])[0]
+
+    def query_many(self, points):
+        # points are grouped by cell so that each candidate polygon is tested
+        # once against all the points of a cell
+        points = [point_to_tuple(point) for point in points]
+        results = [[] for _ in points]
+        points_by_cell = {}
+        for i, (x, y) in enumerate(points):
+            points_by_cell.setdefault((self._cell(x), self._cell(y)), []).append(i)
+        for cell, point_indices in points_by_cell.items():
+            for link_index in self._cells.get(cell, []):
+                min_x, min_y, max_x, max_y = self._bounding_boxes[link_index]
+                candidates = [
+                    i
+                    for i in point_indices
+                    if min_x <= points[i][0] <= max_x
+                    and min_y <= points[i][1] <= max_y
+                ]
+                if not candidates:
+                    continue
+                inside = points_in_polygon(
+                    [points[i] for i in candidates],
+                    self.links[link_index].polygon,
+                )
+                for i, is_inside in zip(candidates, inside):
+                    if is_inside:
+                        results[i].append(link_index)
+        return [
+            [self.links[link_index] for link_index in sorted(result)]
+            for result in results
+        ]
+
+
+def polygon_area(polygon):
+    vertices = [point_to_tuple(point) for point in polygon]
+    area = 0.0
+    previous_x, previous_y = vertices[-1]
+    for x, y in vertices:
+        area += previous_x * y - x * previous_y
+        previous_x, previous_y = x, y
+    return abs(area) / 2
+
+
+def _distance_to_segment(point, start, end):
+    (x, y), (start_x, start_y), (end_x, end_y) = point, start, end
+    dx, dy = end_x - start_x, end_y - start_y
+    length = dx * dx + dy * dy
+    if length == 0:
+        return math.hypot(x - start_x, y - start_y)
+    t = max(0.0, min(1.0, ((x - start_x) * dx + (y - start_y) * dy) / length))
+    return math.hypot(x - start_x - t * dx, y - start_y - t * dy)
+
+
+def _simplify_chain(vertices, tolerance):
+    # Ramer-Douglas-Peucker, iterative to avoid deep recursion on long chains
+    keep = [False] * len(vertices)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(vertices) - 1)]
+    while stack:
+        first, last = stack.pop()
+        max_distance = 0.0
+        max_index = None
+        for i in range(first + 1, last):
+            distance = _distance_to_segment(
+                vertices[i], vertices[first], vertices[last]
+            )
+            if distance > max_distance:
+                max_distance = distance
+                max_index = i
+        if max_index is not None and max_distance > tolerance:
+            keep[max_index] = True
+            stack.append((first, max_index))
+            stack.append((max_index, last))
+    return [vertex for vertex, kept in zip(vertices, keep) if kept]
+
+
+def simplify_polygon(polygon, tolerance):
+    # the ring is split at the vertex farthest from the first one and both
+    # halves are simplified, so that no vertex moves by more than tolerance
+    vertices = [point_to_tuple(point) for point in polygon]
+    if len(vertices) > 1 and vertices[0] == vertices[-1]:
+        vertices = vertices[:-1]
+    if len(vertices) <= 3:
+        return vertices
+    first_x, first_y = vertices[0]
+    farthest = max(
+        range(len(vertices)),
+        key=lambda i: math.hypot(
+            vertices[i][0] - first_x, vertices[i][1] - first_y
+        ),
+    )
+    first_half = _simplify_chain(vertices[: farthest + 1], tolerance)
+    second_half = _simplify_chain(vertices[farthest:] + vertices[:1], tolerance)
+    simplified = first_half[:-1] + second_half[:-1]
+    if len(simplified) < 3:
+        return vertices
+    return simplified
+
+
+def polygon_to_rectangle(polygon, tolerance=0.0):
+    # returns the corners of the bounding box of the polygon if the polygon
+    # only runs along its sides, None otherwise
+    min_x, min_y, max_x, max_y = bounding_box(polygon)
+    vertices = [point_to_tuple(point) for point in polygon]
+
+    def sides(vertex):
+        x, y = vertex
+        return set(
+            side
+            for side, distance in enumerate(
+                [x - min_x, max_x - x, y - min_y, max_y - y]
+            )
+            if distance <= tolerance
+        )
+
+    previous_sides = sides(vertices[-1])
+    for vertex in vertices:
+        vertex_sides = sides(vertex)
+        if not vertex_sides & previous_sides:
+            return None
+        previous_sides = vertex_sides
+    box_area = (max_x - min_x) * (max_y - min_y)
+    perimeter = 2 * ((max_x - min_x) + (max_y - min_y))
+    if box_area - polygon_area(polygon) > tolerance * perimeter:
+        return None
+    return [(min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y)]
+
+
+def round_polygon(polygon, decimals):
+    return [
+        (round(x, decimals), round(y, decimals))
+        for x, y in map(point_to_tuple, polygon)
+    ]
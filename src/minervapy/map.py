@@ -1,4 +1,9 @@
+import concurrent.futures
 import dataclasses
+import json
+import math
+import os.path
+import urllib.parse
 
 import marshmallow
 
@@ -6,10 +11,17 @@ import minervapy.utils
 import minervapy.session
 import minervapy.project
 import minervapy.conversion
+import minervapy.geometry
+import minervapy.progress
+import minervapy.deadline
+import minervapy.transfer
 
 _maps_url = "models/"
 _download_format_url = "downloadModel"
 _download_image_url = "downloadImage"
+_max_query_length = 2000
+_max_selection_length = 1500
+_selection_manifest_file_name = "manifest.json"
 
 
 @dataclasses.dataclass
@@ -73,6 +85,7 @@ class Map:
         background_overlay_id=None,  # str
         zoom_level=None,  # float
         overlay_ids=None,  # list[str]
+        simplify_polygon=True,
     ):
         return download_map(
             self,
@@ -85,9 +98,47 @@ class Map:
             background_overlay_id=background_overlay_id,
             zoom_level=zoom_level,
             overlay_ids=overlay_ids,
+            simplify_polygon=simplify_polygon,
         )
 
 
+@dataclasses.dataclass
+class SelectionChunk:
+    index: int | None = None
+    element_ids: list[str] = dataclasses.field(default_factory=list)
+    reaction_ids: list[str] = dataclasses.field(default_factory=list)
+    data: bytes | None = None  # None when written to output_file_path
+    output_file_path: str | None = None
+
+
+@dataclasses.dataclass
+class SelectionExport:
+    format_: str | None = None
+    projectId: str | None = None
+    mapId: int | None = None
+    chunks: list[SelectionChunk] = dataclasses.field(default_factory=list)
+
+    def get_manifest(self):
+        return {
+            "format": self.format_,
+            "projectId": self.projectId,
+            "mapId": self.mapId,
+            "chunks": [
+                {
+                    "index": chunk.index,
+                    "elementIds": chunk.element_ids,
+                    "reactionIds": chunk.reaction_ids,
+                    "file": (
+                        os.path.basename(chunk.output_file_path)
+                        if chunk.output_file_path is not None
+                        else None
+                    ),
+                }
+                for chunk in self.chunks
+            ],
+        }
+
+
 class _ArticleSchema(marshmallow.Schema):
     title = marshmallow.fields.String(required=False, allow_none=True)
     authors = marshmallow.fields.List(
@@ -99,18 +150,22 @@ class _ArticleSchema(marshmallow.Schema):
     pubmedId = marshmallow.fields.String(required=False, allow_none=True)
     citationCount = marshmallow.fields.Integer(required=False, allow_none=True)
 
+    @marshmallow.post_load
+    def make(self, data, **kwargs):
+        return Article(**data)
+
 
 class _ReferenceSchema(marshmallow.Schema):
     link = marshmallow.fields.String(required=False, allow_none=True)
-    article = marshmallow.fields.Nested(
-        _ArticleSchema, required=False, allow_none=True
-    )
-    type = marshmallow.fields.String(required=False, allow_none=True)
+    article = marshmallow.fields.Nested(_ArticleSchema, required=False, allow_none=True)
+    type = minervapy.utils.InternedString(required=False, allow_none=True)
     resource = marshmallow.fields.String(required=False, allow_none=True)
     id = marshmallow.fields.Integer(required=False, allow_none=True)
-    annotatorClassName = marshmallow.fields.String(
-        required=False, allow_none=True
-    )
+    annotatorClassName = minervapy.utils.InternedString(required=False, allow_none=True)
+
+    @marshmallow.post_load
+    def make(self, data, **kwargs):
+        return Reference(**data)
 
 
 class _AuthorSchema(marshmallow.Schema):
@@ -119,6 +174,10 @@ class _AuthorSchema(marshmallow.Schema):
     email = marshmallow.fields.String(required=False, allow_none=True)
     organisation = marshmallow.fields.String(required=False, allow_none=True)
 
+    @marshmallow.post_load
+    def make(self, data, **kwargs):
+        return Author(**data)
+
 
 class _MapSchema(marshmallow.Schema):
     name = marshmallow.fields.String(required=False, allow_none=True)
@@ -146,7 +205,7 @@ class _MapSchema(marshmallow.Schema):
     modificationDates = marshmallow.fields.List(
         marshmallow.fields.String, required=False, allow_none=True
     )
-    projectId = marshmallow.fields.String(
+    projectId = minervapy.utils.InternedString(
         required=False, allow_none=True
     )  # added to keep track of the project the map belongs to
 
@@ -174,6 +233,24 @@ def get_maps(project_or_project_id):
     return maps
 
 
+def iter_maps(project_or_project_id):
+    if isinstance(project_or_project_id, minervapy.project.Project):
+        project_id = project_or_project_id.projectId
+    else:
+        project_id = project_or_project_id
+    url = minervapy.utils.join_urls(
+        [
+            minervapy.session.get_base_url(),
+            minervapy.project._projects_url,
+            project_id,
+            _maps_url,
+        ]
+    )
+    yield from minervapy.utils.request_to_objects_iter(
+        url, _MapSchema, additional_data={"projectId": project_id}
+    )
+
+
 def get_map(map_id, project_or_project_id):
     if isinstance(project_or_project_id, minervapy.project.Project):
         project_id = project_or_project_id.projectId
@@ -206,7 +283,15 @@ def download_map(
     background_overlay_id=None,  # str
     zoom_level=None,  # float
     overlay_ids=None,  # list[str]
+    simplify_polygon=True,
+    progress=None,
+    resumable=False,
 ):
+    # resumable downloads go to output_file_path in parallel byte ranges
+    # and resume from where a previous interrupted download stopped; the
+    # content then stays on disk and output_file_path is returned instead;
+    # selections too long for a GET request cannot be resumed
+    progress = minervapy.progress.to_progress(progress)
     if not isinstance(map_or_map_id, Map):
         if project_or_project_id is None:
             raise ValueError(
@@ -240,7 +325,13 @@ def download_map(
         ]
     }
     if polygon is not None:
-        polygon_str = ";".join([f"{t[0]},{t[1]}" for t in polygon])
+        tolerance = None
+        if simplify_polygon and len(polygon) >= 3:
+            tolerance = _get_polygon_tolerance(map_or_map_id, format_, zoom_level)
+        if tolerance is not None:
+            polygon_str = _simplified_polygon_string(polygon, tolerance)
+        else:
+            polygon_str = ";".join([f"{t[0]},{t[1]}" for t in polygon])
         params["polygonString"] = polygon_str
     if element_ids is not None:
         element_ids_str = ",".join(element_ids)
@@ -255,7 +346,180 @@ def download_map(
     if overlay_ids is not None:
         overlay_ids_str = ",".join(overlay_ids)
         params["overlayIds"] = overlay_ids_str
-    data = minervapy.utils.request_to_data(url, params=params, unzip=unzip)
-    if output_file_path is not None:
-        minervapy.utils.data_to_file(data, output_file_path)
+    metadata = {
+        "function": "download_map",
+        "projectId": project_id,
+        "mapId": map_id,
+        "format": format_,
+        "params": params,
+    }
+    is_post = len(urllib.parse.urlencode(params)) > _max_query_length
+    if resumable:
+        if output_file_path is None:
+            raise ValueError("resumable downloads need an output file path")
+        if is_post:
+            raise ValueError(
+                "resumable downloads are not supported for selections sent "
+                "in the body of the request"
+            )
+        minervapy.transfer.download_to_path(
+            url,
+            output_file_path,
+            params=params,
+            unzip=unzip,
+            metadata=metadata,
+            progress=progress,
+        )
+        if progress is not None:
+            progress.finish()
+        return output_file_path
+    if is_post:
+        # long selections are sent in the body of the request instead
+        data = minervapy.utils.request_to_data(
+            url, method="POST", data=params, unzip=unzip, progress=progress
+        )
+    else:
+        data = minervapy.utils.request_to_data(
+            url, params=params, unzip=unzip, progress=progress
+        )
+    if progress is not None:
+        progress.finish()
+    minervapy.utils.save_data(data, output_file_path, metadata=metadata)
     return data
+
+
+def chunk_selection(
+    element_ids=None, reaction_ids=None, max_length=_max_selection_length
+):
+    # splits the IDs into chunks whose comma-separated IDs are at most
+    # max_length characters long once URL-encoded, keeping their order
+    chunks = []
+    chunk = ([], [])
+    length = 0
+    for position, ids in enumerate([element_ids or [], reaction_ids or []]):
+        for id_ in ids:
+            id_ = str(id_)
+            id_length = len(urllib.parse.quote(id_, safe="")) + 3
+            if length + id_length > max_length and (chunk[0] or chunk[1]):
+                chunks.append(chunk)
+                chunk = ([], [])
+                length = 0
+            chunk[position].append(id_)
+            length += id_length
+    if chunk[0] or chunk[1]:
+        chunks.append(chunk)
+    return chunks
+
+
+def download_selection(
+    map_or_map_id,
+    project_or_project_id=None,
+    element_ids=None,  # list[str]
+    reaction_ids=None,  # list[str]
+    format_="celldesigner",
+    output_directory=None,
+    unzip=True,
+    background_overlay_id=None,  # str
+    zoom_level=None,  # float
+    overlay_ids=None,  # list[str]
+    max_length=_max_selection_length,
+    max_workers=4,
+):
+    if isinstance(map_or_map_id, Map):
+        map_id = map_or_map_id.idObject
+        project_id = map_or_map_id.projectId
+    elif isinstance(project_or_project_id, minervapy.project.Project):
+        map_id = map_or_map_id
+        project_id = project_or_project_id.projectId
+    else:
+        map_id = map_or_map_id
+        project_id = project_or_project_id
+    if output_directory is not None:
+        os.makedirs(output_directory, exist_ok=True)
+    extension = minervapy.conversion._short_format_to_extension[format_]
+    chunks = [
+        SelectionChunk(
+            index=index,
+            element_ids=chunk_element_ids,
+            reaction_ids=chunk_reaction_ids,
+            output_file_path=(
+                os.path.join(output_directory, f"chunk_{index:04d}.{extension}")
+                if output_directory is not None
+                else None
+            ),
+        )
+        for index, (chunk_element_ids, chunk_reaction_ids) in enumerate(
+            chunk_selection(element_ids, reaction_ids, max_length=max_length)
+        )
+    ]
+
+    def _download_chunk(chunk):
+        data = download_map(
+            map_or_map_id,
+            project_or_project_id=project_or_project_id,
+            format_=format_,
+            output_file_path=chunk.output_file_path,
+            unzip=unzip,
+            element_ids=chunk.element_ids if chunk.element_ids else None,
+            reaction_ids=chunk.reaction_ids if chunk.reaction_ids else None,
+            background_overlay_id=background_overlay_id,
+            zoom_level=zoom_level,
+            overlay_ids=overlay_ids,
+        )
+        if chunk.output_file_path is None:
+            chunk.data = data
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for _ in executor.map(minervapy.deadline._bind(_download_chunk), chunks):
+            pass
+    selection_export = SelectionExport(
+        format_=format_, projectId=project_id, mapId=map_id, chunks=chunks
+    )
+    if output_directory is not None:
+        manifest_file_path = os.path.join(
+            output_directory, _selection_manifest_file_name
+        )
+        with open(manifest_file_path, "w") as manifest_file:
+            json.dump(selection_export.get_manifest(), manifest_file, indent=2)
+    return selection_export
+
+
+def _get_polygon_tolerance(map_or_map_id, format_, zoom_level):
+    # half the size of a pixel of the image at the requested zoom level;
+    # None when it is not known, and for model downloads, whose elements
+    # are selected by the exact polygon
+    if (
+        format_ not in minervapy.conversion._image_formats
+        or zoom_level is None
+        or not isinstance(map_or_map_id, Map)
+        or map_or_map_id.maxZoom is None
+    ):
+        return None
+    return 2 ** max(map_or_map_id.maxZoom - zoom_level, 0) / 2
+
+
+def _simplified_polygon_string(polygon, tolerance):
+    # the polygon is simplified and rounded to the tolerance, which does not
+    # change the rendered image when it is below a pixel
+    decimals = max(0, 1 - math.floor(math.log10(tolerance)))
+    rectangle = minervapy.geometry.polygon_to_rectangle(polygon, tolerance)
+    if rectangle is not None:
+        polygon = rectangle
+    else:
+        polygon = minervapy.geometry.simplify_polygon(polygon, tolerance)
+    polygon = minervapy.geometry.round_polygon(polygon, decimals)
+    return ";".join(
+        [
+            f"{_format_coordinate(x, decimals)},{_format_coordinate(y, decimals)}"
+            for x, y in polygon
+        ]
+    )
+
+
+def _format_coordinate(coordinate, decimals):
+    string = f"{coordinate:.{decimals}f}"
+    if "." in string:
+        string = string.rstrip("0").rstrip(".")
+    if string == "-0":
+        string = "0"
+    return string
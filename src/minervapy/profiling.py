@@ -0,0 +1,235 @@
+import contextlib
+import dataclasses
+import threading
+import time
+import tracemalloc
+
+_phases = ["network", "unzip", "json", "load", "write"]
+
+_profilers = []
+_profilers_lock = threading.Lock()
+_profiling_generation = 0
+_local = threading.local()
+
+_memory_lock = threading.Lock()
+_active_traced_phases = 0
+_started_traced_phases = 0
+
+
+@dataclasses.dataclass
+class Phase:
+    name: str | None = None
+    count: int = 0
+    duration: float = 0.0  # seconds
+    # peak bytes allocated during the phase; tracemalloc only has a
+    # process-wide peak, so phases that overlap with other phases, from any
+    # thread, count 0
+    allocated: int = 0
+
+
+@dataclasses.dataclass
+class Call:
+    method: str | None = None
+    url: str | None = None
+    start: float | None = None
+    duration: float = 0.0  # seconds
+    phases: dict[str, Phase] = dataclasses.field(default_factory=dict)
+
+    def add_phase(self, name, duration, allocated):
+        phase = self.phases.get(name)
+        if phase is None:
+            phase = Phase(name=name)
+            self.phases[name] = phase
+        phase.count += 1
+        phase.duration += duration
+        phase.allocated += allocated
+
+
+class Profiler:
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _add_call(self, call):
+        with self._lock:
+            self.calls.append(call)
+
+    def aggregate(self):
+        phases = {}
+        with self._lock:
+            calls = list(self.calls)
+        for call in calls:
+            for name, call_phase in call.phases.items():
+                phase = phases.get(name)
+                if phase is None:
+                    phase = Phase(name=name)
+                    phases[name] = phase
+                phase.count += call_phase.count
+                phase.duration += call_phase.duration
+                phase.allocated += call_phase.allocated
+        return dict(sorted(phases.items(), key=_phase_order))
+
+    def report(self):
+        names = list(self.aggregate())
+        header = f"{'method':<7}{'url':<60}{'total':>10}" + "".join(
+            f"{name:>10}" for name in names
+        )
+        lines = [header]
+        with self._lock:
+            calls = list(self.calls)
+        for call in calls:
+            line = f"{call.method or '':<7}{_shorten(call.url or '', 59):<60}"
+            line += f"{call.duration * 1000:>8.1f}ms"
+            for name in names:
+                phase = call.phases.get(name)
+                if phase is None:
+                    line += f"{'-':>10}"
+                else:
+                    line += f"{phase.duration * 1000:>8.1f}ms"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def aggregated_report(self):
+        phases = self.aggregate()
+        total = sum(phase.duration for phase in phases.values())
+        lines = [
+            f"{'phase':<10}{'count':>8}{'total':>12}{'mean':>12}{'share':>8}"
+            f"{'allocated':>14}"
+        ]
+        for phase in phases.values():
+            share = phase.duration / total if total else 0.0
+            lines.append(
+                f"{phase.name:<10}{phase.count:>8}"
+                f"{phase.duration * 1000:>10.1f}ms"
+                f"{phase.duration / phase.count * 1000:>10.2f}ms"
+                f"{share:>8.1%}{_format_bytes(phase.allocated):>14}"
+            )
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def profile(trace_memory=True):
+    # records the phases of every call made through minervapy.utils, from
+    # all threads, until the context is exited
+    global _profiling_generation
+    profiler = Profiler(trace_memory=trace_memory)
+    started_tracing = False
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started_tracing = True
+    with _profilers_lock:
+        _profilers.append(profiler)
+        _profiling_generation += 1
+    try:
+        yield profiler
+    finally:
+        with _profilers_lock:
+            _profilers.remove(profiler)
+            # the last calls of the threads belong to this profiler
+            _profiling_generation += 1
+        _local.last_call = None
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def is_profiling():
+    return bool(_profilers)
+
+
+def _call(method, url):
+    if not _profilers:
+        return contextlib.nullcontext()
+    return _profile_call(method, url)
+
+
+def _phase(name):
+    if not _profilers:
+        return contextlib.nullcontext()
+    return _profile_phase(name)
+
+
+@contextlib.contextmanager
+def _profile_call(method, url):
+    outer_call = getattr(_local, "call", None)
+    if outer_call is not None:
+        yield outer_call
+        return
+    new_call = Call(method=method, url=url, start=time.time())
+    _local.call = new_call
+    start = time.perf_counter()
+    try:
+        yield new_call
+    finally:
+        new_call.duration = time.perf_counter() - start
+        _local.call = None
+        _local.last_call = (_profiling_generation, new_call)
+        with _profilers_lock:
+            profilers = list(_profilers)
+        for profiler in profilers:
+            profiler._add_call(new_call)
+
+
+@contextlib.contextmanager
+def _profile_phase(name):
+    current_call = getattr(_local, "call", None)
+    if current_call is None:
+        # phases outside of a call, such as writing the data returned by a
+        # call to a file, are attributed to the last call of the thread made
+        # while the same profilers were active
+        generation, current_call = getattr(_local, "last_call", None) or (None, None)
+        if generation != _profiling_generation:
+            current_call = Call(start=time.time())
+            _local.last_call = (_profiling_generation, current_call)
+            with _profilers_lock:
+                profilers = list(_profilers)
+            for profiler in profilers:
+                profiler._add_call(current_call)
+    global _active_traced_phases, _started_traced_phases
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        # the peak is only measured for a phase that runs alone
+        with _memory_lock:
+            _active_traced_phases += 1
+            _started_traced_phases += 1
+            started_traced_phases = _started_traced_phases
+            is_alone = _active_traced_phases == 1
+            if is_alone:
+                start_memory, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        allocated = 0
+        if tracing:
+            with _memory_lock:
+                _active_traced_phases -= 1
+                if is_alone and _started_traced_phases == started_traced_phases:
+                    _, peak_memory = tracemalloc.get_traced_memory()
+                    allocated = max(peak_memory - start_memory, 0)
+        current_call.add_phase(name, duration, allocated)
+        if current_call is not getattr(_local, "call", None):
+            current_call.duration += duration
+
+
+def _phase_order(item):
+    name = item[0]
+    if name in _phases:
+        return (_phases.index(name), name)
+    return (len(_phases), name)
+
+
+def _shorten(string, length):
+    if len(string) <= length:
+        return string
+    return f"...{string[-(length - 3):]}"
+
+
+def _format_bytes(count):
+    for unit in ["B", "KiB", "MiB"]:
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GiB"
@@ -0,0 +1,180 @@
+import threading
+import time
+
+
+class Progress:
+    # counts the bytes moved by a transfer and reports them to a callback at
+    # most every min_interval seconds; a progress created with a parent also
+    # counts its bytes and total in the parent, which aggregates a batch
+
+    def __init__(
+        self,
+        callback=None,
+        total=None,
+        min_interval=0.5,
+        smoothing=0.3,
+        parent=None,
+        name=None,
+    ):
+        self.callback = callback
+        self.total = total
+        self.min_interval = min_interval
+        self.smoothing = smoothing
+        self.parent = parent
+        self.name = name
+        self.bytes_done = 0
+        self.throughput = None  # bytes per second, smoothed
+        self.start_time = time.monotonic()
+        self.end_time = None
+        self._last_report_time = None
+        self._last_sample_time = self.start_time
+        self._last_sample_bytes = 0
+        self._lock = threading.Lock()
+        if parent is not None and total is not None:
+            parent.add_total(total)
+
+    def create_child(self, total=None, name=None, callback=None):
+        return Progress(
+            callback=callback,
+            total=total,
+            min_interval=self.min_interval,
+            smoothing=self.smoothing,
+            parent=self,
+            name=name,
+        )
+
+    def add_total(self, count):
+        with self._lock:
+            self.total = (self.total or 0) + count
+        if self.parent is not None:
+            self.parent.add_total(count)
+
+    def update(self, count):
+        now = time.monotonic()
+        report = False
+        with self._lock:
+            self.bytes_done += count
+            elapsed = now - self._last_sample_time
+            if elapsed >= self.min_interval / 2:
+                rate = (self.bytes_done - self._last_sample_bytes) / elapsed
+                if self.throughput is None:
+                    self.throughput = rate
+                else:
+                    self.throughput += self.smoothing * (rate - self.throughput)
+                self._last_sample_time = now
+                self._last_sample_bytes = self.bytes_done
+            if (
+                self._last_report_time is None
+                or now - self._last_report_time >= self.min_interval
+            ):
+                self._last_report_time = now
+                report = True
+        if self.parent is not None:
+            self.parent.update(count)
+        if report and self.callback is not None:
+            self.callback(self)
+
+    def finish(self):
+        with self._lock:
+            self.end_time = time.monotonic()
+            if self.total is None:
+                self.total = self.bytes_done
+        if self.callback is not None:
+            self.callback(self)
+
+    @property
+    def elapsed(self):
+        end_time = self.end_time if self.end_time is not None else time.monotonic()
+        return end_time - self.start_time
+
+    @property
+    def average_throughput(self):
+        elapsed = self.elapsed
+        if elapsed <= 0:
+            return None
+        return self.bytes_done / elapsed
+
+    @property
+    def fraction(self):
+        if not self.total:
+            return None
+        return min(self.bytes_done / self.total, 1.0)
+
+    @property
+    def eta(self):
+        # seconds left, based on the smoothed throughput
+        if self.total is None or self.end_time is not None:
+            return None if self.end_time is None else 0.0
+        throughput = self.throughput or self.average_throughput
+        if not throughput:
+            return None
+        return max(self.total - self.bytes_done, 0) / throughput
+
+    def __str__(self):
+        parts = [_format_bytes(self.bytes_done)]
+        if self.total is not None:
+            parts[0] = f"{parts[0]}/{_format_bytes(self.total)}"
+        throughput = self.throughput or self.average_throughput
+        if throughput is not None:
+            parts.append(f"{_format_bytes(throughput)}/s")
+        eta = self.eta
+        if eta is not None:
+            parts.append(f"ETA {eta:.1f}s")
+        if self.name is not None:
+            parts.insert(0, self.name)
+        return " ".join(parts)
+
+
+class _ProgressReader:
+    # file-like view of bytes that counts the bytes read by requests while
+    # it sends them as the body of a request
+
+    def __init__(self, data, progress):
+        self._data = memoryview(data)
+        self._progress = progress
+        self._position = 0
+
+    def __len__(self):
+        return len(self._data) - self._position
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(65536)
+            if not chunk:
+                return
+            yield chunk
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self._data) - self._position
+        chunk = bytes(self._data[self._position : self._position + size])
+        self._position += len(chunk)
+        if chunk:
+            self._progress.update(len(chunk))
+        return chunk
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._position
+        elif whence == 2:
+            offset += len(self._data)
+        self._progress.update(offset - self._position)
+        self._position = offset
+        return self._position
+
+
+def to_progress(progress):
+    # progress arguments may be a Progress or a callback taking one
+    if progress is None or isinstance(progress, Progress):
+        return progress
+    return Progress(callback=progress)
+
+
+def _format_bytes(count):
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if abs(count) < 1024 or unit == "GiB":
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
@@ -1,9 +1,16 @@
+import array
+import concurrent.futures
 import dataclasses
+import heapq
 
 import marshmallow
 
 import minervapy.utils
 import minervapy.session
+import minervapy.geometry
+import minervapy.progress
+import minervapy.deadline
+import minervapy.transfer
 
 
 _projects_url = "projects/"
@@ -37,6 +44,9 @@ class OverviewImage:  # no doc
     height: int | None = None
     links: list[Link] = dataclasses.field(default_factory=list)
 
+    def get_link_index(self, cell_size=None):
+        return minervapy.geometry.LinkIndex(self.links, cell_size=cell_size)
+
 
 @dataclasses.dataclass
 class Disease:  # no doc
@@ -87,6 +97,67 @@ class Statistics:
     elementAnnotations: dict[str, int] = dataclasses.field(default_factory=dict)
 
 
+@dataclasses.dataclass
+class StatisticsTable:
+    # statistics of several projects, stored column by column: each
+    # annotation type maps to an array holding one count per project
+    projectIds: list[str] = dataclasses.field(default_factory=list)
+    annotationTypes: list[str] = dataclasses.field(default_factory=list)
+    publications: array.array = dataclasses.field(
+        default_factory=lambda: array.array("q")
+    )
+    reactionAnnotations: dict[str, array.array] = dataclasses.field(
+        default_factory=dict
+    )
+    elementAnnotations: dict[str, array.array] = dataclasses.field(
+        default_factory=dict
+    )
+
+    def _get_columns(self, kind):
+        if kind == "element":
+            return self.elementAnnotations
+        if kind == "reaction":
+            return self.reactionAnnotations
+        raise ValueError(f"kind must be 'element' or 'reaction', not {kind!r}")
+
+    def get_column(self, annotation_type, kind="element"):
+        return self._get_columns(kind)[annotation_type]
+
+    def get_row(self, project_id, kind="element"):
+        row = self.projectIds.index(project_id)
+        return {
+            annotation_type: column[row]
+            for annotation_type, column in self._get_columns(kind).items()
+        }
+
+    def get_totals(self, kind="element"):
+        return {
+            annotation_type: sum(column)
+            for annotation_type, column in self._get_columns(kind).items()
+        }
+
+    def get_project_totals(self, kind="element"):
+        totals = array.array("q", [0]) * len(self.projectIds)
+        for column in self._get_columns(kind).values():
+            for row, count in enumerate(column):
+                totals[row] += count
+        return dict(zip(self.projectIds, totals))
+
+    def get_top_annotation_types(self, k, kind="element"):
+        return heapq.nlargest(
+            k, self.get_totals(kind).items(), key=lambda item: item[1]
+        )
+
+    def get_top_projects(self, k, annotation_type=None, kind="element"):
+        if annotation_type is None:
+            counts = self.get_project_totals(kind)
+        else:
+            counts = dict(
+                zip(self.projectIds, self.get_column(annotation_type, kind))
+            )
+        return heapq.nlargest(k, counts.items(), key=lambda item: item[1])
+
+
 class _PointSchema(marshmallow.Schema):
     x = marshmallow.fields.Float(required=False, allow_none=True)
     y = marshmallow.fields.Float(required=False, allow_none=True)
@@ -108,7 +179,7 @@ class _LinkSchema(marshmallow.Schema):  # no doc
     )
     modelLinkId = marshmallow.fields.Integer(required=False, allow_none=True)
     query = marshmallow.fields.String(required=False, allow_none=True)
-    type = marshmallow.fields.String(required=False, allow_none=True)
+    type = minervapy.utils.InternedString(required=False, allow_none=True)
 
     @marshmallow.post_load
     def make(self, data, **kwargs):
@@ -131,10 +202,10 @@ class _OverviewImageSchema(marshmallow.Schema):  # no doc
 
 class _OrganismSchema(marshmallow.Schema):  # no doc
     link = marshmallow.fields.String(required=False, allow_none=True)
-    type = marshmallow.fields.String(required=False, allow_none=True)
+    type = minervapy.utils.InternedString(required=False, allow_none=True)
     resource = marshmallow.fields.String(required=False, allow_none=True)
     id = marshmallow.fields.Integer(required=False, allow_none=True)
-    annotatorClassName = marshmallow.fields.String(
+    annotatorClassName = minervapy.utils.InternedString(
         required=False, allow_none=True
     )
 
@@ -145,10 +216,10 @@ class _OrganismSchema(marshmallow.Schema):  # no doc
 
 class _DiseaseSchema(marshmallow.Schema):  # no doc
     link = marshmallow.fields.String(required=False, allow_none=True)
-    type = marshmallow.fields.String(required=False, allow_none=True)
+    type = minervapy.utils.InternedString(required=False, allow_none=True)
     resource = marshmallow.fields.String(required=False, allow_none=True)
     id = marshmallow.fields.Integer(required=False, allow_none=True)
-    annotatorClassName = marshmallow.fields.String(
+    annotatorClassName = minervapy.utils.InternedString(
         required=False, allow_none=True
     )
 
@@ -164,7 +235,7 @@ class _ProjectSchema(marshmallow.Schema):
         required=False, allow_none=True
     )
     version = marshmallow.fields.String(required=False, allow_none=True)
-    owner = marshmallow.fields.String(required=False, allow_none=True)
+    owner = minervapy.utils.InternedString(required=False, allow_none=True)
     creationDate = marshmallow.fields.String(required=False, allow_none=True)
     disease = marshmallow.fields.Nested(
         _DiseaseSchema, required=False, allow_none=True
@@ -173,10 +244,10 @@ class _ProjectSchema(marshmallow.Schema):
         _OrganismSchema, required=False, allow_none=True
     )
     directory = marshmallow.fields.String(required=False, allow_none=True)
-    status = marshmallow.fields.String(required=False, allow_none=True)
+    status = minervapy.utils.InternedString(required=False, allow_none=True)
     progress = marshmallow.fields.Float(required=False, allow_none=True)
     notifyEmail = marshmallow.fields.String(required=False, allow_none=True)
-    mapCanvasType = marshmallow.fields.String(required=False, allow_none=True)
+    mapCanvasType = minervapy.utils.InternedString(required=False, allow_none=True)
     logEntries = marshmallow.fields.Boolean(required=False, allow_none=True)
     overviewImageViews = marshmallow.fields.List(
         marshmallow.fields.Nested(_OverviewImageSchema),
@@ -222,6 +293,13 @@ def get_projects():
     return projects
 
 
+def iter_projects():
+    url = minervapy.utils.join_urls(
+        [minervapy.session.get_base_url(), _projects_url]
+    )
+    yield from minervapy.utils.request_to_objects_iter(url, _ProjectSchema)
+
+
 def get_project(project_id):
     url = minervapy.utils.join_urls(
         [minervapy.session.get_base_url(), _projects_url, project_id]
@@ -232,7 +310,17 @@ def get_project(project_id):
     return project
 
 
-def download_source(project_or_project_id, output_file_path=None, unzip=True):
+def download_source(
+    project_or_project_id,
+    output_file_path=None,
+    unzip=True,
+    progress=None,
+    resumable=False,
+):
+    # resumable downloads go to output_file_path in parallel byte ranges
+    # and resume from where a previous interrupted download stopped; the
+    # content then stays on disk and output_file_path is returned instead
+    progress = minervapy.progress.to_progress(progress)
     if isinstance(project_or_project_id, Project):
         project_id = project_or_project_id.projectId
     else:
@@ -241,9 +329,24 @@ def download_source(project_or_project_id, output_file_path=None, unzip=True):
     url = minervapy.utils.join_urls(
         [minervapy.session.get_base_url(), _projects_url, url_suffix]
     )
-    data = minervapy.utils.request_to_data(url, unzip=True)
-    if output_file_path is not None:
-        minervapy.utils.data_to_file(data, output_file_path)
+    metadata = {"function": "download_source", "projectId": project_id}
+    if resumable:
+        if output_file_path is None:
+            raise ValueError("resumable downloads need an output file path")
+        minervapy.transfer.download_to_path(
+            url,
+            output_file_path,
+            unzip=True,
+            metadata=metadata,
+            progress=progress,
+        )
+        if progress is not None:
+            progress.finish()
+        return output_file_path
+    data = minervapy.utils.request_to_data(url, unzip=True, progress=progress)
+    if progress is not None:
+        progress.finish()
+    minervapy.utils.save_data(data, output_file_path, metadata=metadata)
     return data
 
 
@@ -264,3 +367,50 @@ def get_statistics(project_or_project_id):
         url, _StatisticsSchema, many=False
     )
     return statistics
+
+
+def get_statistics_table(projects_or_project_ids=None, max_workers=8):
+    # fetches the statistics of the given projects, or of all projects,
+    # concurrently and assembles them into a StatisticsTable
+    if projects_or_project_ids is None:
+        projects_or_project_ids = get_projects()
+    project_ids = [
+        (
+            project_or_project_id.projectId
+            if isinstance(project_or_project_id, Project)
+            else project_or_project_id
+        )
+        for project_or_project_id in projects_or_project_ids
+    ]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        statistics_list = list(
+            executor.map(minervapy.deadline._bind(get_statistics), project_ids)
+        )
+    return statistics_to_table(project_ids, statistics_list)
+
+
+def statistics_to_table(project_ids, statistics_list):
+    annotation_types = set()
+    for statistics in statistics_list:
+        annotation_types.update(statistics.reactionAnnotations or {})
+        annotation_types.update(statistics.elementAnnotations or {})
+    annotation_types = sorted(annotation_types)
+    table = StatisticsTable(
+        projectIds=list(project_ids), annotationTypes=annotation_types
+    )
+    table.publications.extend(
+        statistics.publications or 0 for statistics in statistics_list
+    )
+    for columns, attribute in [
+        (table.reactionAnnotations, "reactionAnnotations"),
+        (table.elementAnnotations, "elementAnnotations"),
+    ]:
+        for annotation_type in annotation_types:
+            columns[annotation_type] = array.array(
+                "q",
+                (
+                    (getattr(statistics, attribute) or {}).get(annotation_type, 0)
+                    for statistics in statistics_list
+                ),
+            )
+    return table
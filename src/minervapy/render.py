@@ -0,0 +1,232 @@
+import collections
+import concurrent.futures
+import contextvars
+import dataclasses
+import heapq
+import itertools
+import threading
+
+import minervapy.map
+import minervapy.project
+import minervapy.session
+import minervapy.utils
+import minervapy.geometry
+
+
+@dataclasses.dataclass
+class RenderStatistics:
+    submitted: int = 0
+    deduplicated: int = 0  # joined a pending or running render
+    cached: int = 0  # answered from the finished renders
+    rendered: int = 0
+    failed: int = 0
+
+
+@dataclasses.dataclass
+class _RenderJob:
+    key: tuple
+    arguments: dict
+    priority: int
+    future: concurrent.futures.Future
+    context: contextvars.Context
+    is_started: bool = False
+
+
+class RenderScheduler:
+    # runs download_map for variants of maps with at most max_workers
+    # renders at a time, highest priority first; variants with the same
+    # canonical key share a single render, whether it is pending, running
+    # or among the last cache_size finished ones
+
+    def __init__(self, max_workers=4, cache_size=256):
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.statistics = RenderStatistics()
+        self._condition = threading.Condition()
+        self._queue = []
+        self._jobs = {}
+        self._results = collections.OrderedDict()
+        self._sequence = itertools.count()
+        self._workers = []
+        self._is_shut_down = False
+
+    def submit(
+        self,
+        map_or_map_id,
+        project_or_project_id=None,
+        format_="png",
+        zoom_level=None,
+        overlay_ids=None,
+        background_overlay_id=None,
+        polygon=None,
+        element_ids=None,
+        reaction_ids=None,
+        priority=0,
+    ):
+        arguments = _get_canonical_arguments(
+            map_or_map_id,
+            project_or_project_id,
+            format_,
+            zoom_level,
+            overlay_ids,
+            background_overlay_id,
+            polygon,
+            element_ids,
+            reaction_ids,
+        )
+        key = (minervapy.session.get_base_url(),) + tuple(
+            minervapy.utils._freeze(arguments)
+        )
+        with self._condition:
+            if self._is_shut_down:
+                raise RuntimeError("cannot submit renders after shutdown")
+            self.statistics.submitted += 1
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.statistics.cached += 1
+                future = concurrent.futures.Future()
+                future.set_result(self._results[key])
+                return future
+            job = self._jobs.get(key)
+            if job is not None:
+                self.statistics.deduplicated += 1
+                if priority > job.priority and not job.is_started:
+                    # the previous queue entry of the job is skipped
+                    job.priority = priority
+                    self._push(job)
+                return job.future
+            job = _RenderJob(
+                key=key,
+                arguments=arguments,
+                priority=priority,
+                future=concurrent.futures.Future(),
+                context=contextvars.copy_context(),
+            )
+            self._jobs[key] = job
+            self._push(job)
+            if len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._work, daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            return job.future
+
+    def render(self, *args, **kwargs):
+        return self.submit(*args, **kwargs).result()
+
+    def clear_cache(self):
+        with self._condition:
+            self._results.clear()
+
+    def shutdown(self, wait=True):
+        # pending renders are still run before the workers stop
+        with self._condition:
+            self._is_shut_down = True
+            self._condition.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def _push(self, job):
+        heapq.heappush(self._queue, (-job.priority, next(self._sequence), job))
+        self._condition.notify()
+
+    def _pop(self):
+        with self._condition:
+            while True:
+                while not self._queue and not self._is_shut_down:
+                    self._condition.wait()
+                if not self._queue:
+                    return None
+                priority, _, job = heapq.heappop(self._queue)
+                if not job.is_started and -priority == job.priority:
+                    job.is_started = True
+                    return job
+
+    def _work(self):
+        while True:
+            job = self._pop()
+            if job is None:
+                return
+            if not job.future.set_running_or_notify_cancel():
+                with self._condition:
+                    del self._jobs[job.key]
+                continue
+            try:
+                data = job.context.run(minervapy.map.download_map, **job.arguments)
+            except BaseException as exception:
+                with self._condition:
+                    del self._jobs[job.key]
+                    self.statistics.failed += 1
+                job.future.set_exception(exception)
+                continue
+            with self._condition:
+                del self._jobs[job.key]
+                self.statistics.rendered += 1
+                if self.cache_size > 0:
+                    self._results[job.key] = data
+                    while len(self._results) > self.cache_size:
+                        self._results.popitem(last=False)
+            job.future.set_result(data)
+
+
+def _get_canonical_arguments(
+    map_or_map_id,
+    project_or_project_id,
+    format_,
+    zoom_level,
+    overlay_ids,
+    background_overlay_id,
+    polygon,
+    element_ids,
+    reaction_ids,
+):
+    # the arguments of download_map in a single form per distinct render:
+    # IDs as strings, zoom levels as floats, and IDs without duplicates;
+    # overlays are drawn in the given order, so only element and reaction
+    # IDs are sorted
+    if isinstance(map_or_map_id, minervapy.map.Map):
+        map_id = map_or_map_id.idObject
+        project_id = map_or_map_id.projectId
+    else:
+        if project_or_project_id is None:
+            raise ValueError(
+                "you must either provide a map, or a map ID and a project or project ID"
+            )
+        map_id = map_or_map_id
+        if isinstance(project_or_project_id, minervapy.project.Project):
+            project_id = project_or_project_id.projectId
+        else:
+            project_id = project_or_project_id
+    return {
+        "map_or_map_id": str(map_id),
+        "project_or_project_id": str(project_id),
+        "format_": format_.lower(),
+        "zoom_level": float(zoom_level) if zoom_level is not None else None,
+        "overlay_ids": _canonical_ids(overlay_ids, ordered=True),
+        "background_overlay_id": (
+            str(background_overlay_id) if background_overlay_id is not None else None
+        ),
+        "polygon": (
+            [
+                tuple(map(float, minervapy.geometry.point_to_tuple(point)))
+                for point in polygon
+            ]
+            if polygon is not None
+            else None
+        ),
+        "element_ids": _canonical_ids(element_ids),
+        "reaction_ids": _canonical_ids(reaction_ids),
+    }
+
+
+def _canonical_ids(ids, ordered=False):
+    if not ids:
+        return None
+    ids = list(dict.fromkeys(map(str, ids)))
+    return ids if ordered else sorted(ids)
@@ -1,6 +1,9 @@
+import threading
+
 import requests
 
 import minervapy.utils
+import minervapy.deadline
 
 _login_url = "doLogin"
 _logout_url = "doLogout"
@@ -8,11 +11,17 @@ _is_session_valid_url = "users/isSessionValid"
 
 _base_url = None
 _auth_cookies = None
+_credentials = None
+_renewal_interval = None
+_renewal_timer = None
+_renewal_lock = threading.RLock()
+_listeners = []
 
 
 def set_base_url(url):
     global _base_url
     _base_url = url
+    _notify_listeners("set_base_url")
 
 
 def get_base_url():
@@ -29,29 +38,50 @@ def get_auth_cookies():
 
 
 def log_in(username, password):
+    response = _log_in(username, password)
+    _notify_listeners("log_in")
+    return response
+
+
+def _log_in(username, password):
+    global _credentials
     url = minervapy.utils.join_urls([_base_url, _login_url])
     response = requests.post(
-        url, data={"login": username, "password": password}
+        url,
+        data={"login": username, "password": password},
+        timeout=minervapy.deadline._get_timeout(),
     )
     if not response.ok:
         raise Exception(f"{response.status_code}, {response.text}")
-    set_auth_cookies(response.cookies)
+    with _renewal_lock:
+        set_auth_cookies(response.cookies)
+        _credentials = (username, password)
+        _schedule_renewal()
     return response
 
 
 def log_out():
+    global _credentials
     url = minervapy.utils.join_urls([_base_url, _logout_url])
     auth_cookies = get_auth_cookies()
     if auth_cookies is None:
         raise Exception("must log in first before logging out")
-    response = requests.get(url, cookies=auth_cookies)
-    set_auth_cookies(None)
+    response = requests.get(
+        url, cookies=auth_cookies, timeout=minervapy.deadline._get_timeout()
+    )
+    with _renewal_lock:
+        set_auth_cookies(None)
+        _credentials = None
+        _cancel_renewal()
+    _notify_listeners("log_out")
     return response
 
 
 def is_session_valid():
     url = minervapy.utils.join_urls([_base_url, _is_session_valid_url])
-    response = requests.get(url, cookies=get_auth_cookies())
+    response = requests.get(
+        url, cookies=get_auth_cookies(), timeout=minervapy.deadline._get_timeout()
+    )
     if response.ok:
         if response.json().get("login") is not None:
             return True
@@ -59,3 +89,78 @@ def is_session_valid():
         if response.json().get("error") == "Access denied.":
             return False
     raise Exception(f"{response.status_code}, {response.text}")
+
+
+def renew_session(expired_cookies=None):
+    # logs in again with the credentials of the last log_in; when
+    # expired_cookies is given, only renews if no other thread has already
+    # replaced them, so that concurrent failures trigger a single log in,
+    # and if the session has actually expired, since access is also denied
+    # to resources the user is not allowed to see
+    with _renewal_lock:
+        if _credentials is None:
+            return False
+        if expired_cookies is not None:
+            if get_auth_cookies() is not expired_cookies:
+                return True
+            if is_session_valid():
+                return False
+        # a renewal keeps the same user, so listeners are not notified
+        _log_in(*_credentials)
+    return True
+
+
+def set_renewal_interval(seconds):
+    # renews the session every given number of seconds, ahead of the
+    # expiration of the cookies; None disables the periodic renewal
+    global _renewal_interval
+    with _renewal_lock:
+        _renewal_interval = seconds
+        _schedule_renewal()
+
+
+def get_renewal_interval():
+    return _renewal_interval
+
+
+def add_session_listener(listener):
+    # listener is called with "set_base_url", "log_in" or "log_out" after
+    # the corresponding change of the session
+    _listeners.append(listener)
+
+
+def remove_session_listener(listener):
+    _listeners.remove(listener)
+
+
+def _notify_listeners(event):
+    # responses cached for the previous session must not be reused
+    minervapy.utils.clear_response_cache()
+    for listener in list(_listeners):
+        listener(event)
+
+
+def _schedule_renewal():
+    global _renewal_timer
+    _cancel_renewal()
+    if _renewal_interval is None or _credentials is None:
+        return
+    _renewal_timer = threading.Timer(_renewal_interval, _renew_on_timer)
+    _renewal_timer.daemon = True
+    _renewal_timer.start()
+
+
+def _cancel_renewal():
+    global _renewal_timer
+    if _renewal_timer is not None:
+        _renewal_timer.cancel()
+        _renewal_timer = None
+
+
+def _renew_on_timer():
+    try:
+        renew_session()
+    except Exception:
+        # the next request failing with an access denied error will retry
+        with _renewal_lock:
+            _schedule_renewal()
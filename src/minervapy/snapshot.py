@@ -0,0 +1,179 @@
+import array
+import dataclasses
+import importlib
+import io
+import pickle
+import struct
+
+# snapshots store minervapy objects in a compact binary form that loads
+# without going through the schemas: each dataclass instance is stored as
+# a tuple of its class index followed by its field values, and the
+# classes, with their field names, are listed once in the header, so that
+# snapshots remain loadable when fields are added or removed; the encoded
+# value is made of builtin types only and stored with a fixed pickle
+# protocol, which is readable by any later Python version, and loaded by
+# an unpickler that refuses any global
+
+_magic = b"MPYS"
+_version = 2
+_header = struct.Struct(">4sH")
+_pickle_protocol = 4
+_tuple_tag = -1
+_array_tag = -2
+_atomic_types = frozenset([type(None), bool, int, float, str, bytes])
+
+
+def objects_to_snapshot(objects):
+    classes = []
+    class_indices = {}
+    value = _encode(objects, classes, class_indices)
+    return _header.pack(_magic, _version) + pickle.dumps(
+        (classes, value), _pickle_protocol
+    )
+
+
+def snapshot_to_objects(snapshot):
+    magic, version = _header.unpack_from(snapshot)
+    if magic != _magic:
+        raise ValueError("not a minervapy snapshot")
+    if version != _version:
+        raise ValueError(f"unsupported snapshot version {version}")
+    snapshot_file = io.BytesIO(snapshot)
+    snapshot_file.seek(_header.size)
+    classes, value = _Unpickler(snapshot_file).load()
+    decoders = []
+    for module_name, class_name, field_names in classes:
+        decoders.append(_make_decoder(module_name, class_name, field_names, decoders))
+    return _decode(value, decoders)
+
+
+def save_snapshot(objects, output_file_path):
+    with open(output_file_path, "wb") as output_file:
+        output_file.write(objects_to_snapshot(objects))
+
+
+def load_snapshot(input_file_path):
+    with open(input_file_path, "rb") as input_file:
+        return snapshot_to_objects(input_file.read())
+
+
+class _Unpickler(pickle.Unpickler):
+    def find_class(self, module_name, name):
+        raise ValueError(f"cannot load {module_name}.{name} from a snapshot")
+
+
+def _encode(value, classes, class_indices):
+    value_type = type(value)
+    if value_type in _atomic_types:
+        return value
+    if value_type is list:
+        return [_encode(item, classes, class_indices) for item in value]
+    if value_type is dict:
+        return {
+            key: _encode(item, classes, class_indices) for key, item in value.items()
+        }
+    if value_type is tuple:
+        return (_tuple_tag, *[_encode(item, classes, class_indices) for item in value])
+    if value_type is array.array:
+        return (_array_tag, value.typecode, value.tobytes())
+    if dataclasses.is_dataclass(value) and value_type.__module__.startswith(
+        "minervapy."
+    ):
+        class_index = class_indices.get(value_type)
+        if class_index is None:
+            class_index = len(classes)
+            class_indices[value_type] = class_index
+            classes.append(
+                (
+                    value_type.__module__,
+                    value_type.__qualname__,
+                    tuple(field.name for field in dataclasses.fields(value_type)),
+                )
+            )
+        field_names = classes[class_index][2]
+        return (
+            class_index,
+            *[
+                _encode(getattr(value, field_name), classes, class_indices)
+                for field_name in field_names
+            ],
+        )
+    raise ValueError(f"cannot store {value_type.__name__} objects in a snapshot")
+
+
+def _decode(value, decoders):
+    value_type = type(value)
+    if value_type is list:
+        return [
+            item if type(item) in _atomic_types else _decode(item, decoders)
+            for item in value
+        ]
+    if value_type is dict:
+        return {
+            key: item if type(item) in _atomic_types else _decode(item, decoders)
+            for key, item in value.items()
+        }
+    if value_type is tuple:
+        tag = value[0]
+        if tag >= 0:
+            return decoders[tag](value)
+        if tag == _tuple_tag:
+            return tuple(_decode(item, decoders) for item in value[1:])
+        if tag == _array_tag:
+            decoded = array.array(value[1])
+            decoded.frombytes(value[2])
+            return decoded
+        raise ValueError(f"invalid snapshot tag {tag}")
+    return value
+
+
+def _make_decoder(module_name, class_name, field_names, decoders):
+    # objects are created without calling __init__; fields missing from the
+    # snapshot get their defaults and fields the class no longer has are
+    # dropped
+    cls = _get_class(module_name, class_name)
+    fields = {field.name: field for field in dataclasses.fields(cls)}
+    indices = [
+        i for i, field_name in enumerate(field_names, start=1) if field_name in fields
+    ]
+    kept_field_names = [field_names[i - 1] for i in indices]
+    is_complete = len(indices) == len(field_names)
+    missing_fields = [
+        field for field_name, field in fields.items() if field_name not in field_names
+    ]
+    atomic_types = _atomic_types
+    new = object.__new__
+
+    def decode(value):
+        obj = new(cls)
+        items = value[1:] if is_complete else [value[i] for i in indices]
+        attributes = dict(
+            zip(
+                kept_field_names,
+                [
+                    item if type(item) in atomic_types else _decode(item, decoders)
+                    for item in items
+                ],
+            )
+        )
+        for field in missing_fields:
+            if field.default_factory is not dataclasses.MISSING:
+                attributes[field.name] = field.default_factory()
+            else:
+                attributes[field.name] = field.default
+        obj.__dict__ = attributes
+        return obj
+
+    return decode
+
+
+def _get_class(module_name, class_name):
+    # only minervapy dataclasses are created from snapshots
+    if not module_name.startswith("minervapy."):
+        raise ValueError(f"cannot load {module_name}.{class_name} from a snapshot")
+    cls = importlib.import_module(module_name)
+    for name in class_name.split("."):
+        cls = getattr(cls, name)
+    if not isinstance(cls, type) or not dataclasses.is_dataclass(cls):
+        raise ValueError(f"cannot load {module_name}.{class_name} from a snapshot")
+    return cls
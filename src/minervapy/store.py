@@ -0,0 +1,226 @@
+import dataclasses
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+_objects_directory_name = "objects"
+_metadata_suffix = ".json"
+_hash_chunk_size = 1024 * 1024
+_ficlone = 0x40049409  # ioctl request of reflinks on Linux
+
+_artifact_store = None
+
+
+@dataclasses.dataclass
+class Artifact:
+    digest: str | None = None
+    path: str | None = None
+    size: int | None = None
+    metadata: list[dict] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class GarbageCollection:
+    digests: list[str] = dataclasses.field(default_factory=list)
+    freed_bytes: int = 0
+
+
+class ArtifactStore:
+    # stores artifacts once per content hash; output files are reflinks or
+    # hardlinks to the stored objects, and a sidecar JSON file next to each
+    # object records the metadata of every request that produced it;
+    # hardlinked output files are the read-only objects themselves, so they
+    # must be removed or copied, not written to, to change their content
+
+    def __init__(self, root, algorithm="sha256"):
+        self.root = root
+        self.algorithm = algorithm
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, _objects_directory_name), exist_ok=True)
+
+    def get_path(self, digest):
+        return os.path.join(
+            self.root, _objects_directory_name, digest[:2], digest[2:]
+        )
+
+    def _get_metadata_path(self, digest):
+        return f"{self.get_path(digest)}{_metadata_suffix}"
+
+    def contains(self, digest):
+        return os.path.exists(self.get_path(digest))
+
+    def put(self, data, metadata=None):
+        digest = hashlib.new(self.algorithm, data).hexdigest()
+        path = self.get_path(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                file_descriptor, temporary_path = tempfile.mkstemp(
+                    dir=os.path.dirname(path)
+                )
+                with os.fdopen(file_descriptor, "wb") as temporary_file:
+                    temporary_file.write(data)
+                # objects are shared by all the files linked to them
+                os.chmod(temporary_path, 0o444)
+                os.replace(temporary_path, path)
+            entries = self._add_metadata(digest, metadata)
+        return Artifact(digest=digest, path=path, size=len(data), metadata=entries)
+
+    def put_file(self, file_path, metadata=None):
+        # same as put for the content of file_path, which is hashed by
+        # chunks and, if it is new, moved into the store; the file is then
+        # gone unless the store already had its content
+        digest = self._hash_file(file_path)
+        path = self.get_path(digest)
+        size = os.path.getsize(file_path)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                file_descriptor, temporary_path = tempfile.mkstemp(
+                    dir=os.path.dirname(path)
+                )
+                os.close(file_descriptor)
+                try:
+                    os.replace(file_path, temporary_path)
+                except OSError:  # the store is on another file system
+                    shutil.copyfile(file_path, temporary_path)
+                os.chmod(temporary_path, 0o444)
+                os.replace(temporary_path, path)
+            entries = self._add_metadata(digest, metadata)
+        return Artifact(digest=digest, path=path, size=size, metadata=entries)
+
+    def _hash_file(self, file_path):
+        digest_object = hashlib.new(self.algorithm)
+        with open(file_path, "rb") as input_file:
+            for chunk in iter(lambda: input_file.read(_hash_chunk_size), b""):
+                digest_object.update(chunk)
+        return digest_object.hexdigest()
+
+    def is_linked(self, file_path):
+        # whether file_path is a hardlink to one of the objects of the store
+        file_stat = os.stat(file_path)
+        if file_stat.st_nlink <= 1:
+            return False
+        path = self.get_path(self._hash_file(file_path))
+        return os.path.exists(path) and os.path.samestat(file_stat, os.stat(path))
+
+    def _add_metadata(self, digest, metadata):
+        entries = self._read_metadata(digest)
+        entry = dict(metadata or {})
+        entry["time"] = time.time()
+        entries.append(entry)
+        self._write_metadata(digest, entries)
+        return entries
+
+    def get(self, digest):
+        path = self.get_path(digest)
+        if not os.path.exists(path):
+            return None
+        return Artifact(
+            digest=digest,
+            path=path,
+            size=os.path.getsize(path),
+            metadata=self._read_metadata(digest),
+        )
+
+    def get_data(self, digest):
+        with open(self.get_path(digest), "rb") as object_file:
+            return object_file.read()
+
+    def link(self, digest, output_file_path):
+        # reflinks are independent copies sharing blocks; hardlinks share the
+        # (read-only) object itself; a plain copy is the last resort
+        path = self.get_path(digest)
+        if os.path.lexists(output_file_path):
+            os.remove(output_file_path)
+        if _reflink(path, output_file_path):
+            return "reflink"
+        try:
+            os.link(path, output_file_path)
+            return "hardlink"
+        except OSError:
+            shutil.copyfile(path, output_file_path)
+            return "copy"
+
+    def iter_artifacts(self):
+        objects_directory = os.path.join(self.root, _objects_directory_name)
+        for prefix in sorted(os.listdir(objects_directory)):
+            prefix_directory = os.path.join(objects_directory, prefix)
+            for name in sorted(os.listdir(prefix_directory)):
+                if name.endswith(_metadata_suffix) or name.startswith("tmp"):
+                    continue
+                artifact = self.get(f"{prefix}{name}")
+                if artifact is not None:
+                    yield artifact
+
+    def gc(self, max_age=0):
+        # removes the objects that no output file is hardlinked to and that
+        # were last produced more than max_age seconds ago
+        result = GarbageCollection()
+        now = time.time()
+        with self._lock:
+            for artifact in list(self.iter_artifacts()):
+                if os.stat(artifact.path).st_nlink > 1:
+                    continue
+                last_time = max(
+                    (entry.get("time", 0) for entry in artifact.metadata), default=0
+                )
+                if now - last_time < max_age:
+                    continue
+                os.remove(artifact.path)
+                metadata_path = self._get_metadata_path(artifact.digest)
+                if os.path.exists(metadata_path):
+                    os.remove(metadata_path)
+                result.digests.append(artifact.digest)
+                result.freed_bytes += artifact.size
+        return result
+
+    def _read_metadata(self, digest):
+        metadata_path = self._get_metadata_path(digest)
+        if not os.path.exists(metadata_path):
+            return []
+        with open(metadata_path) as metadata_file:
+            return json.load(metadata_file)
+
+    def _write_metadata(self, digest, entries):
+        metadata_path = self._get_metadata_path(digest)
+        temporary_path = f"{metadata_path}.tmp"
+        with open(temporary_path, "w") as metadata_file:
+            json.dump(entries, metadata_file, indent=2)
+        os.replace(temporary_path, metadata_path)
+
+
+def set_artifact_store(store):
+    # store may be an ArtifactStore, the root directory of one, or None
+    global _artifact_store
+    if store is not None and not isinstance(store, ArtifactStore):
+        store = ArtifactStore(store)
+    _artifact_store = store
+
+
+def get_artifact_store():
+    return _artifact_store
+
+
+def _reflink(source_path, destination_path):
+    if fcntl is None:
+        return False
+    try:
+        with open(source_path, "rb") as source_file, open(
+            destination_path, "wb"
+        ) as destination_file:
+            fcntl.ioctl(destination_file.fileno(), _ficlone, source_file.fileno())
+        return True
+    except OSError:
+        if os.path.exists(destination_path):
+            os.remove(destination_path)
+        return False
@@ -0,0 +1,283 @@
+import concurrent.futures
+import dataclasses
+import json
+import os
+import re
+import shutil
+import threading
+import zipfile
+
+import minervapy.utils
+import minervapy.deadline
+import minervapy.progress
+import minervapy.profiling
+
+_part_suffix = ".part"
+_state_suffix = ".part.json"
+_unzipped_suffix = ".unzipped"
+_copy_buffer_size = 1024 * 1024
+_default_part_size = 8 * 1024 * 1024
+_content_range_pattern = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+@dataclasses.dataclass
+class DownloadState:
+    url: str | None = None
+    params: dict | None = None
+    length: int | None = None
+    partSize: int | None = None
+    validator: str | None = None  # ETag or Last-Modified
+    contentType: str | None = None
+    completedParts: list[int] = dataclasses.field(default_factory=list)
+    isRanged: bool = True
+
+    def get_part_count(self):
+        return -(-self.length // self.partSize)
+
+    def get_part_range(self, part):
+        start = part * self.partSize
+        return start, min(start + self.partSize, self.length) - 1
+
+    def get_missing_parts(self):
+        completed_parts = set(self.completedParts)
+        return [
+            part for part in range(self.get_part_count()) if part not in completed_parts
+        ]
+
+    def get_completed_length(self):
+        return sum(
+            end - start + 1
+            for start, end in map(self.get_part_range, self.completedParts)
+        )
+
+
+def download_to_file(
+    url,
+    output_file_path,
+    params=None,
+    headers=None,
+    part_size=_default_part_size,
+    max_workers=4,
+    chunk_size=65536,
+    progress=None,
+):
+    # downloads the response to url into output_file_path; when the server
+    # answers byte ranges, the parts are fetched in parallel into a
+    # preallocated file, and the parts already completed are recorded in a
+    # state file next to it, so that an interrupted download is resumed
+    # from them; otherwise the response is received as a single stream
+    progress = minervapy.progress.to_progress(progress)
+    part_file_path = f"{output_file_path}{_part_suffix}"
+    state_file_path = f"{output_file_path}{_state_suffix}"
+    state = _load_state(state_file_path, part_file_path, url, params, part_size)
+    if state is None:
+        first_part = 0
+        start, end = 0, part_size - 1
+    else:
+        first_part = state.get_missing_parts()[0]
+        start, end = state.get_part_range(first_part)
+    response = _request_range(url, params, headers, start, end)
+    # a failed request leaves the state of a partial download untouched, so
+    # that the next attempt still resumes from it
+    minervapy.utils.check_response(response)
+    if response.status_code not in [200, 206]:
+        response.close()
+        raise minervapy.utils.StatusCodeException(
+            f"{response.status_code}, unexpected status"
+        )
+    if response.status_code == 200:
+        # the server ignores ranges and sends the whole content, which
+        # replaces any previous partial download
+        state = DownloadState(
+            url=url,
+            params=params,
+            contentType=response.headers.get("Content-Type"),
+            isRanged=False,
+        )
+        _remove(state_file_path)
+        _receive(response, part_file_path, None, chunk_size, progress, "wb")
+        state.length = os.path.getsize(part_file_path)
+    else:
+        length = int(
+            _content_range_pattern.fullmatch(response.headers["Content-Range"]).group(3)
+        )
+        validator = response.headers.get("ETag") or response.headers.get(
+            "Last-Modified"
+        )
+        if (
+            state is None
+            or state.length != length
+            or validator is None
+            or state.validator != validator
+        ):
+            # a new download, or the resource changed since the partial one,
+            # or it cannot be told whether it did, without a validator
+            if state is not None:
+                response.close()
+                first_part = 0
+                response = _request_range(url, params, headers, 0, part_size - 1)
+                minervapy.utils.check_response(response)
+            state = DownloadState(
+                url=url,
+                params=params,
+                length=length,
+                partSize=part_size,
+                validator=validator,
+                contentType=response.headers.get("Content-Type"),
+            )
+            with open(part_file_path, "wb") as part_file:
+                part_file.truncate(length)
+            _save_state(state, state_file_path)
+        if progress is not None:
+            progress.add_total(length)
+            progress.update(state.get_completed_length())
+        state_lock = threading.Lock()
+
+        def _complete_part(part):
+            with state_lock:
+                state.completedParts.append(part)
+                _save_state(state, state_file_path)
+
+        def _download_part(part):
+            part_start, part_end = state.get_part_range(part)
+            part_response = _request_range(url, params, headers, part_start, part_end)
+            if part_response.status_code != 206:
+                part_response.close()
+                raise minervapy.utils.StatusCodeException(
+                    f"{part_response.status_code}, range {part_start}-{part_end} "
+                    "was not returned"
+                )
+            _receive(
+                part_response,
+                part_file_path,
+                part_start,
+                chunk_size,
+                progress,
+                "r+b",
+            )
+            _complete_part(part)
+
+        _receive(
+            response,
+            part_file_path,
+            state.get_part_range(first_part)[0],
+            chunk_size,
+            progress,
+            "r+b",
+        )
+        _complete_part(first_part)
+        missing_parts = state.get_missing_parts()
+        if missing_parts:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers
+            ) as executor:
+                for _ in executor.map(
+                    minervapy.deadline._bind(_download_part), missing_parts
+                ):
+                    pass
+    os.replace(part_file_path, output_file_path)
+    _remove(state_file_path)
+    if progress is not None:
+        progress.finish()
+    return state
+
+
+def download_to_path(
+    url,
+    output_file_path,
+    params=None,
+    unzip=True,
+    metadata=None,
+    part_size=_default_part_size,
+    max_workers=4,
+    progress=None,
+):
+    # same as request_to_data followed by save_data, without holding the
+    # content in memory: it is downloaded to output_file_path by
+    # download_to_file, unzipped there if needed, and stored from there if
+    # an artifact store is set
+    state = download_to_file(
+        url,
+        output_file_path,
+        params=params,
+        part_size=part_size,
+        max_workers=max_workers,
+        progress=progress,
+    )
+    if unzip and state.contentType == "application/zip":
+        with minervapy.profiling._phase("unzip"):
+            _unzip_file(output_file_path)
+    minervapy.utils.save_file(output_file_path, metadata)
+    return state
+
+
+def _unzip_file(file_path):
+    # replaces the zip archive at file_path by its first member
+    unzipped_file_path = f"{file_path}{_unzipped_suffix}"
+    with zipfile.ZipFile(file_path) as zip_file:
+        with zip_file.open(zip_file.infolist()[0]) as member_file, open(
+            unzipped_file_path, "wb"
+        ) as unzipped_file:
+            shutil.copyfileobj(member_file, unzipped_file, _copy_buffer_size)
+    os.replace(unzipped_file_path, file_path)
+
+
+def _request_range(url, params, headers, start, end):
+    # ranges are of the bytes on the wire, so the content is requested
+    # without content encoding
+    range_headers = dict(headers or {})
+    range_headers["Range"] = f"bytes={start}-{end}"
+    range_headers["Accept-Encoding"] = "identity"
+    return minervapy.utils.request_to_response(
+        url, params=params, headers=range_headers, stream=True
+    )
+
+
+def _receive(response, file_path, offset, chunk_size, progress, mode):
+    minervapy.utils.check_response(response)
+    with response, open(file_path, mode) as output_file:
+        if offset is not None:
+            output_file.seek(offset)
+        position = 0
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            minervapy.deadline.check_deadline()
+            output_file.write(chunk)
+            if progress is not None:
+                raw_position = response.raw.tell()
+                progress.update(raw_position - position)
+                position = raw_position
+
+
+def _load_state(state_file_path, part_file_path, url, params, part_size):
+    # the state of a previous download is only used for the same request,
+    # with the same part size, and if its part file is still there
+    if not os.path.exists(state_file_path) or not os.path.exists(part_file_path):
+        return None
+    try:
+        with open(state_file_path) as state_file:
+            state = DownloadState(**json.load(state_file))
+    except (ValueError, TypeError):
+        return None
+    if (
+        not state.isRanged
+        or state.url != url
+        or state.params != params
+        or state.partSize != part_size
+        or not state.get_missing_parts()
+    ):
+        return None
+    return state
+
+
+def _save_state(state, state_file_path):
+    temporary_file_path = f"{state_file_path}.tmp"
+    with open(temporary_file_path, "w") as state_file:
+        json.dump(dataclasses.asdict(state), state_file)
+    os.replace(temporary_file_path, state_file_path)
+
+
+def _remove(file_path):
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
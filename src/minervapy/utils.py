@@ -1,16 +1,108 @@
 import requests
 import zipfile
 import io
+import functools
+import codecs
+import json
+import threading
+import concurrent.futures
+import dataclasses
+import zlib
+import time
+import sys
+import multiprocessing
+import contextlib
+import contextvars
+import os
 
 import marshmallow
 
 import minervapy.session
+import minervapy.profiling
+import minervapy.store
+import minervapy.progress
+import minervapy.deadline
+import minervapy.files
+
+_json_whitespace = " \t\n\r"
+_json_array_delimiters = f",]{_json_whitespace}"
+
+_request_coalescing = True
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+_response_cache_ttl = None
+_response_cache_max_size = 1024
+_response_cache = {}
+_response_cache_lock = threading.Lock()
+_prefetch_cache_ttl = contextvars.ContextVar(
+    "minervapy_prefetch_cache_ttl", default=None
+)
+
+_compression_chunk_size = 1024 * 1024
+_compression_wbits = {"gzip": 31, "deflate": 15}
+_compression_probe_data = b"minervapy compression probe\n" * 64
+_compression_probe_file_name = "minervapy_compression_probe.txt"
+_request_compression = None
+_compression_support = {}
+_compression_lock = threading.Lock()
+_compression_probe_lock = threading.Lock()
+
+_string_interning = True
+_string_pool = {}
+_string_pool_max_size = 65536
+_interning_lock = threading.Lock()
+_interning_local = threading.local()
+_interning_generation = 0
+
+_default_offload_threshold = 1024 * 1024
+_offload_threshold = _default_offload_threshold
+_process_pool = None
+_process_pool_lock = threading.Lock()
 
 
 class StatusCodeException(Exception):
     pass
 
 
+@dataclasses.dataclass
+class CompressionStatistics:
+    requests: int = 0
+    fallbacks: int = 0
+    raw_bytes: int = 0
+    sent_bytes: int = 0
+
+    @property
+    def saved_bytes(self):
+        return self.raw_bytes - self.sent_bytes
+
+    @property
+    def ratio(self):
+        if self.sent_bytes == 0:
+            return None
+        return self.raw_bytes / self.sent_bytes
+
+
+@dataclasses.dataclass
+class InterningStatistics:
+    strings: int = 0
+    lookups: int = 0
+    hits: int = 0
+    saved_bytes: int = 0
+
+
+class InternedString(marshmallow.fields.String):
+    # for fields with few distinct values: equal values are shared through
+    # a pool, so that the objects of a large crawl hold a single copy of
+    # each of them
+    def _deserialize(self, value, attr, data, **kwargs):
+        return intern_string(super()._deserialize(value, attr, data, **kwargs))
+
+
+_compression_statistics = CompressionStatistics()
+_interning_statistics = []  # one InterningStatistics per thread
+
+
 def join_urls(urls):
     to_join = []
     for url in urls[:-1]:
@@ -26,6 +118,16 @@ def check_response(response):
         raise StatusCodeException(f"{response.status_code}, {response.text}")
 
 
+def is_access_denied(response):
+    if response.ok:
+        return False
+    try:
+        json = response.json()
+    except ValueError:
+        return False
+    return isinstance(json, dict) and json.get("error") == "Access denied."
+
+
 def unzip_data(data):
     z = zipfile.ZipFile(io.BytesIO(data))
     zip_infos = z.infolist()
@@ -34,8 +136,50 @@ def unzip_data(data):
 
 
 def data_to_file(data, output_file_path):
-    with open(output_file_path, "wb") as output_file:
-        output_file.write(data)
+    with minervapy.profiling._phase("write"):
+        # a hardlink to an object of the artifact store is read-only and
+        # shared with the store, so it is replaced rather than written to
+        store = minervapy.store.get_artifact_store()
+        if (
+            store is not None
+            and os.path.isfile(output_file_path)
+            and store.is_linked(output_file_path)
+        ):
+            os.remove(output_file_path)
+        with open(output_file_path, "wb") as output_file:
+            output_file.write(data)
+
+
+def save_data(data, output_file_path=None, metadata=None):
+    # writes data to output_file_path, going through the artifact store if
+    # one is set, in which case the data is stored even without output file
+    store = minervapy.store.get_artifact_store()
+    if store is None:
+        if output_file_path is not None:
+            data_to_file(data, output_file_path)
+        return
+    with minervapy.profiling._phase("write"):
+        artifact = store.put(data, metadata)
+        if output_file_path is not None:
+            store.link(artifact.digest, output_file_path)
+
+
+def save_file(file_path, metadata=None):
+    # same as save_data for data already written to file_path, which is
+    # moved into the artifact store, if one is set, rather than read
+    store = minervapy.store.get_artifact_store()
+    if store is None:
+        return
+    with minervapy.profiling._phase("write"):
+        artifact = store.put_file(file_path, metadata)
+        store.link(artifact.digest, file_path)
+
+
+@functools.cache
+def get_schema(schema_cls, many=False):
+    # schemas are built on first use and then reused, as building a schema
+    # instance copies all of its declared fields
+    return schema_cls(many=many, unknown=marshmallow.EXCLUDE)
 
 
 def request_to_response(
@@ -44,32 +188,438 @@ def request_to_response(
     data=None,
     params=None,
     headers=None,
+    stream=False,
+    compress=False,
+    progress=None,
 ):
-    cookies = minervapy.session.get_auth_cookies()
-    response = requests.request(
-        url=url,
+    with minervapy.profiling._phase("network"):
+        if compress and data is not None and _is_compression_enabled():
+            response = _compressed_request(
+                url,
+                method=method,
+                data=data,
+                params=params,
+                headers=headers,
+                stream=stream,
+                progress=progress,
+            )
+        elif method == "GET" and not stream:
+            response = _get_request(url, params=params, headers=headers)
+        else:
+            response = _request(
+                url,
+                method=method,
+                data=data,
+                params=params,
+                headers=headers,
+                stream=stream,
+                progress=progress,
+            )
+    return response
+
+
+def set_request_coalescing(enabled):
+    global _request_coalescing
+    _request_coalescing = enabled
+
+
+def set_request_compression(encoding):
+    # encoding is "gzip", "deflate" or None; request bodies of uploads and
+    # conversions are then compressed for servers that decode them, which
+    # is probed by uploading a small file to each server once
+    global _request_compression
+    if encoding is not None and encoding not in _compression_wbits:
+        raise ValueError(f"unsupported compression {encoding}")
+    with _compression_lock:
+        _request_compression = encoding
+        _compression_support.clear()
+
+
+def get_compression_statistics():
+    with _compression_lock:
+        return dataclasses.replace(_compression_statistics)
+
+
+def reset_compression_statistics():
+    global _compression_statistics
+    with _compression_lock:
+        _compression_statistics = CompressionStatistics()
+
+
+def set_string_interning(enabled):
+    global _string_interning
+    _string_interning = enabled
+
+
+def intern_string(value):
+    # lock free: setdefault is atomic, and the statistics are counted per
+    # thread and only summed by get_interning_statistics
+    if not _string_interning:
+        return value
+    if len(_string_pool) < _string_pool_max_size:
+        interned = _string_pool.setdefault(value, value)
+    else:
+        interned = _string_pool.get(value, value)
+    statistics = _get_thread_interning_statistics()
+    statistics.lookups += 1
+    if interned is not value:
+        statistics.hits += 1
+        statistics.saved_bytes += sys.getsizeof(value)
+    return interned
+
+
+def _get_thread_interning_statistics():
+    generation, statistics = getattr(_interning_local, "statistics", (None, None))
+    if generation != _interning_generation:
+        statistics = InterningStatistics()
+        with _interning_lock:
+            _interning_statistics.append(statistics)
+            _interning_local.statistics = (_interning_generation, statistics)
+    return statistics
+
+
+def get_interning_statistics():
+    with _interning_lock:
+        all_statistics = list(_interning_statistics)
+    return InterningStatistics(
+        strings=len(_string_pool),
+        lookups=sum(statistics.lookups for statistics in all_statistics),
+        hits=sum(statistics.hits for statistics in all_statistics),
+        saved_bytes=sum(statistics.saved_bytes for statistics in all_statistics),
+    )
+
+
+def reset_interning_statistics():
+    # threads start counting anew in the next generation
+    global _interning_generation
+    with _interning_lock:
+        _interning_generation += 1
+        _interning_statistics.clear()
+
+
+def clear_string_pool():
+    _string_pool.clear()
+
+
+def compress_data(data, encoding):
+    # the compressed body is built in memory, next to the uncompressed one,
+    # so that it is sent with a Content-Length and can be sent again after
+    # a session renewal
+    compressor = zlib.compressobj(wbits=_compression_wbits[encoding])
+    view = memoryview(data)
+    chunks = []
+    for start in range(0, len(view), _compression_chunk_size):
+        chunks.append(
+            compressor.compress(view[start : start + _compression_chunk_size])
+        )
+    chunks.append(compressor.flush())
+    return b"".join(chunks)
+
+
+def _is_compression_enabled():
+    with _compression_lock:
+        return _request_compression is not None and _compression_support.get(
+            minervapy.session.get_base_url(), True
+        )
+
+
+def _compressed_request(
+    url,
+    method="GET",
+    data=None,
+    params=None,
+    headers=None,
+    stream=False,
+    progress=None,
+):
+    # bodies are only compressed for servers that a probe showed to decode
+    # them; otherwise the request is sent uncompressed
+    encoding = _request_compression
+    if not _is_compression_supported(encoding):
+        response = _request(
+            url,
+            method=method,
+            data=data,
+            params=params,
+            headers=headers,
+            stream=stream,
+            progress=progress,
+        )
+        with _compression_lock:
+            _compression_statistics.requests += 1
+            _compression_statistics.fallbacks += 1
+            _compression_statistics.raw_bytes += len(data)
+            _compression_statistics.sent_bytes += len(data)
+        return response
+    compressed_data = compress_data(data, encoding)
+    compressed_headers = dict(headers or {})
+    compressed_headers["Content-Encoding"] = encoding
+    response = _request(
+        url,
         method=method,
-        data=data,
+        data=compressed_data,
         params=params,
-        headers=headers,
-        cookies=cookies,
+        headers=compressed_headers,
+        stream=stream,
+        progress=progress,
     )
+    with _compression_lock:
+        _compression_statistics.requests += 1
+        _compression_statistics.raw_bytes += len(data)
+        _compression_statistics.sent_bytes += len(compressed_data)
     return response
 
 
-def request_to_data(
-    url, method="GET", data=None, params=None, headers=None, unzip=True
+def _is_compression_supported(encoding):
+    # probes each server once; a failed probe is not recorded, so that the
+    # next compressed request probes again
+    base_url = minervapy.session.get_base_url()
+    with _compression_probe_lock:
+        with _compression_lock:
+            is_supported = _compression_support.get(base_url)
+        if is_supported is None:
+            is_supported = _probe_compression(encoding)
+            if is_supported is not None:
+                with _compression_lock:
+                    _compression_support[base_url] = is_supported
+    return bool(is_supported)
+
+
+def _probe_compression(encoding):
+    # uploads a small known payload compressed: servers that do not decode
+    # compressed bodies either reject them with 415 or store the compressed
+    # bytes as they are, which the uploaded length tells apart; returns
+    # None if the probe failed for another reason
+    files_url = join_urls(
+        [minervapy.session.get_base_url(), minervapy.files._files_url]
+    )
+    data = _compression_probe_data
+    response = _request(
+        files_url,
+        method="POST",
+        params={"filename": _compression_probe_file_name, "length": len(data)},
+    )
+    if not response.ok:
+        return None
+    upload_url = join_urls(
+        [files_url, f"{response.json()['id']}:{minervapy.files._upload_content_url}"]
+    )
+    response = _request(
+        upload_url,
+        method="POST",
+        data=compress_data(data, encoding),
+        headers={
+            "Content-Type": "application/octet-stream",
+            "Content-Encoding": encoding,
+        },
+    )
+    if response.status_code == 415:
+        return False
+    if not response.ok:
+        return None
+    return response.json().get("uploadedDataLength") == len(data)
+
+
+def _request(
+    url,
+    method="GET",
+    data=None,
+    params=None,
+    headers=None,
+    stream=False,
+    progress=None,
 ):
-    response = request_to_response(
-        url, method=method, data=data, params=params, headers=headers
+    if progress is not None and isinstance(data, (bytes, bytearray)):
+        progress.add_total(len(data))
+        data = minervapy.progress._ProgressReader(data, progress)
+    cookies = minervapy.session.get_auth_cookies()
+    response = _send(url, method, data, params, headers, cookies, stream)
+    if is_access_denied(response) and minervapy.session.renew_session(cookies):
+        if isinstance(data, minervapy.progress._ProgressReader):
+            data.seek(0)
+        response = _send(
+            url,
+            method,
+            data,
+            params,
+            headers,
+            minervapy.session.get_auth_cookies(),
+            stream,
+        )
+    return response
+
+
+def _send(url, method, data, params, headers, cookies, stream):
+    # each request gets the time left before the deadline, if any, as its
+    # timeout, and is not sent once the deadline has passed
+    timeout = minervapy.deadline._get_timeout()
+    try:
+        return requests.request(
+            url=url,
+            method=method,
+            data=data,
+            params=params,
+            headers=headers,
+            cookies=cookies,
+            stream=stream,
+            timeout=timeout,
+        )
+    except requests.Timeout as error:
+        minervapy.deadline._raise_if_expired(error)
+        raise
+
+
+def set_response_cache_ttl(seconds):
+    # successful GET responses are kept in memory for the given number of
+    # seconds and reused for identical requests; None disables the cache
+    global _response_cache_ttl
+    with _response_cache_lock:
+        _response_cache_ttl = seconds
+        _response_cache.clear()
+
+
+def get_response_cache_ttl():
+    return _response_cache_ttl
+
+
+def clear_response_cache():
+    with _response_cache_lock:
+        _response_cache.clear()
+
+
+def _get_request(url, params=None, headers=None):
+    key = (
+        url,
+        _freeze(params),
+        _freeze(headers),
+        id(minervapy.session.get_auth_cookies()),
     )
-    check_response(response)
-    data = response.content
-    if unzip and response.headers["Content-Type"] == "application/zip":
-        data = unzip_data(data)
+    if _response_cache:
+        with _response_cache_lock:
+            cached = _response_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+    ttl = _response_cache_ttl
+    if ttl is None:
+        ttl = _prefetch_cache_ttl.get()
+    if _request_coalescing:
+        response = _coalesced_request(key, url, params=params, headers=headers)
+    else:
+        response = _request(url, params=params, headers=headers)
+    if ttl is not None and response.ok:
+        with _response_cache_lock:
+            _response_cache.pop(key, None)
+            _response_cache[key] = (time.monotonic() + ttl, response)
+            while len(_response_cache) > _response_cache_max_size:
+                del _response_cache[next(iter(_response_cache))]
+    return response
+
+
+@contextlib.contextmanager
+def _prefetching(ttl):
+    # GET responses received in the block are cached for ttl seconds even
+    # when the response cache is disabled, so that the requests they
+    # prefetch are answered from the cache; other requests are not cached
+    token = _prefetch_cache_ttl.set(ttl)
+    try:
+        yield
+    finally:
+        _prefetch_cache_ttl.reset(token)
+
+
+def _coalesced_request(key, url, params=None, headers=None):
+    # identical GET requests made while one is in flight wait for it and
+    # share its response, or its exception, instead of being sent again;
+    # the deadline of the request in flight is its own, so when it is
+    # exceeded, the waiting requests are sent again, one of them leading
+    while True:
+        with _in_flight_lock:
+            future = _in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = concurrent.futures.Future()
+                _in_flight[key] = future
+        if is_leader:
+            break
+        try:
+            return future.result(timeout=minervapy.deadline.get_remaining_time())
+        except minervapy.deadline.DeadlineExceeded:
+            continue
+        except concurrent.futures.TimeoutError as error:
+            raise minervapy.deadline.DeadlineExceeded("deadline exceeded") from error
+    try:
+        response = _request(url, params=params, headers=headers)
+    except BaseException as exception:
+        with _in_flight_lock:
+            del _in_flight[key]
+        future.set_exception(exception)
+        raise
+    with _in_flight_lock:
+        del _in_flight[key]
+    future.set_result(response)
+    return response
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def request_to_data(
+    url,
+    method="GET",
+    data=None,
+    params=None,
+    headers=None,
+    unzip=True,
+    compress=False,
+    progress=None,
+    chunk_size=65536,
+):
+    with minervapy.profiling._call(method, url):
+        response = request_to_response(
+            url,
+            method=method,
+            data=data,
+            params=params,
+            headers=headers,
+            stream=progress is not None,
+            compress=compress,
+            progress=progress,
+        )
+        check_response(response)
+        if progress is None:
+            data = response.content
+        else:
+            data = _read_content(response, progress, chunk_size)
+        if unzip and response.headers["Content-Type"] == "application/zip":
+            with minervapy.profiling._phase("unzip"):
+                data = _run_offloadable(unzip_data, data)
     return data
 
 
+def _read_content(response, progress, chunk_size):
+    # the bytes are counted as they arrive; Content-Length is the size on
+    # the wire, so the count follows the raw stream rather than the
+    # decoded chunks
+    content_length = response.headers.get("Content-Length")
+    if content_length is not None:
+        progress.add_total(int(content_length))
+    chunks = []
+    position = 0
+    with response:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            minervapy.deadline.check_deadline()
+            chunks.append(chunk)
+            raw_position = response.raw.tell()
+            progress.update(raw_position - position)
+            position = raw_position
+    return b"".join(chunks)
+
+
 def request_to_objects(
     url,
     schema_cls,
@@ -79,18 +629,220 @@ def request_to_objects(
     headers=None,
     many=False,
     additional_data=None,
+    compress=False,
+    progress=None,
 ):
+    with minervapy.profiling._call(method, url):
+        response = request_to_response(
+            url,
+            method=method,
+            data=data,
+            params=params,
+            headers=headers,
+            compress=compress,
+            progress=progress,
+        )
+        objects = response_to_objects(
+            response, schema_cls, many=many, additional_data=additional_data
+        )
+    return objects
+
+
+def response_to_objects(response, schema_cls, many=False, additional_data=None):
     if additional_data is None:
         additional_data = {}
-    response = request_to_response(
-        url, method=method, data=data, params=params, headers=headers
-    )
     check_response(response)
-    json = response.json()
+    if _is_offloaded(response.content):
+        with minervapy.profiling._phase("offload"):
+            return _run_offloadable(
+                _content_to_objects,
+                response.content,
+                schema_cls,
+                many,
+                additional_data,
+            )
+    with minervapy.profiling._phase("json"):
+        json = response.json()
+    with minervapy.profiling._phase("load"):
+        if many:
+            json_with_additional_data = [e | additional_data for e in json]
+        else:
+            json_with_additional_data = json | additional_data
+        schema = get_schema(schema_cls, many=many)
+        objects = schema.load(json_with_additional_data, partial=True)
+    return objects
+
+
+def _content_to_objects(content, schema_cls, many, additional_data):
+    # the decoding of response_to_objects, run in the worker processes
+    json_ = json.loads(content)
     if many:
-        json_with_additional_data = [e | additional_data for e in json]
+        json_with_additional_data = [e | additional_data for e in json_]
     else:
-        json_with_additional_data = json | additional_data
-    schema = schema_cls(many=many, unknown=marshmallow.EXCLUDE)
-    objects = schema.load(json_with_additional_data, partial=True)
-    return objects
+        json_with_additional_data = json_ | additional_data
+    return get_schema(schema_cls, many=many).load(
+        json_with_additional_data, partial=True
+    )
+
+
+def enable_process_offload(max_workers=None, threshold=_default_offload_threshold):
+    # responses of at least threshold bytes are unzipped and decoded in a
+    # pool of worker processes, so that threads decoding large responses do
+    # not hold the GIL; smaller ones are still handled inline, as sending
+    # them to a process would cost more than decoding them
+    global _process_pool, _offload_threshold
+    process_pool = concurrent.futures.ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    with _process_pool_lock:
+        previous_process_pool = _process_pool
+        _process_pool = process_pool
+        _offload_threshold = threshold
+    if previous_process_pool is not None:
+        previous_process_pool.shutdown(wait=False)
+
+
+def disable_process_offload():
+    global _process_pool
+    with _process_pool_lock:
+        process_pool = _process_pool
+        _process_pool = None
+    if process_pool is not None:
+        process_pool.shutdown()
+
+
+def is_process_offload_enabled():
+    return _process_pool is not None
+
+
+def _is_offloaded(data):
+    return _process_pool is not None and len(data) >= _offload_threshold
+
+
+def _run_offloadable(function, data, *args):
+    # runs function(data, *args) in the process pool if data is large enough;
+    # the result is pickled back, in which objects equal by identity, like
+    # interned strings, stay shared
+    process_pool = _process_pool
+    if process_pool is None or len(data) < _offload_threshold:
+        return function(data, *args)
+    future = process_pool.submit(function, data, *args)
+    try:
+        return future.result(timeout=minervapy.deadline.get_remaining_time())
+    except concurrent.futures.TimeoutError as error:
+        future.cancel()
+        raise minervapy.deadline.DeadlineExceeded("deadline exceeded") from error
+
+
+def request_to_objects_iter(
+    url,
+    schema_cls,
+    method="GET",
+    data=None,
+    params=None,
+    headers=None,
+    additional_data=None,
+    chunk_size=65536,
+):
+    # same as request_to_objects with many=True, but parses the JSON array
+    # of the response as it is received and yields objects one at a time
+    if additional_data is None:
+        additional_data = {}
+    with minervapy.profiling._call(method, url):
+        response = request_to_response(
+            url,
+            method=method,
+            data=data,
+            params=params,
+            headers=headers,
+            stream=True,
+        )
+    try:
+        check_response(response)
+        schema = get_schema(schema_cls)
+        for json_object in iter_json_array(
+            response.iter_content(chunk_size=chunk_size)
+        ):
+            minervapy.deadline.check_deadline()
+            yield schema.load(json_object | additional_data, partial=True)
+    finally:
+        response.close()
+
+
+def iter_json_array(chunks):
+    # yields the items of a JSON array given as an iterable of byte chunks,
+    # keeping only the unparsed part of the array in memory
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    position = 0
+    pending = []  # text received since the last attempt to decode an item
+    pending_length = 0
+    exhausted = False
+    state = "start"
+    while True:
+        while position < len(buffer) and buffer[position] in _json_whitespace:
+            position += 1
+        if position == len(buffer) or state == "item_pending":
+            if exhausted:
+                if state == "item_pending":
+                    state = "item"
+                    continue
+                raise ValueError("unexpected end of JSON array")
+            chunk = next(chunks, None)
+            if chunk is None:
+                exhausted = True
+                text = text_decoder.decode(b"", final=True)
+            else:
+                text = text_decoder.decode(chunk)
+            pending.append(text)
+            pending_length += len(text)
+            if (
+                state == "item_pending"
+                and not exhausted
+                and pending_length < len(buffer) - position
+            ):
+                # an item spanning chunks is only decoded again once its
+                # text has doubled, so that large items are not decoded
+                # once per chunk
+                continue
+            buffer = "".join([buffer[position:], *pending])
+            position = 0
+            pending = []
+            pending_length = 0
+            if state == "item_pending":
+                state = "item"
+            continue
+        char = buffer[position]
+        if state == "start":
+            if char != "[":
+                raise ValueError("expected a JSON array")
+            position += 1
+            state = "first_item"
+        elif state == "separator":
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"unexpected character {char!r} in JSON array")
+            position += 1
+            state = "item"
+        else:
+            if state == "first_item" and char == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+                state = "item_pending"
+                continue
+            if not exhausted and (
+                end == len(buffer) or buffer[end] not in _json_array_delimiters
+            ):
+                # a number at the end of the buffer may not be complete
+                state = "item_pending"
+                continue
+            yield item
+            position = end
+            state = "separator"
@@ -0,0 +1,166 @@
+import concurrent.futures
+import threading
+
+import minervapy.configuration
+import minervapy.conversion
+import minervapy.deadline
+import minervapy.map
+import minervapy.project
+import minervapy.session
+import minervapy.utils
+
+_default_endpoints = ["configuration", "projects", "maps"]
+_default_cache_ttl = 300
+
+_warm_up = None
+_warm_up_options = None
+_warm_up_lock = threading.Lock()
+
+
+class WarmUp:
+    # prefetches endpoints in background threads so that their responses are
+    # in the response cache of minervapy.utils before they are first needed;
+    # only the responses of these endpoints are cached, for cache_ttl seconds
+
+    def __init__(self, endpoints=None, max_workers=4, cache_ttl=_default_cache_ttl):
+        if endpoints is None:
+            endpoints = _default_endpoints
+        unknown_endpoints = set(endpoints) - set(_endpoint_to_function)
+        if unknown_endpoints:
+            raise ValueError(f"unknown endpoints {sorted(unknown_endpoints)}")
+        self.endpoints = list(endpoints)
+        self.max_workers = max_workers
+        self.cache_ttl = cache_ttl
+        self.state = "pending"
+        self.errors = {}
+        self._done = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.state = "running"
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        with minervapy.utils._prefetching(self.cache_ttl):
+            self._prefetch()
+        self.state = "failed" if self.errors else "ready"
+        self._done.set()
+
+    def _prefetch(self):
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as executor:
+            futures = {
+                endpoint: executor.submit(
+                    minervapy.deadline._bind(_endpoint_to_function[endpoint]),
+                    self.max_workers,
+                )
+                for endpoint in self.endpoints
+            }
+            for endpoint, future in futures.items():
+                try:
+                    future.result()
+                except Exception as exception:
+                    self.errors[endpoint] = exception
+
+    def is_done(self):
+        return self._done.is_set()
+
+    def is_ready(self):
+        return self.state == "ready"
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        return self.is_ready()
+
+
+def start_warm_up(endpoints=None, max_workers=4, cache_ttl=_default_cache_ttl):
+    global _warm_up
+    warm_up = WarmUp(endpoints=endpoints, max_workers=max_workers, cache_ttl=cache_ttl)
+    with _warm_up_lock:
+        _warm_up = warm_up
+    return warm_up.start()
+
+
+def enable_warm_up(endpoints=None, max_workers=4, cache_ttl=_default_cache_ttl):
+    # starts a warm up after every set_base_url and log_in
+    global _warm_up_options
+    with _warm_up_lock:
+        if _warm_up_options is None:
+            minervapy.session.add_session_listener(_on_session_event)
+        _warm_up_options = {
+            "endpoints": endpoints,
+            "max_workers": max_workers,
+            "cache_ttl": cache_ttl,
+        }
+
+
+def disable_warm_up():
+    global _warm_up_options
+    with _warm_up_lock:
+        if _warm_up_options is not None:
+            minervapy.session.remove_session_listener(_on_session_event)
+            _warm_up_options = None
+
+
+def get_warm_up():
+    return _warm_up
+
+
+def is_ready():
+    warm_up = _warm_up
+    return warm_up is not None and warm_up.is_ready()
+
+
+def wait_until_ready(timeout=None):
+    warm_up = _warm_up
+    if warm_up is None:
+        return False
+    return warm_up.wait(timeout)
+
+
+def _on_session_event(event):
+    options = _warm_up_options
+    if options is None or event not in ["set_base_url", "log_in"]:
+        return
+    if minervapy.session.get_base_url() is None:
+        return
+    start_warm_up(**options)
+
+
+def _warm_up_configuration(max_workers):
+    minervapy.configuration.get_configuration()
+
+
+def _warm_up_options_endpoint(max_workers):
+    minervapy.configuration.get_options()
+
+
+def _warm_up_projects(max_workers):
+    minervapy.project.get_projects()
+
+
+def _warm_up_maps(max_workers):
+    # the projects are shared with the projects endpoint through request
+    # coalescing and the response cache
+    projects = minervapy.project.get_projects()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for _ in executor.map(
+            minervapy.deadline._bind(minervapy.map.get_maps), projects
+        ):
+            pass
+
+
+def _warm_up_formats(max_workers):
+    minervapy.conversion.get_formats()
+
+
+_endpoint_to_function = {
+    "configuration": _warm_up_configuration,
+    "options": _warm_up_options_endpoint,
+    "projects": _warm_up_projects,
+    "maps": _warm_up_maps,
+    "formats": _warm_up_formats,
+}
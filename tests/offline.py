@@ -0,0 +1,1081 @@
+import concurrent.futures
+import json
+import math
+import os.path
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+
+import minervapy
+import minervapy.session
+import minervapy.configuration
+import minervapy.conversion
+import minervapy.files
+import minervapy.project
+import minervapy.map
+import minervapy.transfer
+import minervapy.snapshot
+
+import benchmarks.stub_server
+
+_tests_directory = os.path.dirname(__file__)
+
+
+class StubServerTestCase(unittest.TestCase):
+    server_options = {}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = benchmarks.stub_server.StubServer(**cls.server_options).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        minervapy.session.set_base_url(self.server.base_url)
+        minervapy.session.set_auth_cookies(None)
+        self.server.reset_counts()
+
+    def tearDown(self):
+        minervapy.session.set_renewal_interval(None)
+        minervapy.session._credentials = None
+
+
+class TestImport(unittest.TestCase):
+    def test_import_is_lazy(self):
+        code = (
+            "import sys, minervapy; "
+            "print(sorted(m for m in sys.modules "
+            "if m.startswith(('minervapy.', 'requests', 'marshmallow'))))"
+        )
+        completed = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual(completed.stdout.strip(), "[]")
+
+    def test_attributes_are_loaded_on_access(self):
+        self.assertIs(minervapy.get_projects, minervapy.project.get_projects)
+        self.assertIs(minervapy.Configuration, minervapy.configuration.Configuration)
+        self.assertRaises(AttributeError, getattr, minervapy, "not_an_attribute")
+
+    def test_attribute_to_submodule_is_complete(self):
+        for submodule_name in minervapy._submodules:
+            if submodule_name == "utils":
+                continue
+            submodule = getattr(minervapy, submodule_name)
+            for name, value in vars(submodule).items():
+                if name.startswith("_") or isinstance(value, types.ModuleType):
+                    continue
+                if getattr(value, "__module__", None) != submodule.__name__:
+                    continue
+                self.assertEqual(
+                    minervapy._attribute_to_submodule.get(name), submodule_name
+                )
+
+
+class TestStubServer(StubServerTestCase):
+    def test_get_configuration(self):
+        configuration = minervapy.configuration.get_configuration()
+        self.assertEqual(configuration.version, "17.1.0")
+
+    def test_get_projects_and_maps(self):
+        projects = minervapy.project.get_projects()
+        maps = minervapy.map.get_maps(projects[0])
+        self.assertEqual(maps[0].projectId, projects[0].projectId)
+
+    def test_iter_projects_and_maps(self):
+        projects = list(minervapy.project.iter_projects())
+        self.assertEqual(projects, minervapy.project.get_projects())
+        maps = list(minervapy.map.iter_maps(projects[0]))
+        self.assertEqual(maps, minervapy.map.get_maps(projects[0]))
+
+    def test_iter_json_array(self):
+        data = b'[{"a": [1, "]"]}, 12.5e3, -7, "x", null]'
+        chunks = [data[i : i + 3] for i in range(0, len(data), 3)]
+        self.assertEqual(
+            list(minervapy.utils.iter_json_array(chunks)),
+            [{"a": [1, "]"]}, 12.5e3, -7, "x", None],
+        )
+
+    def test_iter_json_array_with_large_items(self):
+        items = [{"id": i, "names": ["é" * 1000] * 200} for i in range(3)] + [12345]
+        data = json.dumps(items, ensure_ascii=False).encode("utf-8")
+        chunks = [data[i : i + 1000] for i in range(0, len(data), 1000)]
+        self.assertEqual(list(minervapy.utils.iter_json_array(chunks)), items)
+
+    def test_download_map(self):
+        data = minervapy.map.download_map(1000, "project_0")
+        self.assertTrue(data.startswith(b"<?xml"))
+
+    def test_download_map_with_polygon(self):
+        polygon = [(k * 0.001, (k % 2) * 1e-7) for k in range(2000)] + [(0, 5)]
+        minervapy.map.download_map(1000, "project_0", polygon=polygon)
+        minervapy.map.download_map(
+            1000, "project_0", polygon=polygon, simplify_polygon=False
+        )
+        self.assertEqual(
+            self.server.request_counts[
+                "/minerva/api/projects/project_0/models/1000:downloadModel"
+            ],
+            2,
+        )
+        self.assertEqual(
+            minervapy.map._simplified_polygon_string(polygon, 0.5),
+            "0,0;2,0;0,5",
+        )
+
+    def test_download_selection(self):
+        element_ids = [f"element_{i}" for i in range(1000)]
+        reaction_ids = [f"reaction_{i}" for i in range(500)]
+        with tempfile.TemporaryDirectory() as directory:
+            selection_export = minervapy.map.download_selection(
+                1000,
+                "project_0",
+                element_ids=element_ids,
+                reaction_ids=reaction_ids,
+                output_directory=directory,
+            )
+            with open(os.path.join(directory, "manifest.json")) as manifest_file:
+                manifest = json.load(manifest_file)
+            self.assertTrue(
+                os.path.exists(os.path.join(directory, manifest["chunks"][-1]["file"]))
+            )
+        self.assertGreater(len(selection_export.chunks), 1)
+        self.assertEqual(
+            [id_ for chunk in manifest["chunks"] for id_ in chunk["elementIds"]],
+            element_ids,
+        )
+        self.assertEqual(
+            [id_ for chunk in manifest["chunks"] for id_ in chunk["reactionIds"]],
+            reaction_ids,
+        )
+        self.assertEqual(
+            self.server.request_counts[
+                "/minerva/api/projects/project_0/models/1000:downloadModel"
+            ],
+            len(selection_export.chunks),
+        )
+
+    def test_get_statistics_table(self):
+        table = minervapy.project.get_statistics_table()
+        statistics = minervapy.project.get_statistics("project_3")
+        self.assertEqual(len(table.projectIds), 10)
+        self.assertEqual(table.get_row("project_3"), statistics.elementAnnotations)
+        totals = table.get_totals("reaction")
+        top = table.get_top_annotation_types(3, "reaction")
+        self.assertEqual(top[0][1], max(totals.values()))
+        self.assertEqual(
+            sum(table.get_project_totals().values()),
+            sum(table.get_totals().values()),
+        )
+
+    def test_upload_file(self):
+        file = minervapy.files.upload_file(__file__, "offline.py")
+        self.assertEqual(file.length, file.uploadedDataLength)
+        self.assertRaises(
+            ValueError,
+            minervapy.files.upload_file,
+            __file__,
+            "offline.py",
+            allowed_formats=["celldesigner"],
+        )
+
+    def test_injected_error(self):
+        self.server.fail_next()
+        self.assertRaises(
+            minervapy.utils.StatusCodeException, minervapy.project.get_projects
+        )
+
+
+class TestConversion(StubServerTestCase):
+    def test_get_formats_is_cached(self):
+        minervapy.conversion.clear_formats_cache()
+        inputs, outputs = minervapy.conversion.get_formats()
+        minervapy.conversion.get_formats()
+        self.assertIn("png", outputs)
+        self.assertEqual(self.server.request_counts["/minerva/api/convert/"], 1)
+
+    def test_plan_conversion(self):
+        graph = {
+            "gpml": {"celldesigner": "convert/"},
+            "celldesigner": {"svg": "convert/image/", "sbml": "convert/"},
+            "sbml": {"svg": "convert/image/"},
+        }
+        self.assertEqual(
+            minervapy.conversion.plan_conversion("gpml", "svg", graph),
+            [("gpml", "celldesigner"), ("celldesigner", "svg")],
+        )
+        self.assertRaises(
+            ValueError, minervapy.conversion.plan_conversion, "svg", "gpml", graph
+        )
+
+    def test_convert_multi_hop(self):
+        with open(
+            os.path.join(_tests_directory, "input_celldesigner_map.xml"), "rb"
+        ) as f:
+            input_data = f.read()
+        graph = {
+            "celldesigner": {"sbml": "convert/"},
+            "sbml": {"png": "convert/image/"},
+        }
+        plan_conversion = minervapy.conversion.plan_conversion
+        minervapy.conversion.plan_conversion = lambda i, o: plan_conversion(i, o, graph)
+        try:
+            data = minervapy.conversion.convert(
+                input_data, "celldesigner", "png", multi_hop=True
+            )
+        finally:
+            minervapy.conversion.plan_conversion = plan_conversion
+        self.assertTrue(data.startswith(b"\x89PNG"))
+        self.assertEqual(
+            self.server.request_counts[
+                "/minerva/api/convert/lcsb.mapviewer.converter.model.celldesigner.CellDesignerXmlParser:lcsb.mapviewer.converter.model.sbml.SbmlParser"
+            ],
+            1,
+        )
+
+    def test_sniff_format(self):
+        self.assertEqual(
+            minervapy.conversion.sniff_format(
+                os.path.join(_tests_directory, "input_celldesigner_map.xml")
+            ),
+            "celldesigner",
+        )
+        for data, input_format in [
+            (b'<sbgn xmlns="http://sbgn.org/libsbgn/0.2"><map>', "sbgnml"),
+            (b'<sbml xmlns="http://www.sbml.org/sbml/level3/version1/core">', "sbml"),
+            (b'<Pathway xmlns="http://pathvisio.org/GPML/2013a">', "gpml"),
+            (b"\x89PNG\r\n", None),
+            (
+                b'<sbml xmlns="http://www.sbml.org/sbml/level2/version4"><model>'
+                b"<notes>exported from celldesigner</notes><!-- celldesigner -->",
+                "sbml",
+            ),
+            (
+                b'<sbml xmlns="http://www.sbml.org/sbml/level2/version4"><model>'
+                b'<annotation><celldesigner:extension xmlns:celldesigner="'
+                b'http://www.sbml.org/2001/ns/celldesigner">',
+                "celldesigner",
+            ),
+        ]:
+            self.assertEqual(minervapy.conversion.sniff_format(data), input_format)
+
+    def test_convert_rejects_unknown_input_before_upload(self):
+        self.assertRaises(
+            ValueError, minervapy.conversion.convert, b"not a map", None, "png"
+        )
+        self.assertFalse(any(path.count(":") for path in self.server.request_counts))
+
+    def test_convert_files(self):
+        input_file_path = os.path.join(_tests_directory, "input_celldesigner_map.xml")
+        with tempfile.TemporaryDirectory() as directory:
+            output_file_paths = minervapy.conversion.convert_files(
+                [input_file_path], "svg", directory
+            )
+            self.assertEqual(
+                output_file_paths,
+                [os.path.join(directory, "input_celldesigner_map.svg")],
+            )
+            self.assertTrue(os.path.exists(output_file_paths[0]))
+
+
+class TestRequestCompression(StubServerTestCase):
+    def setUp(self):
+        super().setUp()
+        minervapy.utils.set_request_compression("gzip")
+        minervapy.utils.reset_compression_statistics()
+
+    def tearDown(self):
+        super().tearDown()
+        self.server.accept_compressed = True
+        self.server.decode_compressed = True
+        minervapy.utils.set_request_compression(None)
+
+    def test_compressed_upload(self):
+        input_file_path = os.path.join(_tests_directory, "input_celldesigner_map.xml")
+        file = minervapy.files.upload_file(input_file_path, "map.xml")
+        self.assertEqual(file.uploadedDataLength, os.path.getsize(input_file_path))
+        statistics = minervapy.utils.get_compression_statistics()
+        self.assertEqual(statistics.raw_bytes, file.length)
+        self.assertLess(statistics.sent_bytes * 5, statistics.raw_bytes)
+        self.assertLess(self.server.received_bytes, statistics.raw_bytes)
+
+    def test_fallback_when_rejected(self):
+        self.server.accept_compressed = False
+        input_file_path = os.path.join(_tests_directory, "input_celldesigner_map.xml")
+        data = minervapy.conversion.convert(input_file_path, "celldesigner", "sbml")
+        with open(input_file_path, "rb") as input_file:
+            self.assertEqual(data, input_file.read())
+        minervapy.conversion.convert(input_file_path, "celldesigner", "sbml")
+        statistics = minervapy.utils.get_compression_statistics()
+        self.assertEqual(statistics.fallbacks, 1)
+        self.assertEqual(statistics.requests, 1)
+
+    def test_server_ignoring_content_encoding(self):
+        self.server.decode_compressed = False
+        input_file_path = os.path.join(_tests_directory, "input_celldesigner_map.xml")
+        for _ in range(2):
+            file = minervapy.files.upload_file(input_file_path, "map.xml")
+            self.assertEqual(file.uploadedDataLength, os.path.getsize(input_file_path))
+        statistics = minervapy.utils.get_compression_statistics()
+        self.assertEqual(statistics.fallbacks, 1)
+        self.assertEqual(statistics.sent_bytes, statistics.raw_bytes)
+
+    def test_failed_probe_is_not_recorded(self):
+        input_file_path = os.path.join(_tests_directory, "input_celldesigner_map.xml")
+        self.server.fail_next(status=500)
+        minervapy.conversion.convert(input_file_path, "celldesigner", "sbml")
+        minervapy.conversion.convert(input_file_path, "celldesigner", "sbml")
+        self.server.fail_next(status=415, error="Unsupported content encoding.")
+        self.assertRaises(
+            minervapy.utils.StatusCodeException,
+            minervapy.conversion.convert,
+            input_file_path,
+            "celldesigner",
+            "sbml",
+        )
+        statistics = minervapy.utils.get_compression_statistics()
+        self.assertEqual(statistics.fallbacks, 1)
+        self.assertEqual(statistics.requests, 3)
+        self.assertEqual(sum(self.server.request_counts.values()), 6)
+
+
+class TestArtifactStore(StubServerTestCase):
+    def test_deduplication_and_gc(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = minervapy.ArtifactStore(os.path.join(directory, "store"))
+            minervapy.store.set_artifact_store(store)
+            try:
+                output_file_paths = [
+                    os.path.join(directory, f"source_{i}.xml") for i in range(2)
+                ]
+                for output_file_path in output_file_paths:
+                    minervapy.project.download_source("project_0", output_file_path)
+                minervapy.map.download_map(1000, "project_0")
+            finally:
+                minervapy.store.set_artifact_store(None)
+            artifacts = list(store.iter_artifacts())
+            self.assertEqual(len(artifacts), 1)
+            self.assertEqual(
+                [entry["function"] for entry in artifacts[0].metadata],
+                ["download_source", "download_source", "download_map"],
+            )
+            with open(output_file_paths[1], "rb") as output_file:
+                self.assertEqual(
+                    output_file.read(), store.get_data(artifacts[0].digest)
+                )
+            for output_file_path in output_file_paths:
+                os.remove(output_file_path)
+            result = store.gc()
+            self.assertEqual(result.digests, [artifacts[0].digest])
+            self.assertEqual(list(store.iter_artifacts()), [])
+
+    def test_overwriting_linked_output(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = minervapy.ArtifactStore(os.path.join(directory, "store"))
+            output_file_path = os.path.join(directory, "source.xml")
+            minervapy.store.set_artifact_store(store)
+            try:
+                minervapy.project.download_source("project_0", output_file_path)
+                (artifact,) = store.iter_artifacts()
+                data = store.get_data(artifact.digest)
+                self.assertEqual(
+                    store.is_linked(output_file_path),
+                    os.stat(output_file_path).st_nlink > 1,
+                )
+                minervapy.utils.data_to_file(b"changed", output_file_path)
+            finally:
+                minervapy.store.set_artifact_store(None)
+            with open(output_file_path, "rb") as output_file:
+                self.assertEqual(output_file.read(), b"changed")
+            self.assertEqual(store.get_data(artifact.digest), data)
+
+    def test_overwriting_own_hardlink(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "file.txt")
+            link_path = os.path.join(directory, "link.txt")
+            minervapy.utils.data_to_file(b"data", file_path)
+            os.link(file_path, link_path)
+            minervapy.utils.data_to_file(b"changed", link_path)
+            with open(file_path, "rb") as input_file:
+                self.assertEqual(input_file.read(), b"changed")
+
+
+class TestWarmUp(StubServerTestCase):
+    def tearDown(self):
+        super().tearDown()
+        minervapy.warmup.disable_warm_up()
+        minervapy.utils.set_response_cache_ttl(None)
+
+    def test_warm_up_after_set_base_url(self):
+        minervapy.warmup.enable_warm_up(endpoints=["configuration", "maps"])
+        minervapy.session.set_base_url(self.server.base_url)
+        self.assertTrue(minervapy.warmup.wait_until_ready(timeout=10))
+        self.assertEqual(self.server.request_counts["/minerva/api/projects/"], 1)
+        self.server.reset_counts()
+        minervapy.configuration.get_configuration()
+        minervapy.map.get_maps("project_2")
+        self.assertEqual(sum(self.server.request_counts.values()), 0)
+
+    def test_failed_warm_up(self):
+        self.server.fail_next()
+        warm_up = minervapy.warmup.start_warm_up(endpoints=["configuration"])
+        self.assertFalse(warm_up.wait(timeout=10))
+        self.assertEqual(warm_up.state, "failed")
+        self.assertIn("configuration", warm_up.errors)
+
+    def test_only_prefetched_endpoints_are_cached(self):
+        warm_up = minervapy.warmup.start_warm_up(endpoints=["configuration"])
+        self.assertTrue(warm_up.wait(timeout=10))
+        self.assertIsNone(minervapy.utils.get_response_cache_ttl())
+        input_file_path = os.path.join(_tests_directory, "input_celldesigner_map.xml")
+        file = minervapy.files.create_new_file("map.xml", 10)
+        self.assertEqual(minervapy.files.get_file(file.id).uploadedDataLength, 0)
+        minervapy.files.upload_content_to_file(input_file_path, file)
+        self.assertGreater(minervapy.files.get_file(file.id).uploadedDataLength, 0)
+        self.server.reset_counts()
+        minervapy.configuration.get_configuration()
+        self.assertEqual(sum(self.server.request_counts.values()), 0)
+
+
+class TestDownloadMap(StubServerTestCase):
+    def test_download_map_with_list_polygon(self):
+        data = minervapy.map.download_map(
+            1000, "project_0", polygon=[[0, 0], [10, 0], [10, 10]]
+        )
+        self.assertGreater(len(data), 0)
+
+    def test_download_map_with_empty_polygon(self):
+        data = minervapy.map.download_map(1000, "project_0", polygon=[])
+        self.assertGreater(len(data), 0)
+
+    def test_polygon_tolerance(self):
+        map_ = minervapy.map.get_maps("project_0")[0]
+        self.assertEqual(
+            minervapy.map._get_polygon_tolerance(map_, "png", map_.maxZoom - 2), 2
+        )
+        self.assertIsNone(minervapy.map._get_polygon_tolerance(map_, "png", None))
+        self.assertIsNone(
+            minervapy.map._get_polygon_tolerance(map_, "celldesigner", map_.maxZoom)
+        )
+        self.assertIsNone(
+            minervapy.map._get_polygon_tolerance(map_.idObject, "png", map_.maxZoom)
+        )
+
+
+class TestGeometry(unittest.TestCase):
+    def test_point_in_polygon(self):
+        triangle = [(0, 0), (10, 0), (0, 10)]
+        self.assertTrue(minervapy.point_in_polygon(2, 2, triangle))
+        self.assertFalse(minervapy.point_in_polygon(8, 8, triangle))
+
+    def test_link_index_matches_linear_scan(self):
+        rng = random.Random(0)
+        links = []
+        for i in range(200):
+            x, y = rng.uniform(0, 1000), rng.uniform(0, 1000)
+            polygon = []
+            for k in range(7):
+                angle = k * 2 * math.pi / 7
+                radius = rng.uniform(10, 80)
+                polygon.append(
+                    minervapy.Point(
+                        x + radius * math.cos(angle), y + radius * math.sin(angle)
+                    )
+                )
+            links.append(minervapy.Link(idObject=i, polygon=polygon))
+        image = minervapy.OverviewImage(links=links)
+        index = image.get_link_index()
+        points = [(rng.uniform(0, 1000), rng.uniform(0, 1000)) for _ in range(500)]
+        expected = [
+            [link for link in links if minervapy.point_in_polygon(x, y, link.polygon)]
+            for x, y in points
+        ]
+        self.assertEqual(index.query_many(points), expected)
+        self.assertTrue(any(expected))
+
+    def test_simplify_polygon(self):
+        circle = [
+            (100 * math.cos(k * math.pi / 500), 100 * math.sin(k * math.pi / 500))
+            for k in range(1000)
+        ]
+        simplified = minervapy.geometry.simplify_polygon(circle, 0.5)
+        self.assertLess(len(simplified), 100)
+        for x, y in simplified:
+            self.assertAlmostEqual(math.hypot(x, y), 100)
+
+    def test_polygon_as_lists(self):
+        self.assertEqual(minervapy.geometry.point_to_tuple([1, 2]), (1, 2))
+        self.assertTrue(
+            minervapy.geometry.point_in_polygon(1, 1, [[0, 0], [10, 0], [0, 10]])
+        )
+
+    def test_polygon_to_rectangle(self):
+        polygon = [(5, 0), (10, 0), (10, 10), (0, 10), (0, 0)]
+        self.assertEqual(
+            minervapy.geometry.polygon_to_rectangle(polygon),
+            [(0, 0), (10, 0), (10, 10), (0, 10)],
+        )
+        self.assertIsNone(minervapy.geometry.polygon_to_rectangle(polygon[:-1]))
+
+
+class TestSessionRenewal(StubServerTestCase):
+    server_options = {"require_login": True}
+
+    def test_renewal_on_access_denied(self):
+        minervapy.session.log_in("admin", "admin")
+        self.server.expire_sessions()
+        projects = minervapy.project.get_projects()
+        self.assertEqual(len(projects), 10)
+        self.assertEqual(self.server.request_counts["/minerva/api/doLogin"], 2)
+
+    def test_no_renewal_on_access_denied_with_valid_session(self):
+        minervapy.session.log_in("admin", "admin")
+        self.server.fail_next(status=403, error="Access denied.")
+        self.assertRaises(
+            minervapy.utils.StatusCodeException, minervapy.project.get_projects
+        )
+        self.assertEqual(self.server.request_counts["/minerva/api/doLogin"], 1)
+        self.assertEqual(
+            self.server.request_counts["/minerva/api/users/isSessionValid"], 1
+        )
+
+    def test_renewal_does_not_notify_listeners(self):
+        events = []
+        minervapy.session.log_in("admin", "admin")
+        minervapy.session.add_session_listener(events.append)
+        try:
+            self.assertTrue(minervapy.session.renew_session())
+        finally:
+            minervapy.session.remove_session_listener(events.append)
+        self.assertEqual(events, [])
+
+    def test_no_renewal_when_logged_out(self):
+        self.assertRaises(
+            minervapy.utils.StatusCodeException, minervapy.project.get_projects
+        )
+
+    def test_renewal_on_timer(self):
+        minervapy.session.log_in("admin", "admin")
+        cookies = minervapy.session.get_auth_cookies()
+        minervapy.session.set_renewal_interval(0.05)
+        time.sleep(0.3)
+        self.assertIsNot(minervapy.session.get_auth_cookies(), cookies)
+
+
+class TestCatalog(StubServerTestCase):
+    def test_refresh_and_query(self):
+        with minervapy.Catalog() as catalog:
+            result = catalog.refresh()
+            self.assertEqual(len(result.added), 10)
+            self.assertEqual(catalog.refresh().unchanged, 10)
+            self.assertEqual(catalog.get_projects(), minervapy.project.get_projects())
+            projects = catalog.get_projects(organism="9606", owner="admin")
+            self.assertEqual(
+                [project.projectId for project in projects],
+                ["project_0", "project_4", "project_8"],
+            )
+            maps = catalog.get_maps(organism="10090")
+            self.assertEqual(len(maps), 5 * 3)
+            self.assertIsInstance(maps[0].references[0], minervapy.Reference)
+            self.assertEqual(
+                catalog.get_maps("project_1"), minervapy.map.get_maps("project_1")
+            )
+            self.assertEqual(
+                catalog.get_option("OPTION_3"),
+                minervapy.configuration.get_options()[3],
+            )
+
+    def test_maps_fetched_after_refresh_without_maps(self):
+        with minervapy.Catalog() as catalog:
+            catalog.refresh(maps=False, options=False)
+            self.assertEqual(len(catalog.get_maps()), 0)
+            result = catalog.refresh(options=False)
+            self.assertEqual(result.unchanged, len(catalog.get_projects()))
+            self.assertEqual(len(catalog.get_maps()), 10 * 5)
+            self.server.reset_counts()
+            catalog.refresh(options=False)
+            self.assertEqual(sum(self.server.request_counts.values()), 1)
+
+
+class TestRequestCoalescing(StubServerTestCase):
+    server_options = {"latency": 0.3}
+
+    def _get_projects_concurrently(self, count=8):
+        barrier = threading.Barrier(count)
+
+        def get_projects():
+            barrier.wait()
+            try:
+                return minervapy.project.get_projects()
+            except Exception as exception:
+                return exception
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=count) as executor:
+            return list(executor.map(lambda _: get_projects(), range(count)))
+
+    def test_identical_requests_are_coalesced(self):
+        results = self._get_projects_concurrently()
+        self.assertEqual(self.server.request_counts["/minerva/api/projects/"], 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertIsNot(results[0][0], results[1][0])
+
+    def test_failures_are_shared(self):
+        self.server.fail_next()
+        results = self._get_projects_concurrently()
+        self.assertEqual(self.server.request_counts["/minerva/api/projects/"], 1)
+        for result in results:
+            self.assertIsInstance(result, minervapy.utils.StatusCodeException)
+        self.assertEqual(len(minervapy.project.get_projects()), 10)
+
+    def test_deadline_of_the_leader_is_not_shared(self):
+        def get_projects_with_deadline():
+            with minervapy.timeout(0.1):
+                return minervapy.project.get_projects()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            leader = executor.submit(get_projects_with_deadline)
+            time.sleep(0.05)
+            projects = minervapy.project.get_projects()
+            self.assertRaises(minervapy.DeadlineExceeded, leader.result)
+        self.assertEqual(len(projects), 10)
+        self.assertEqual(self.server.request_counts["/minerva/api/projects/"], 2)
+
+    def test_coalescing_disabled(self):
+        minervapy.utils.set_request_coalescing(False)
+        try:
+            self._get_projects_concurrently(count=3)
+        finally:
+            minervapy.utils.set_request_coalescing(True)
+        self.assertEqual(self.server.request_counts["/minerva/api/projects/"], 3)
+
+
+class TestProfiling(StubServerTestCase):
+    def test_profile_phases(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with minervapy.profile() as profiler:
+                minervapy.configuration.get_configuration()
+                minervapy.map.download_map(
+                    1000,
+                    "project_0",
+                    output_file_path=os.path.join(directory, "map.xml"),
+                )
+        self.assertEqual(len(profiler.calls), 2)
+        self.assertEqual(
+            set(profiler.calls[0].phases), set(["network", "json", "load"])
+        )
+        self.assertEqual(
+            set(profiler.calls[1].phases), set(["network", "unzip", "write"])
+        )
+        self.assertEqual(profiler.aggregate()["network"].count, 2)
+        self.assertFalse(minervapy.is_profiling())
+
+    def test_phases_after_profiler_exit(self):
+        with minervapy.profile(trace_memory=False):
+            minervapy.configuration.get_configuration()
+        with minervapy.profile(trace_memory=False) as profiler:
+            with minervapy.profiling._phase("write"):
+                pass
+        self.assertEqual(len(profiler.calls), 1)
+        self.assertEqual(set(profiler.calls[0].phases), set(["write"]))
+
+    def test_memory_of_overlapping_phases(self):
+        def allocate(barrier):
+            with minervapy.profiling._phase("load"):
+                barrier.wait()
+                data = bytearray(4 * 1024 * 1024)
+                barrier.wait()
+            return len(data)
+
+        with minervapy.profile() as profiler:
+            barrier = threading.Barrier(2)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                list(executor.map(allocate, [barrier, barrier]))
+            allocate(threading.Barrier(1))
+        allocated = [call.phases["load"].allocated for call in profiler.calls]
+        self.assertEqual(sorted(allocated)[:2], [0, 0])
+        # memory freed by other threads during the phase lowers the peak
+        self.assertGreaterEqual(max(allocated), 3 * 1024 * 1024)
+
+
+class TestProgress(StubServerTestCase):
+    def test_download_progress(self):
+        reports = []
+        minervapy.project.download_source(
+            "project_0",
+            progress=lambda progress: reports.append(
+                (progress.bytes_done, progress.total)
+            ),
+        )
+        self.assertGreater(len(reports), 1)
+        bytes_done, total = reports[-1]
+        self.assertGreater(bytes_done, 0)
+        self.assertEqual(bytes_done, total)
+
+    def test_batch_progress(self):
+        input_file_path = os.path.join(_tests_directory, "input_celldesigner_map.xml")
+        batch = minervapy.Progress(min_interval=0)
+        with tempfile.TemporaryDirectory() as directory:
+            minervapy.conversion.convert_files(
+                [input_file_path] * 3, "sbml", directory, progress=batch
+            )
+        size = os.path.getsize(input_file_path)
+        self.assertGreaterEqual(batch.bytes_done, 6 * size)
+        self.assertEqual(batch.bytes_done, batch.total)
+        self.assertEqual(batch.eta, 0.0)
+        self.assertIsNotNone(batch.average_throughput)
+
+
+class TestBulkFiles(StubServerTestCase):
+    def test_upload_directory_and_status_table(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for i in range(12):
+                with open(os.path.join(directory, f"file_{i}.txt"), "wb") as f:
+                    f.write(b"x" * (i + 1) * 100)
+            batch = minervapy.Progress()
+            files = minervapy.files.upload_files(directory, progress=batch)
+        self.assertEqual(len(files), 12)
+        self.assertEqual(batch.bytes_done, sum((i + 1) * 100 for i in range(12)))
+        table = minervapy.files.get_file_status_table(files)
+        self.assertEqual(list(table.ids), [file.id for file in files])
+        self.assertEqual(table.get_incomplete_file_ids(), [])
+        self.assertEqual(
+            table.get_total_length(), table.get_total_uploaded_data_length()
+        )
+        self.assertEqual(self.server.request_counts["/minerva/api/files/"], 12)
+
+    def test_incomplete_files(self):
+        file = minervapy.files.create_new_file("empty.txt", 10)
+        table = minervapy.files.get_file_status_table([file.id])
+        self.assertEqual(table.get_incomplete_file_ids(), [file.id])
+        self.assertEqual(table.get_row(file.id)["uploadedDataLength"], 0)
+
+
+class TestRangeDownloads(StubServerTestCase):
+    server_options = {"image_size": 1024 * 1024}
+
+    def tearDown(self):
+        super().tearDown()
+        self.server.accept_ranges = True
+        self.server.send_validators = True
+
+    def _download(self, output_file_path, progress=None):
+        url = minervapy.utils.join_urls(
+            [
+                self.server.base_url,
+                "projects/project_0/models/1000:downloadImage",
+            ]
+        )
+        return minervapy.transfer.download_to_file(
+            url,
+            output_file_path,
+            params={"handlerClass": "png"},
+            part_size=128 * 1024,
+            progress=progress,
+        )
+
+    def test_parallel_ranges(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output_file_path = os.path.join(directory, "map.png")
+            state = self._download(output_file_path)
+            self.assertEqual(state.get_part_count(), 8)
+            self.assertEqual(os.path.getsize(output_file_path), 1024 * 1024)
+            self.assertEqual(os.listdir(directory), ["map.png"])
+        self.assertEqual(self.server.sent_bytes, 1024 * 1024)
+
+    def test_resume(self):
+        def _interrupt(progress):
+            if progress.bytes_done > 300 * 1024:
+                raise RuntimeError("interrupted")
+
+        with tempfile.TemporaryDirectory() as directory:
+            output_file_path = os.path.join(directory, "map.png")
+            with self.assertRaises(RuntimeError):
+                self._download(
+                    output_file_path,
+                    minervapy.Progress(callback=_interrupt, min_interval=0),
+                )
+            self.assertTrue(os.path.exists(f"{output_file_path}.part.json"))
+            self.server.reset_counts()
+            state = self._download(output_file_path)
+            self.assertEqual(sorted(state.completedParts), list(range(8)))
+            self.assertLessEqual(self.server.sent_bytes, (1024 - 128) * 1024)
+            with open(output_file_path, "rb") as output_file:
+                self.assertTrue(output_file.read().startswith(b"\x89PNG"))
+
+    def test_failed_probe_keeps_state(self):
+        def _interrupt(progress):
+            if progress.bytes_done > 300 * 1024:
+                raise RuntimeError("interrupted")
+
+        with tempfile.TemporaryDirectory() as directory:
+            output_file_path = os.path.join(directory, "map.png")
+            with self.assertRaises(RuntimeError):
+                self._download(
+                    output_file_path,
+                    minervapy.Progress(callback=_interrupt, min_interval=0),
+                )
+            self.server.fail_next(status=503)
+            with self.assertRaises(minervapy.utils.StatusCodeException):
+                self._download(output_file_path)
+            self.assertTrue(os.path.exists(f"{output_file_path}.part.json"))
+            self.server.reset_counts()
+            self._download(output_file_path)
+            self.assertLessEqual(self.server.sent_bytes, (1024 - 128) * 1024)
+
+    def test_no_resume_without_validator(self):
+        def _interrupt(progress):
+            if progress.bytes_done > 300 * 1024:
+                raise RuntimeError("interrupted")
+
+        self.server.send_validators = False
+        with tempfile.TemporaryDirectory() as directory:
+            output_file_path = os.path.join(directory, "map.png")
+            with self.assertRaises(RuntimeError):
+                self._download(
+                    output_file_path,
+                    minervapy.Progress(callback=_interrupt, min_interval=0),
+                )
+            self.server.reset_counts()
+            state = self._download(output_file_path)
+            self.assertIsNone(state.validator)
+            self.assertEqual(os.path.getsize(output_file_path), 1024 * 1024)
+            self.assertEqual(os.listdir(directory), ["map.png"])
+        self.assertEqual(self.server.sent_bytes, 1024 * 1024 + 128 * 1024)
+
+    def test_resumable_download_source(self):
+        source = minervapy.project.download_source("project_0")
+        with tempfile.TemporaryDirectory() as directory:
+            output_file_path = os.path.join(directory, "source.xml")
+            self.assertEqual(
+                minervapy.project.download_source(
+                    "project_0", output_file_path, resumable=True
+                ),
+                output_file_path,
+            )
+            with open(output_file_path, "rb") as output_file:
+                self.assertEqual(output_file.read(), source)
+            store = minervapy.ArtifactStore(os.path.join(directory, "store"))
+            minervapy.set_artifact_store(store)
+            try:
+                minervapy.project.download_source(
+                    "project_0", output_file_path, resumable=True
+                )
+            finally:
+                minervapy.set_artifact_store(None)
+            (artifact,) = store.iter_artifacts()
+            self.assertEqual(store.get_data(artifact.digest), source)
+            with open(output_file_path, "rb") as output_file:
+                self.assertEqual(output_file.read(), source)
+
+    def test_resumable_post_selection_is_rejected(self):
+        with self.assertRaises(ValueError):
+            minervapy.map.download_map(
+                1000,
+                "project_0",
+                output_file_path="map.xml",
+                element_ids=[str(i) for i in range(1000)],
+                resumable=True,
+            )
+
+    def test_fallback_to_single_stream(self):
+        self.server.accept_ranges = False
+        with tempfile.TemporaryDirectory() as directory:
+            output_file_path = os.path.join(directory, "map.png")
+            state = self._download(output_file_path)
+            self.assertFalse(state.isRanged)
+            self.assertEqual(os.path.getsize(output_file_path), 1024 * 1024)
+
+
+class TestSnapshot(StubServerTestCase):
+    def test_round_trip(self):
+        objects = {
+            "configuration": minervapy.configuration.get_configuration(),
+            "projects": minervapy.project.get_projects(),
+            "maps": minervapy.map.get_maps("project_0"),
+            "table": minervapy.project.get_statistics_table(["project_0"]),
+            "point": (1.5, None),
+        }
+        snapshot = minervapy.objects_to_snapshot(objects)
+        self.assertEqual(minervapy.snapshot_to_objects(snapshot), objects)
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot_file_path = os.path.join(directory, "objects.snapshot")
+            minervapy.save_snapshot(objects, snapshot_file_path)
+            self.assertEqual(minervapy.load_snapshot(snapshot_file_path), objects)
+
+    def test_changed_fields(self):
+        file = minervapy.files.File(id=1, filename="map.xml", length=10)
+        classes, value = pickle.loads(minervapy.objects_to_snapshot(file)[6:])
+        module_name, class_name, field_names = classes[0]
+        classes[0] = (module_name, class_name, field_names[:-1] + ("removed",))
+        snapshot = b"MPYS\x00\x02" + pickle.dumps((classes, value), 4)
+        loaded_file = minervapy.snapshot_to_objects(snapshot)
+        self.assertEqual(loaded_file, file)
+        self.assertFalse(hasattr(loaded_file, "removed"))
+
+    def test_rejected_snapshots(self):
+        with self.assertRaises(ValueError):
+            minervapy.objects_to_snapshot(object())
+        snapshot = minervapy.objects_to_snapshot(minervapy.files.File())
+        with self.assertRaises(ValueError):
+            minervapy.snapshot_to_objects(b"MPYS\x00\x01" + snapshot[6:])
+        with self.assertRaises(ValueError):
+            minervapy.snapshot_to_objects(
+                b"MPYS\x00\x02" + pickle.dumps(([], minervapy.files.File()), 4)
+            )
+
+
+class TestStringInterning(StubServerTestCase):
+    def tearDown(self):
+        super().tearDown()
+        minervapy.utils.set_string_interning(True)
+
+    def test_repeated_values_are_shared(self):
+        minervapy.utils.clear_string_pool()
+        minervapy.utils.reset_interning_statistics()
+        maps = minervapy.map.get_maps("project_0")
+        references = [reference for map_ in maps for reference in map_.references]
+        self.assertIs(references[0].type, references[-1].type)
+        statistics = minervapy.utils.get_interning_statistics()
+        self.assertGreater(statistics.hits, 0)
+        self.assertGreater(statistics.saved_bytes, 0)
+        self.assertLess(statistics.strings, statistics.lookups)
+
+    def test_statistics_of_all_threads(self):
+        minervapy.utils.clear_string_pool()
+        minervapy.utils.reset_interning_statistics()
+        values = ["".join(["value_", str(i % 10)]) for i in range(100)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            interned_values = list(executor.map(minervapy.utils.intern_string, values))
+        self.assertEqual(len(set(map(id, interned_values))), 10)
+        statistics = minervapy.utils.get_interning_statistics()
+        self.assertEqual(statistics.strings, 10)
+        self.assertEqual(statistics.lookups, 100)
+        self.assertEqual(statistics.hits, 90)
+
+    def test_interning_disabled(self):
+        minervapy.utils.set_string_interning(False)
+        minervapy.utils.reset_interning_statistics()
+        maps = minervapy.map.get_maps("project_0")
+        self.assertIsNot(maps[0].references[0].type, maps[-1].references[0].type)
+        self.assertEqual(minervapy.utils.get_interning_statistics().lookups, 0)
+
+
+class TestRenderScheduler(StubServerTestCase):
+    server_options = {"latency": 0.05}
+    image_path = "/minerva/api/projects/project_0/models/1000:downloadImage"
+
+    def test_variants_are_deduplicated(self):
+        with minervapy.RenderScheduler(max_workers=4) as scheduler:
+            futures = [
+                scheduler.submit(
+                    1000, "project_0", overlay_ids=["2", "1"], zoom_level=3
+                ),
+                scheduler.submit(
+                    "1000", "project_0", overlay_ids=[1, 2, 2], zoom_level=3.0
+                ),
+                scheduler.submit(
+                    1000,
+                    "project_0",
+                    format_="PNG",
+                    overlay_ids=["1", "2"],
+                    zoom_level=3,
+                ),
+                scheduler.submit(1000, "project_0", overlay_ids=["1"], zoom_level=3),
+            ]
+            results = [future.result() for future in futures]
+            cached_result = scheduler.render(
+                1000, "project_0", overlay_ids=["1", "2"], zoom_level=3
+            )
+        self.assertIsNot(results[0], results[1])
+        self.assertIs(results[1], results[2])
+        self.assertIs(results[1], cached_result)
+        self.assertEqual(self.server.request_counts[self.image_path], 3)
+        self.assertEqual(scheduler.statistics.rendered, 3)
+        self.assertEqual(scheduler.statistics.deduplicated, 1)
+        self.assertEqual(scheduler.statistics.cached, 1)
+
+    def test_priority_order(self):
+        order = []
+        with minervapy.RenderScheduler(max_workers=1) as scheduler:
+            scheduler.submit(1000, "project_0", zoom_level=0)
+            for zoom_level, priority in [(1, 0), (2, 5), (3, 1), (4, 0)]:
+                scheduler.submit(
+                    1000, "project_0", zoom_level=zoom_level, priority=priority
+                ).add_done_callback(
+                    lambda _, zoom_level=zoom_level: order.append(zoom_level)
+                )
+            scheduler.submit(1000, "project_0", zoom_level=4, priority=10)
+        self.assertEqual(order, [4, 2, 3, 1])
+
+    def test_failures_are_not_cached(self):
+        with minervapy.RenderScheduler() as scheduler:
+            self.server.fail_next()
+            with self.assertRaises(minervapy.utils.StatusCodeException):
+                scheduler.render(1000, "project_0")
+            scheduler.render(1000, "project_0")
+        self.assertEqual(scheduler.statistics.failed, 1)
+        self.assertEqual(scheduler.statistics.rendered, 1)
+
+
+class TestProcessOffload(StubServerTestCase):
+    def tearDown(self):
+        super().tearDown()
+        minervapy.utils.disable_process_offload()
+
+    def test_offloaded_results_match_inline(self):
+        projects = minervapy.project.get_projects()
+        maps = minervapy.map.get_maps("project_0")
+        source = minervapy.project.download_source("project_0")
+        minervapy.utils.enable_process_offload(max_workers=2, threshold=1024)
+        with minervapy.profile() as profiler:
+            self.assertEqual(minervapy.project.get_projects(), projects)
+            self.assertEqual(minervapy.map.get_maps("project_0"), maps)
+            self.assertEqual(minervapy.project.download_source("project_0"), source)
+        self.assertEqual(profiler.aggregate()["offload"].count, 2)
+        self.assertEqual(profiler.aggregate()["unzip"].count, 1)
+
+    def test_small_responses_stay_inline(self):
+        minervapy.utils.enable_process_offload(max_workers=1)
+        with minervapy.profile() as profiler:
+            minervapy.configuration.get_configuration()
+        self.assertNotIn("offload", profiler.aggregate())
+
+
+class TestDeadline(StubServerTestCase):
+    server_options = {"latency": 0.2}
+
+    def test_composite_operation_is_cancelled(self):
+        input_file_path = os.path.join(_tests_directory, "input_celldesigner_map.xml")
+        start_time = time.monotonic()
+        with self.assertRaises(minervapy.DeadlineExceeded):
+            with minervapy.timeout(0.3):
+                minervapy.files.upload_file(input_file_path, "map.xml")
+        self.assertLess(time.monotonic() - start_time, 0.4)
+        with self.assertRaises(minervapy.DeadlineExceeded):
+            with minervapy.timeout(0.1):
+                time.sleep(0.1)
+                minervapy.files.upload_file(input_file_path, "map.xml")
+        self.assertIsNone(minervapy.get_remaining_time())
+
+    def test_deadline_follows_thread_pools(self):
+        with minervapy.timeout(0.1):
+            with self.assertRaises(minervapy.DeadlineExceeded):
+                minervapy.project.get_statistics_table(["project_0", "project_1"])
+
+    def test_nested_deadlines(self):
+        with minervapy.timeout(10):
+            with minervapy.timeout(20):
+                self.assertLessEqual(minervapy.get_remaining_time(), 10)
+            minervapy.configuration.get_configuration()
+
+
+if __name__ == "__main__":
+    unittest.main()